@@ -1,8 +1,20 @@
+import type { History } from '~/purple_client'
+
 export function useHistoryForDraft(draftName: string) {
   const api = useApi()
   return useAsyncData(
     `history-${draftName}`,
-    () => api.documentsHistoryList({ draftName: draftName }),
+    async () => {
+      const history: History[] = []
+      let before: Date | undefined
+      do {
+        const page = await api.documentsHistoryRetrieve({ draftName, before })
+        history.push(...page.results)
+        const nextBefore = page.next ? new URL(page.next).searchParams.get('before') : null
+        before = nextBefore ? new Date(nextBefore) : undefined
+      } while (before)
+      return history
+    },
     { server: false, default: () => [], lazy: true }
   )
 }
@@ -0,0 +1,129 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+"""Stale-while-revalidate cache for data fetched from the datatracker
+
+Entries carry a soft expiry in addition to the cache's own timeout. Until the soft
+expiry, an entry is fresh and is used as-is. After it, the entry is stale: one
+worker, the one that takes the refresh lock for the key, refetches it while
+everyone else keeps using the stale value. Stale values are also used if the
+datatracker cannot be reached, so an outage degrades to slightly old data rather
+than errors. Soft expiry times are jittered so that entries cached together do
+not all expire together.
+"""
+
+import logging
+import random
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+from .rpcapi import DataTrackerUnavailable
+
+logger = logging.getLogger(__name__)
+
+FRESH_TTL = 10 * 60  # seconds
+# Datatracker "not found" results are rechecked sooner
+NEGATIVE_FRESH_TTL = 60  # seconds
+# How long stale values are kept around to use while refreshing or during an outage
+STALE_TTL = 24 * 60 * 60  # seconds
+TTL_JITTER = 0.1  # fraction of the TTL
+REFRESH_LOCK_TIMEOUT = 30  # seconds
+# How long to wait for another worker to fill in a missing entry
+REFRESH_WAIT = 2.0  # seconds
+REFRESH_WAIT_INTERVAL = 0.1  # seconds
+
+
+@dataclass
+class CacheEntry:
+    value: object
+    fresh_until: float
+
+    def is_fresh(self):
+        return time.time() < self.fresh_until
+
+    def is_stale_within(self, seconds: float):
+        return time.time() + seconds >= self.fresh_until
+
+
+def _jittered(ttl: float) -> float:
+    return ttl * random.uniform(1 - TTL_JITTER, 1 + TTL_JITTER)
+
+
+def _make_entry(value, fresh_ttl: float = FRESH_TTL) -> CacheEntry:
+    ttl = fresh_ttl if value is not None else NEGATIVE_FRESH_TTL
+    return CacheEntry(value=value, fresh_until=time.time() + _jittered(ttl))
+
+
+def _lock_key(key: str) -> str:
+    return f"{key}:refresh-lock"
+
+
+def get_entries(keys: Iterable[str]) -> dict[str, CacheEntry]:
+    return {
+        key: entry
+        for key, entry in cache.get_many(list(keys)).items()
+        if isinstance(entry, CacheEntry)
+    }
+
+
+def set_entries(values: dict[str, object], fresh_ttl: float = FRESH_TTL):
+    """Cache fresh values (None values are "not found" results)"""
+    cache.set_many(
+        {key: _make_entry(value, fresh_ttl) for key, value in values.items()},
+        timeout=STALE_TTL,
+    )
+
+
+def acquire_refresh_lock(key: str) -> bool:
+    """Try to become the worker that refreshes key"""
+    return cache.add(_lock_key(key), True, timeout=REFRESH_LOCK_TIMEOUT)
+
+
+def release_refresh_lock(key: str):
+    cache.delete(_lock_key(key))
+
+
+def _wait_for_entry(key: str) -> CacheEntry | None:
+    """Wait for the worker holding the refresh lock to fill in key"""
+    deadline = time.monotonic() + REFRESH_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(REFRESH_WAIT_INTERVAL)
+        entry = cache.get(key)
+        if isinstance(entry, CacheEntry):
+            return entry
+    return None
+
+
+def get_or_refresh(key: str, fetch: Callable[[], object]):
+    """Get the value for key, calling fetch() to refresh it if needed
+
+    fetch() returns the value to cache, None for a "not found" result, or raises
+    DataTrackerUnavailable. The exception propagates only if there is no stale
+    value to fall back on.
+    """
+    entry = cache.get(key)
+    if not isinstance(entry, CacheEntry):
+        entry = None
+    if entry is not None and entry.is_fresh():
+        return entry.value
+    locked = acquire_refresh_lock(key)
+    if not locked:
+        # Another worker is refreshing this key
+        if entry is None:
+            entry = _wait_for_entry(key)
+        if entry is not None:
+            return entry.value
+    try:
+        try:
+            value = fetch()
+        except DataTrackerUnavailable:
+            if entry is None:
+                raise
+            logger.warning("Datatracker unavailable, using stale value for %s", key)
+            return entry.value
+        set_entries({key: value})
+        return value
+    finally:
+        if locked:
+            release_refresh_lock(key)
@@ -0,0 +1,275 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+"""Request-scoped batch loading of datatracker persons and documents
+
+While a DatatrackerLoader is active, every DatatrackerPerson and Document loaded
+from the database is recorded. The first time one of them needs data from the
+datatracker, all of the recorded instances that are not fresh in the cache (see
+datatracker.cache) are fetched with batch API calls of up to BATCH_SIZE ids.
+Results are memoized for the rest of the request or task, so serializers can
+access person and document properties freely without making one API call per
+instance.
+
+A loader is active for each HTTP request (see DatatrackerLoaderMiddleware) and
+each celery task (see purple.celery). Use datatracker_loader() elsewhere.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import rpcapi_client
+import urllib3.exceptions
+
+from .cache import acquire_refresh_lock, get_entries, release_refresh_lock, set_entries
+from .rpcapi import with_rpcapi
+
+logger = logging.getLogger(__name__)
+
+# Max ids per datatracker batch API call
+BATCH_SIZE = 100
+
+# Returned when the loader has no value for an id
+NO_VALUE = object()
+
+_current_loader: ContextVar["DatatrackerLoader | None"] = ContextVar(
+    "datatracker_loader", default=None
+)
+
+
+def person_cache_key(datatracker_id) -> str:
+    return f"datatracker_person-{datatracker_id}"
+
+
+def document_cache_key(datatracker_id) -> str:
+    return f"datatracker_document-{datatracker_id}"
+
+
+def subject_person_cache_key(subject_id) -> str:
+    return f"datatracker_subject_person-{subject_id}"
+
+
+def fetch_persons(
+    datatracker_ids: list[int], *, rpcapi: rpcapi_client.PurpleApi
+) -> dict[int, str]:
+    """Batch fetch person JSON from the datatracker, keyed by datatracker id"""
+    return {person.id: person.json() for person in rpcapi.get_persons(datatracker_ids)}
+
+
+def fetch_documents(
+    names_by_id: dict[int, str], *, rpcapi: rpcapi_client.PurpleApi
+) -> dict[int, str]:
+    """Batch fetch draft JSON from the datatracker, keyed by datatracker id"""
+    return {
+        draft.id: draft.json()
+        for draft in rpcapi.get_drafts_by_names(list(names_by_id.values()))
+        # Only full drafts carry everything that Document._fetch() may need
+        if isinstance(draft, rpcapi_client.FullDraft) and draft.id in names_by_id
+    }
+
+
+class DatatrackerLoader:
+    """Batch loader for datatracker person and document data
+
+    Values are the JSON representations that are cached by DatatrackerPerson and
+    Document, or None if the datatracker does not know the id.
+    """
+
+    def __init__(self):
+        self._pending_person_ids: set[int] = set()
+        self._persons: dict[int, str | None] = {}
+        # datatracker_id -> name
+        self._pending_documents: dict[int, str] = {}
+        self._documents: dict[int, str | None] = {}
+        # ids that a batch load did not resolve, left to individual fetches
+        self._unresolved_person_ids: set[int] = set()
+        self._unresolved_document_ids: set[int] = set()
+
+    def add_person(self, datatracker_id: int):
+        if (
+            datatracker_id not in self._persons
+            and datatracker_id not in self._unresolved_person_ids
+        ):
+            self._pending_person_ids.add(datatracker_id)
+
+    def add_document(self, datatracker_id: int, name: str):
+        if (
+            datatracker_id not in self._documents
+            and datatracker_id not in self._unresolved_document_ids
+        ):
+            self._pending_documents[datatracker_id] = name
+
+    def get_person(self, datatracker_id: int, *, rpcapi: rpcapi_client.PurpleApi):
+        """Get cached JSON for a person, or NO_VALUE if it could not be loaded"""
+        self.add_person(datatracker_id)
+        if self._pending_person_ids:
+            self._load_persons(rpcapi)
+        return self._persons.get(datatracker_id, NO_VALUE)
+
+    def get_document(
+        self, datatracker_id: int, name: str, *, rpcapi: rpcapi_client.PurpleApi
+    ):
+        """Get cached JSON for a document, or NO_VALUE if it could not be loaded"""
+        self.add_document(datatracker_id, name)
+        if self._pending_documents:
+            self._load_documents(rpcapi)
+        return self._documents.get(datatracker_id, NO_VALUE)
+
+    def remember_person(self, datatracker_id: int, value: str | None):
+        self._persons[datatracker_id] = value
+
+    def remember_document(self, datatracker_id: int, value: str | None):
+        self._documents[datatracker_id] = value
+
+    def _load_persons(self, rpcapi: rpcapi_client.PurpleApi):
+        pending = self._pending_person_ids
+        self._pending_person_ids = set()
+        self._load(
+            pending,
+            person_cache_key,
+            self._persons,
+            self._unresolved_person_ids,
+            lambda missing: fetch_persons(missing, rpcapi=rpcapi),
+        )
+
+    def _load_documents(self, rpcapi: rpcapi_client.PurpleApi):
+        pending = self._pending_documents
+        self._pending_documents = {}
+        self._load(
+            pending.keys(),
+            document_cache_key,
+            self._documents,
+            self._unresolved_document_ids,
+            lambda missing: fetch_documents(
+                {i: pending[i] for i in missing}, rpcapi=rpcapi
+            ),
+        )
+
+    @staticmethod
+    def _load(ids, make_key, loaded: dict, unresolved: set, fetch_batch):
+        """Load ids from the cache, batch fetching those that are missing or stale
+
+        Stale values are refreshed only if no other worker is already refreshing
+        them, and are used if the datatracker is unavailable.
+        """
+        keys = {make_key(i): i for i in ids}
+        stale = {}
+        locked_keys = []
+        for key, entry in get_entries(keys).items():
+            if entry.is_fresh() or not acquire_refresh_lock(key):
+                loaded[keys[key]] = entry.value
+            else:
+                locked_keys.append(key)
+                stale[keys[key]] = entry.value
+        missing = [i for i in keys.values() if i not in loaded]
+        if not missing:
+            return
+        unresolved.update(missing)
+        logger.debug("Batch loading %d datatracker records", len(missing))
+        fetched = {}
+        try:
+            for start in range(0, len(missing), BATCH_SIZE):
+                batch = fetch_batch(missing[start : start + BATCH_SIZE])
+                set_entries({make_key(i): value for i, value in batch.items()})
+                fetched.update(batch)
+        except (
+            urllib3.exceptions.MaxRetryError,
+            urllib3.exceptions.NewConnectionError,
+            rpcapi_client.exceptions.ApiException,
+        ):
+            # Use stale values while the datatracker is unavailable, without
+            # trying the remaining batches. Individual fetches will handle errors
+            # for the rest on their own.
+            fetched = stale | fetched
+        finally:
+            for key in locked_keys:
+                release_refresh_lock(key)
+        loaded.update(fetched)
+        unresolved.difference_update(fetched)
+
+
+def _due_for_refresh(ids, make_key, refresh_ahead: float) -> list:
+    """Ids that are not cached or whose cache entries go stale within refresh_ahead"""
+    keys = {make_key(i): i for i in ids}
+    entries = get_entries(keys)
+    return [
+        i
+        for key, i in keys.items()
+        if key not in entries or entries[key].is_stale_within(refresh_ahead)
+    ]
+
+
+@with_rpcapi
+def prefetch_persons(
+    datatracker_ids, refresh_ahead: float, *, rpcapi: rpcapi_client.PurpleApi
+) -> int:
+    """Refresh cached data for persons before it goes stale
+
+    Returns the number of persons that were fetched.
+    """
+    due = _due_for_refresh(set(datatracker_ids), person_cache_key, refresh_ahead)
+    for start in range(0, len(due), BATCH_SIZE):
+        fetched = fetch_persons(due[start : start + BATCH_SIZE], rpcapi=rpcapi)
+        set_entries({person_cache_key(i): value for i, value in fetched.items()})
+    return len(due)
+
+
+@with_rpcapi
+def prefetch_documents(
+    names_by_id: dict[int, str],
+    refresh_ahead: float,
+    *,
+    rpcapi: rpcapi_client.PurpleApi,
+) -> int:
+    """Refresh cached data for documents before it goes stale
+
+    Returns the number of documents that were fetched.
+    """
+    due = _due_for_refresh(names_by_id.keys(), document_cache_key, refresh_ahead)
+    for start in range(0, len(due), BATCH_SIZE):
+        fetched = fetch_documents(
+            {i: names_by_id[i] for i in due[start : start + BATCH_SIZE]},
+            rpcapi=rpcapi,
+        )
+        set_entries({document_cache_key(i): value for i, value in fetched.items()})
+    return len(due)
+
+
+def current_datatracker_loader() -> DatatrackerLoader | None:
+    return _current_loader.get()
+
+
+@contextmanager
+def datatracker_loader():
+    """Context manager that activates a DatatrackerLoader
+
+    Reuses the active loader if there already is one.
+    """
+    if _current_loader.get() is not None:
+        yield _current_loader.get()
+        return
+    loader = DatatrackerLoader()
+    token = _current_loader.set(loader)
+    try:
+        yield loader
+    finally:
+        _current_loader.reset(token)
+
+
+def activate_datatracker_loader():
+    """Activate a new DatatrackerLoader in the current context"""
+    _current_loader.set(DatatrackerLoader())
+
+
+def deactivate_datatracker_loader():
+    _current_loader.set(None)
+
+
+class DatatrackerLoaderMiddleware:
+    """Activate a DatatrackerLoader for each request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with datatracker_loader():
+            return self.get_response(request)
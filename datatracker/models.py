@@ -1,11 +1,20 @@
-# Copyright The IETF Trust 2023-2025, All Rights Reserved
+# Copyright The IETF Trust 2023-2026, All Rights Reserved
 import rpcapi_client
 import urllib3.exceptions
-from django.core.cache import cache
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from simple_history.models import HistoricalRecords
 
-from .rpcapi import DataTrackerUnavailable, with_rpcapi
+from .cache import get_or_refresh
+from .loader import (
+    NO_VALUE,
+    current_datatracker_loader,
+    document_cache_key,
+    person_cache_key,
+    subject_person_cache_key,
+)
+from .rpcapi import DataTrackerUnavailable, datatracker_api, with_rpcapi
 from .utils import build_datatracker_url
 
 
@@ -26,13 +35,23 @@ class DatatrackerPersonQuerySet(models.QuerySet):
         """Get an instance by subject id, creating it if necessary
 
         Like get_or_create(), but returns the first matching instance rather than
-        raising an exception if more than one match is found.
+        raising an exception if more than one match is found. The datatracker id
+        for each subject id is cached.
         """
-        try:
-            dtpers = rpcapi.get_subject_person_by_id(subject_id=subject_id)
-        except rpcapi_client.exceptions.NotFoundException as err:
-            raise DatatrackerPerson.DoesNotExist() from err
-        return self.first_or_create(datatracker_id=dtpers.id)
+
+        def _fetch_datatracker_id():
+            with datatracker_api():
+                try:
+                    return rpcapi.get_subject_person_by_id(subject_id=subject_id).id
+                except rpcapi_client.exceptions.NotFoundException:
+                    return None
+
+        datatracker_id = get_or_refresh(
+            subject_person_cache_key(subject_id), _fetch_datatracker_id
+        )
+        if datatracker_id is None:
+            raise DatatrackerPerson.DoesNotExist()
+        return self.first_or_create(datatracker_id=datatracker_id)
 
 
 class DatatrackerPerson(models.Model):
@@ -73,62 +92,48 @@ class DatatrackerPerson(models.Model):
         return url
 
     @classmethod
-    @with_rpcapi
-    def warm_cache(cls, datatracker_ids: list[int], *, rpcapi: rpcapi_client.PurpleApi):
-        """Batch-fetch person data from datatracker and populate the per-person cache.
-
-        Without this, _fetch() makes one API call per person per response. Because all
-        persons in a response are cached together, their entries also expire together,
-        causing N simultaneous API calls on the next cache miss.
-
-        Calling this before serialization replaces those N individual calls with a
-        single batch request. Only persons not already in cache are fetched.
-        """
-        no_value = object()
-        missing = [
-            i
-            for i in datatracker_ids
-            if cache.get(f"datatracker_person-{i}", no_value) is no_value
-        ]
-        if not missing:
-            return
-        try:
-            for person in rpcapi.get_persons(missing):
-                cache.set(f"datatracker_person-{person.id}", person.json())
-        except (
-            urllib3.exceptions.MaxRetryError,
-            urllib3.exceptions.NewConnectionError,
-            rpcapi_client.exceptions.ApiException,
-        ):
-            pass  # Individual _fetch() calls will handle errors on their own
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loader = current_datatracker_loader()
+        if loader is not None and "datatracker_id" in instance.__dict__:
+            loader.add_person(instance.datatracker_id)
+        return instance
 
     @with_rpcapi
     def _fetch(self, field_name, *, rpcapi: rpcapi_client.PurpleApi):
-        """Get field_name value for person (uses cache)"""
-        cache_key = f"datatracker_person-{self.datatracker_id}"
-        no_value = object()
-        cached_value = cache.get(cache_key, no_value)
-        if cached_value is no_value:
-            try:
-                person = rpcapi.get_person_by_id(int(self.datatracker_id))
-            except rpcapi_client.exceptions.NotFoundException:
-                cached_value = None
-            except (
-                urllib3.exceptions.MaxRetryError,
-                urllib3.exceptions.NewConnectionError,
-                rpcapi_client.exceptions.ApiException,
-            ) as exc:
-                # DT unavailable — raise so callers can surface the error
-                raise DataTrackerUnavailable() from exc
-            else:
-                cached_value = person.json()
-            cache.set(cache_key, cached_value)
+        """Get field_name value for person (uses loader and cache)"""
+        loader = current_datatracker_loader()
+        cached_value = NO_VALUE
+        if loader is not None:
+            cached_value = loader.get_person(self.datatracker_id, rpcapi=rpcapi)
+        if cached_value is NO_VALUE:
+            cached_value = get_or_refresh(
+                person_cache_key(self.datatracker_id),
+                lambda: self._fetch_json(rpcapi=rpcapi),
+            )
+            if loader is not None:
+                loader.remember_person(self.datatracker_id, cached_value)
         if cached_value is None:
             return None
         return getattr(
             rpcapi_client.models.person.Person.from_json(cached_value), field_name, None
         )
 
+    def _fetch_json(self, *, rpcapi: rpcapi_client.PurpleApi) -> str | None:
+        """Get person JSON from the datatracker, or None if it is not found"""
+        try:
+            person = rpcapi.get_person_by_id(int(self.datatracker_id))
+        except rpcapi_client.exceptions.NotFoundException:
+            return None
+        except (
+            urllib3.exceptions.MaxRetryError,
+            urllib3.exceptions.NewConnectionError,
+            rpcapi_client.exceptions.ApiException,
+        ) as exc:
+            # DT unavailable — raise so callers can surface the error
+            raise DataTrackerUnavailable() from exc
+        return person.json()
+
 
 class Document(models.Model):
     """Document known to the datatracker"""
@@ -149,9 +154,29 @@ class Document(models.Model):
     # https://django-simple-history.readthedocs.io/en/latest/historical_model.html#tracking-many-to-many-relationships
     labels = models.ManyToManyField("rpc.Label", through="DocumentLabel")
 
+    class Meta:
+        indexes = [
+            # Trigram index for case-insensitive substring search (name__icontains)
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"), name="document_name_trgm"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name}-{self.rev}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loader = current_datatracker_loader()
+        if (
+            loader is not None
+            and "datatracker_id" in instance.__dict__
+            and "name" in instance.__dict__
+        ):
+            loader.add_document(instance.datatracker_id, instance.name)
+        return instance
+
     @property
     def abstract(self) -> str:
         return self._fetch("abstract")
@@ -188,24 +213,20 @@ class Document(models.Model):
 
     @with_rpcapi
     def _fetch(self, field_name, *, rpcapi: rpcapi_client.PurpleApi):
-        """Get field_name value for draft (uses cache)"""
-        cache_key = f"datatracker_document-{self.datatracker_id}"
-        no_value = object()
-        cached_value = cache.get(cache_key, no_value)
-        if cached_value is no_value:
-            try:
-                document = rpcapi.get_draft_by_id(int(self.datatracker_id))
-            except rpcapi_client.exceptions.NotFoundException:
-                cached_value = None
-            except (
-                urllib3.exceptions.MaxRetryError,
-                urllib3.exceptions.NewConnectionError,
-                rpcapi_client.exceptions.ApiException,
-            ) as exc:
-                raise DataTrackerUnavailable() from exc
-            else:
-                cached_value = document.json()
-            cache.set(cache_key, cached_value)
+        """Get field_name value for draft (uses loader and cache)"""
+        loader = current_datatracker_loader()
+        cached_value = NO_VALUE
+        if loader is not None:
+            cached_value = loader.get_document(
+                self.datatracker_id, self.name, rpcapi=rpcapi
+            )
+        if cached_value is NO_VALUE:
+            cached_value = get_or_refresh(
+                document_cache_key(self.datatracker_id),
+                lambda: self._fetch_json(rpcapi=rpcapi),
+            )
+            if loader is not None:
+                loader.remember_document(self.datatracker_id, cached_value)
         if cached_value is None:
             return None
         return getattr(
@@ -214,6 +235,20 @@ class Document(models.Model):
             None,
         )
 
+    def _fetch_json(self, *, rpcapi: rpcapi_client.PurpleApi) -> str | None:
+        """Get draft JSON from the datatracker, or None if it is not found"""
+        try:
+            document = rpcapi.get_draft_by_id(int(self.datatracker_id))
+        except rpcapi_client.exceptions.NotFoundException:
+            return None
+        except (
+            urllib3.exceptions.MaxRetryError,
+            urllib3.exceptions.NewConnectionError,
+            rpcapi_client.exceptions.ApiException,
+        ) as exc:
+            raise DataTrackerUnavailable() from exc
+        return document.json()
+
 
 class DocumentLabel(models.Model):
     """Through model for linking Label to Document
@@ -0,0 +1,139 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+"""Cached datatracker draft-reference graph
+
+The references of a draft only change when a new revision of it is posted, so
+get_draft_references() results are cached per datatracker id and revision (see
+datatracker.cache), and shared by everything that walks the reference graph.
+The revision is the one of the local Document, if there is one. Entries for a
+draft are invalidated when a new revision of it is seen.
+"""
+
+import logging
+from collections import namedtuple
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+import rpcapi_client
+from django.core.cache import cache
+
+from .cache import (
+    acquire_refresh_lock,
+    get_entries,
+    release_refresh_lock,
+    set_entries,
+)
+from .models import Document
+from .rpcapi import DataTrackerUnavailable, datatracker_api, with_rpcapi
+
+logger = logging.getLogger(__name__)
+
+# References of a given revision rarely change, so they stay fresh for longer
+# than other datatracker data
+REFERENCES_FRESH_TTL = 6 * 60 * 60  # seconds
+# Max concurrent datatracker requests when fetching references
+REFERENCES_MAX_WORKERS = 8
+
+DraftReference = namedtuple("DraftReference", ["id", "name"])
+
+
+def draft_references_cache_key(datatracker_id, rev) -> str:
+    return f"datatracker_draft_references-{datatracker_id}-{rev}"
+
+
+def invalidate_draft_references(datatracker_id, rev: str = ""):
+    """Forget the cached references of a draft
+
+    Also forgets the references cached for it before it had a local Document.
+    """
+    cache.delete_many(
+        {
+            draft_references_cache_key(datatracker_id, rev),
+            draft_references_cache_key(datatracker_id, ""),
+        }
+    )
+
+
+def _fetch_draft_references(
+    datatracker_ids: list[int], *, rpcapi: rpcapi_client.PurpleApi
+) -> dict[int, list[DraftReference] | Exception]:
+    """Fetch the references of drafts concurrently, keyed by datatracker id
+
+    Values are exceptions for drafts whose references could not be fetched.
+    """
+
+    def fetch(datatracker_id):
+        try:
+            with datatracker_api():
+                references = rpcapi.get_draft_references(datatracker_id) or []
+        except DataTrackerUnavailable as err:
+            return err
+        return [DraftReference(ref.id, ref.name) for ref in references]
+
+    if not datatracker_ids:
+        return {}
+    with ThreadPoolExecutor(
+        max_workers=min(REFERENCES_MAX_WORKERS, len(datatracker_ids))
+    ) as executor:
+        return dict(
+            zip(datatracker_ids, executor.map(fetch, datatracker_ids), strict=True)
+        )
+
+
+@with_rpcapi
+def get_draft_references(
+    datatracker_ids: Iterable[int], *, rpcapi: rpcapi_client.PurpleApi
+) -> dict[int, list[DraftReference]]:
+    """Get the references of drafts, keyed by datatracker id
+
+    Uses cached references where possible and fetches the rest concurrently. Stale
+    references are used if the datatracker is unavailable; DataTrackerUnavailable
+    is raised only if there are none for a draft.
+    """
+    datatracker_ids = list(dict.fromkeys(datatracker_ids))
+    revs = dict(
+        Document.objects.filter(datatracker_id__in=datatracker_ids).values_list(
+            "datatracker_id", "rev"
+        )
+    )
+    keys = {
+        draft_references_cache_key(datatracker_id, revs.get(datatracker_id, "")): (
+            datatracker_id
+        )
+        for datatracker_id in datatracker_ids
+    }
+    references = {}
+    stale = {}
+    locked_keys = []
+    for key, entry in get_entries(keys).items():
+        if entry.is_fresh() or not acquire_refresh_lock(key):
+            references[keys[key]] = entry.value
+        else:
+            locked_keys.append(key)
+            stale[keys[key]] = entry.value
+    try:
+        fetched = _fetch_draft_references(
+            [i for i in datatracker_ids if i not in references], rpcapi=rpcapi
+        )
+        set_entries(
+            {
+                key: fetched[datatracker_id]
+                for key, datatracker_id in keys.items()
+                if isinstance(fetched.get(datatracker_id), list)
+            },
+            REFERENCES_FRESH_TTL,
+        )
+    finally:
+        for key in locked_keys:
+            release_refresh_lock(key)
+    for datatracker_id, value in fetched.items():
+        if not isinstance(value, Exception):
+            references[datatracker_id] = value
+        elif datatracker_id in stale:
+            logger.warning(
+                "Datatracker unavailable, using stale references for %s",
+                datatracker_id,
+            )
+            references[datatracker_id] = stale[datatracker_id]
+        else:
+            raise value
+    return references
@@ -1,4 +1,9 @@
-# Copyright The IETF Trust 2023-2025, All Rights Reserved
+# Copyright The IETF Trust 2023-2026, All Rights Reserved
+import logging
+import os
+import socket
+import threading
+import time
 from contextlib import contextmanager
 from functools import wraps
 from urllib.parse import urlparse
@@ -7,6 +12,12 @@ import rpcapi_client
 import urllib3.exceptions
 from django.conf import settings
 from rest_framework.exceptions import APIException
+from urllib3.connection import HTTPConnection
+
+logger = logging.getLogger(__name__)
+
+# How often each process logs the connection statistics of its ApiClient
+API_CLIENT_STATS_LOG_INTERVAL = 15 * 60  # seconds
 
 
 class DataTrackerUnavailable(APIException):
@@ -33,12 +44,23 @@ class ApiClient(rpcapi_client.ApiClient):
     """ApiClient that obtains credentials and sets API base automatically"""
 
     def __init__(self):
-        super().__init__(
-            rpcapi_client.Configuration(
-                host=settings.DATATRACKER_RPC_API_BASE,
-                api_key={"apiKeyAuth": settings.DATATRACKER_RPC_API_TOKEN},
-            )
+        configuration = rpcapi_client.Configuration(
+            host=settings.DATATRACKER_RPC_API_BASE,
+            api_key={"apiKeyAuth": settings.DATATRACKER_RPC_API_TOKEN},
         )
+        pool_maxsize = getattr(settings, "DATATRACKER_RPC_API_POOL_MAXSIZE", None)
+        if pool_maxsize is not None:
+            configuration.connection_pool_maxsize = pool_maxsize
+        # Pooled connections are kept alive by HTTP/1.1 already. TCP keepalive
+        # probes also keep idle ones from being dropped by firewalls or NAT.
+        keepalive_idle = getattr(settings, "DATATRACKER_RPC_API_TCP_KEEPALIVE", None)
+        if keepalive_idle is not None:
+            configuration.socket_options = [
+                *HTTPConnection.default_socket_options,
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+                (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, keepalive_idle),
+            ]
+        super().__init__(configuration)
 
         # Include CF service tokens in the header if configured to do so
         if getattr(settings, "CF_SERVICE_TOKEN_HOSTS", None) is not None:
@@ -54,8 +76,58 @@ class ApiClient(rpcapi_client.ApiClient):
                 )
 
 
+_shared_client: ApiClient | None = None
+_shared_client_pid: int | None = None
+_shared_client_lock = threading.Lock()
+_stats_logged_at = 0.0
+
+
+def get_api_client() -> ApiClient:
+    """Get the process-wide ApiClient
+
+    The client's connection pool keeps connections to the datatracker alive between
+    requests. Connections must not be shared with a parent process, so a process
+    that was forked after the client was created (e.g., a gunicorn or celery
+    prefork worker) gets a client of its own. Each process periodically logs the
+    statistics of its client (see get_api_client_stats()).
+    """
+    global _shared_client, _shared_client_pid, _stats_logged_at
+    pid = os.getpid()
+    if _shared_client is None or _shared_client_pid != pid:
+        with _shared_client_lock:
+            if _shared_client is None or _shared_client_pid != pid:
+                _shared_client = ApiClient()
+                _shared_client_pid = pid
+                _stats_logged_at = time.monotonic()
+    elif time.monotonic() - _stats_logged_at > API_CLIENT_STATS_LOG_INTERVAL:
+        _stats_logged_at = time.monotonic()
+        logger.info(
+            "Datatracker API client stats for pid %d: %s", pid, get_api_client_stats()
+        )
+    return _shared_client
+
+
+def get_api_client_stats() -> dict[str, int]:
+    """Connection statistics for this process's ApiClient
+
+    Returns counts of requests made and of connections opened. Requests that did
+    not open a connection reused a pooled one.
+    """
+    stats = {"requests": 0, "connections_opened": 0, "connections_reused": 0}
+    if _shared_client is None or _shared_client_pid != os.getpid():
+        return stats
+    pools = _shared_client.rest_client.pool_manager.pools
+    for key in pools.keys():
+        pool = pools.get(key)
+        if pool is not None:
+            stats["requests"] += pool.num_requests
+            stats["connections_opened"] += pool.num_connections
+    stats["connections_reused"] = stats["requests"] - stats["connections_opened"]
+    return stats
+
+
 def get_rpcapi_client():
-    return rpcapi_client.PurpleApi(ApiClient())
+    return rpcapi_client.PurpleApi(get_api_client())
 
 
 def with_rpcapi(f):
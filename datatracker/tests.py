@@ -1 +1,227 @@
-# Create your tests here.
+# Copyright The IETF Trust 2026, All Rights Reserved
+import os
+import socket
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from .cache import get_entries, get_or_refresh, set_entries
+from .factories import DatatrackerPersonFactory, DocumentFactory
+from .loader import NO_VALUE, datatracker_loader, person_cache_key, prefetch_persons
+from .models import DatatrackerPerson
+from .references import (
+    DraftReference,
+    get_draft_references,
+    invalidate_draft_references,
+)
+from .rpcapi import (
+    API_CLIENT_STATS_LOG_INTERVAL,
+    DataTrackerUnavailable,
+    get_api_client,
+    get_api_client_stats,
+    get_rpcapi_client,
+)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class StaleWhileRevalidateCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_get_or_refresh(self):
+        fetch = MagicMock(return_value="value")
+        self.assertEqual(get_or_refresh("key", fetch), "value")
+        self.assertEqual(get_or_refresh("key", fetch), "value")
+        self.assertEqual(fetch.call_count, 1)  # second call was a fresh hit
+
+        # stale value is refreshed
+        fetch.return_value = "new value"
+        with patch("datatracker.cache.time.time", return_value=time.time() + 3600):
+            self.assertEqual(get_or_refresh("key", fetch), "new value")
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_stale_value_used_when_datatracker_unavailable(self):
+        get_or_refresh("key", lambda: "value")
+        fetch = MagicMock(side_effect=DataTrackerUnavailable)
+        with patch("datatracker.cache.time.time", return_value=time.time() + 3600):
+            self.assertEqual(get_or_refresh("key", fetch), "value")
+        fetch.assert_called_once()
+        # with nothing to fall back on, the error propagates
+        with self.assertRaises(DataTrackerUnavailable):
+            get_or_refresh("other-key", fetch)
+
+
+class DatatrackerLoaderTests(TestCase):
+    @staticmethod
+    def _person(datatracker_id):
+        person = MagicMock(id=datatracker_id)
+        person.json.return_value = f'{{"id": {datatracker_id}}}'
+        return person
+
+    def test_persons_loaded_in_one_batch(self):
+        dt_ids = [1001, 1002, 1003]
+        for dt_id in dt_ids:
+            DatatrackerPersonFactory(datatracker_id=dt_id)
+        rpcapi = MagicMock()
+        rpcapi.get_persons.side_effect = lambda ids: [
+            self._person(i) for i in ids if i != 1003
+        ]
+
+        with datatracker_loader() as loader:
+            persons = list(DatatrackerPerson.objects.filter(datatracker_id__in=dt_ids))
+            self.assertEqual(len(persons), 3)
+            self.assertEqual(loader.get_person(1001, rpcapi=rpcapi), '{"id": 1001}')
+            self.assertEqual(loader.get_person(1002, rpcapi=rpcapi), '{"id": 1002}')
+            # not returned by the batch call, left for an individual fetch
+            self.assertIs(loader.get_person(1003, rpcapi=rpcapi), NO_VALUE)
+        rpcapi.get_persons.assert_called_once()
+
+    @patch("datatracker.loader.BATCH_SIZE", 2)
+    def test_persons_loaded_in_batches(self):
+        dt_ids = [1001, 1002, 1003, 1004, 1005]
+        for dt_id in dt_ids:
+            DatatrackerPersonFactory(datatracker_id=dt_id)
+        rpcapi = MagicMock()
+        rpcapi.get_persons.side_effect = lambda ids: [self._person(i) for i in ids]
+
+        with datatracker_loader() as loader:
+            list(DatatrackerPerson.objects.filter(datatracker_id__in=dt_ids))
+            for dt_id in dt_ids:
+                self.assertEqual(
+                    loader.get_person(dt_id, rpcapi=rpcapi), f'{{"id": {dt_id}}}'
+                )
+        self.assertEqual(
+            sorted(len(call.args[0]) for call in rpcapi.get_persons.call_args_list),
+            [1, 2, 2],
+        )
+        self.assertCountEqual(rpcapi.get_persons.call_args.args[0], dt_ids)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class DraftReferencesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.rpcapi = MagicMock()
+        self.rpcapi.get_draft_references.side_effect = lambda dt_id: [
+            SimpleNamespace(id=dt_id + 1, name=f"draft-ref-{dt_id + 1}")
+        ]
+
+    def test_references_are_cached_per_revision(self):
+        document = DocumentFactory(datatracker_id=100, rev="00")
+        self.assertEqual(
+            get_draft_references([100, 200], rpcapi=self.rpcapi),
+            {
+                100: [DraftReference(101, "draft-ref-101")],
+                200: [DraftReference(201, "draft-ref-201")],
+            },
+        )
+        get_draft_references([100, 200], rpcapi=self.rpcapi)
+        self.assertEqual(self.rpcapi.get_draft_references.call_count, 2)
+
+        # a new revision is fetched again
+        document.rev = "01"
+        document.save()
+        get_draft_references([100, 200], rpcapi=self.rpcapi)
+        self.assertEqual(self.rpcapi.get_draft_references.call_count, 3)
+
+        invalidate_draft_references(200)
+        get_draft_references([100, 200], rpcapi=self.rpcapi)
+        self.assertEqual(self.rpcapi.get_draft_references.call_count, 4)
+
+    def test_stale_references_used_when_datatracker_unavailable(self):
+        get_draft_references([100], rpcapi=self.rpcapi)
+        self.rpcapi.get_draft_references.side_effect = DataTrackerUnavailable
+        with patch("datatracker.cache.time.time", return_value=time.time() + 7 * 3600):
+            self.assertEqual(
+                get_draft_references([100], rpcapi=self.rpcapi),
+                {100: [DraftReference(101, "draft-ref-101")]},
+            )
+            with self.assertRaises(DataTrackerUnavailable):
+                get_draft_references([300], rpcapi=self.rpcapi)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class PrefetchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_prefetch_persons_refreshes_entries_due_to_go_stale(self):
+        set_entries({person_cache_key(1): "fresh"}, fresh_ttl=3600)
+        set_entries({person_cache_key(2): "going stale"}, fresh_ttl=30)
+        rpcapi = MagicMock()
+        rpcapi.get_persons.side_effect = lambda ids: [
+            DatatrackerLoaderTests._person(i) for i in ids
+        ]
+        self.assertEqual(prefetch_persons([1, 2, 3], 60, rpcapi=rpcapi), 2)
+        self.assertCountEqual(rpcapi.get_persons.call_args.args[0], [2, 3])
+        self.assertEqual(
+            get_entries([person_cache_key(2)])[person_cache_key(2)].value,
+            '{"id": 2}',
+        )
+        # nothing is due now
+        self.assertEqual(prefetch_persons([1, 2, 3], 60, rpcapi=rpcapi), 0)
+
+
+@override_settings(
+    DATATRACKER_RPC_API_BASE="https://datatracker.example.com",
+    DATATRACKER_RPC_API_TOKEN="token",
+)
+class ApiClientTests(TestCase):
+    def setUp(self):
+        patcher = patch.multiple(
+            "datatracker.rpcapi", _shared_client=None, _shared_client_pid=None
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_shared_client_is_reused(self):
+        client = get_api_client()
+        self.assertIs(get_api_client(), client)
+        self.assertIs(get_rpcapi_client().api_client, client)
+
+    def test_client_is_rebuilt_after_fork(self):
+        client = get_api_client()
+        with patch("datatracker.rpcapi.os.getpid", return_value=os.getpid() + 1):
+            forked_client = get_api_client()
+            self.assertIsNot(forked_client, client)
+            self.assertIs(get_api_client(), forked_client)
+
+    @override_settings(
+        DATATRACKER_RPC_API_POOL_MAXSIZE=20, DATATRACKER_RPC_API_TCP_KEEPALIVE=60
+    )
+    def test_pool_settings(self):
+        pool_kw = get_api_client().rest_client.pool_manager.connection_pool_kw
+        self.assertEqual(pool_kw["maxsize"], 20)
+        self.assertIn(
+            (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60), pool_kw["socket_options"]
+        )
+
+    def test_stats(self):
+        self.assertEqual(get_api_client_stats()["requests"], 0)
+        pool = get_api_client().rest_client.pool_manager.connection_from_host(
+            "datatracker.example.com", 443, "https"
+        )
+        pool.num_requests = 5
+        pool.num_connections = 2
+        self.assertEqual(
+            get_api_client_stats(),
+            {"requests": 5, "connections_opened": 2, "connections_reused": 3},
+        )
+        with (
+            patch(
+                "datatracker.rpcapi.time.monotonic",
+                return_value=time.monotonic() + API_CLIENT_STATS_LOG_INTERVAL + 1,
+            ),
+            self.assertLogs("datatracker.rpcapi", "INFO") as logs,
+        ):
+            get_api_client()
+        self.assertIn("'connections_reused': 3", logs.output[0])
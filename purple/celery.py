@@ -49,4 +49,19 @@ def debug_log_task():
     )
 
 
+# Batch datatracker lookups made during each task (see datatracker.loader)
+@celery_signals.task_prerun.connect
+def on_task_prerun(**kwargs):
+    from datatracker.loader import activate_datatracker_loader
+
+    activate_datatracker_loader()
+
+
+@celery_signals.task_postrun.connect
+def on_task_postrun(**kwargs):
+    from datatracker.loader import deactivate_datatracker_loader
+
+    deactivate_datatracker_loader()
+
+
 app.conf.timezone = "UTC"
@@ -47,6 +47,16 @@ DATATRACKER_RPC_API_BASE = os.environ.get(
 DATATRACKER_API_V1_BASE = os.environ.get(
     "PURPLE_DATATRACKER_API_V1_BASE", f"{DATATRACKER_BASE}/api/v1"
 )
+# Max connections kept alive to the datatracker RPC API per worker process
+if "PURPLE_DATATRACKER_RPC_API_POOL_MAXSIZE" in os.environ:
+    DATATRACKER_RPC_API_POOL_MAXSIZE = int(
+        os.environ["PURPLE_DATATRACKER_RPC_API_POOL_MAXSIZE"]
+    )
+# Seconds a datatracker RPC API connection is idle before TCP keepalive probes
+if "PURPLE_DATATRACKER_RPC_API_TCP_KEEPALIVE" in os.environ:
+    DATATRACKER_RPC_API_TCP_KEEPALIVE = int(
+        os.environ["PURPLE_DATATRACKER_RPC_API_TCP_KEEPALIVE"]
+    )
 
 
 # OIDC configuration (see also base.py)
@@ -154,7 +154,7 @@ urlpatterns = [
         rpc_api.RfcMailTemplatesList.as_view(),
     ),
     path("api/rpc/stats/label/", rpc_api.StatsLabels.as_view()),
-    path("api/rpc/submissions/", rpc_api.submissions),
+    path("api/rpc/submissions/", rpc_api.SubmissionList.as_view()),
     path("api/rpc/submissions/<int:document_id>/", rpc_api.submission),
     path("api/rpc/submissions/<int:document_id>/import/", rpc_api.import_submission),
     path("api/rpc/version/", rpc_api.version),
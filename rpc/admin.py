@@ -19,6 +19,7 @@ from .models import (
     Label,
     MailMessage,
     MetadataValidationResults,
+    PendingSubmission,
     PublicationAttempt,
     RfcAuthor,
     RfcToBe,
@@ -215,10 +216,17 @@ class MetadataValidationResultsAdmin(admin.ModelAdmin):
 
 @admin.register(TaskRun)
 class TaskRunAdmin(admin.ModelAdmin):
-    list_display = ["task_name", "last_run_at", "is_running"]
+    list_display = ["task_name", "last_run_at", "is_running", "cursor"]
     search_fields = ["task_name"]
 
 
+@admin.register(PendingSubmission)
+class PendingSubmissionAdmin(admin.ModelAdmin):
+    list_display = ["name", "datatracker_id", "stream", "submitted"]
+    list_filter = ["stream"]
+    search_fields = ["name"]
+
+
 @admin.register(PublicationAttempt)
 class PublicationAttemptAdmin(admin.ModelAdmin):
     list_display = ["rfc_to_be", "status", "started_at", "detail"]
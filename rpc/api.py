@@ -9,9 +9,10 @@ from dataclasses import dataclass
 import django_filters
 import rpcapi_client
 from django import forms
+from django.contrib.postgres.forms import SimpleArrayField
 from django.core.cache import cache
 from django.db import transaction
-from django.db.models import Exists, Max, OuterRef, Prefetch, Q
+from django.db.models import Count, Exists, Max, OuterRef, Prefetch, Q
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
@@ -41,13 +42,18 @@ from rest_framework.exceptions import (
 from rest_framework.generics import ListAPIView
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rules.contrib.rest_framework import AutoPermissionViewSetMixin
+from simple_history.utils import bulk_update_with_history
 
 from datatracker.models import DatatrackerPerson, Document
-from datatracker.rpcapi import datatracker_api, get_rpcapi_client, with_rpcapi
+from datatracker.references import get_draft_references, invalidate_draft_references
+from datatracker.rpcapi import datatracker_api, with_rpcapi
 from utils.rest_framework.permissions import HasApiKey
 
 from .dt_v1_api_utils import datatracker_group_list_email, datatracker_group_name
+from .history import HISTORY_MODELS, rfctobe_history_page
+from .labelstats import label_stats
 from .lifecycle.blocked_assignments import (
     apply_manual_block,
     apply_manual_unblock,
@@ -73,6 +79,7 @@ from .models import (
     FinalApproval,
     Label,
     MetadataValidationResults,
+    PendingSubmission,
     RfcAuthor,
     RfcToBe,
     RfcToBeBlockingReason,
@@ -88,8 +95,10 @@ from .models import (
     TlpBoilerplateChoiceName,
     UnusableRfcNumber,
 )
-from .pagination import DefaultLimitOffsetPagination
+from .pagination import DefaultLimitOffsetPagination, KeysetLimitOffsetPagination
+from .queuesnapshot import get_queue_snapshot
 from .rfcindex import mark_rfcindex_as_dirty
+from .search import search_rfctobes
 from .serializers import (
     NO_HEAD_SHA_SENTINEL,
     ActionHolderSerializer,
@@ -111,6 +120,7 @@ from .serializers import (
     DocumentAssignmentSerializer,
     DocumentCommentSerializer,
     FinalApprovalSerializer,
+    HistoryPageSerializer,
     HistorySerializer,
     IanaStatusSerializer,
     LabelSerializer,
@@ -138,10 +148,11 @@ from .serializers import (
     SubseriesDocSerializer,
     SubseriesMemberSerializer,
     SubseriesTypeNameSerializer,
+    TypeaheadSuggestionSerializer,
     UnusableRfcNumberSerializer,
     VersionInfoSerializer,
-    collect_rfctobe_history,
 )
+from .signals import cluster_members_bulk_updated
 from .tasks import (
     RPC_PERSON_NAME_MAP_CACHE_KEY,
     RPC_PERSON_NAME_MAP_CACHE_TTL,
@@ -151,6 +162,7 @@ from .tasks import (
     set_stream_manager_task,
     validate_metadata_task,
 )
+from .typeahead import typeahead_suggestions
 from .utils import (
     VersionInfo,
     add_doc_to_cluster,
@@ -384,12 +396,8 @@ class RpcPersonAssignmentViewSet(mixins.ListModelMixin, viewsets.GenericViewSet)
         return queryset
 
 
-@extend_schema(
-    operation_id="submissions_list", responses=SubmissionListItemSerializer(many=True)
-)
-@api_view(["GET"])
-@with_rpcapi
-def submissions(request, *, rpcapi: rpcapi_client.PurpleApi):
+@extend_schema_view(get=extend_schema(operation_id="submissions_list"))
+class SubmissionList(ListAPIView):
     """Retrieve submitted docs not yet in the purple queue
 
     Returns documents in datatracker that have been submitted to the RPC but are
@@ -426,18 +434,18 @@ def submissions(request, *, rpcapi: rpcapi_client.PurpleApi):
     Those queries overreturn - there may be things, particularly not from the IETF
     stream that are already in the queue.
     This api will filter those out.
+
+    The datatracker's list is mirrored in PendingSubmission by
+    refresh_pending_submissions_task, so this is served from the database and
+    does not depend on the datatracker responding.
     """
-    # Get submissions list from Datatracker
-    with datatracker_api():
-        submitted = rpcapi.submitted_to_rpc()
-    # Filter out I-Ds that already have an active (non-withdrawn) RfcToBe
-    already_in_queue = (
-        RfcToBe.objects.filter(draft__datatracker_id__in=[s.id for s in submitted])
-        .exclude(disposition__slug="withdrawn")
-        .values_list("draft__datatracker_id", flat=True)
-    )
-    submitted = [s for s in submitted if s.id not in already_in_queue]
-    return Response(SubmissionListItemSerializer(submitted, many=True).data)
+
+    queryset = PendingSubmission.objects.not_in_queue()
+    serializer_class = SubmissionListItemSerializer
+    filter_backends = (filters.DjangoFilterBackend, drf_filters.OrderingFilter)
+    filterset_fields = ["stream"]
+    ordering_fields = ["submitted", "name"]
+    ordering = ["submitted"]
 
 
 @extend_schema(operation_id="submissions_retrieve", responses=SubmissionSerializer)
@@ -450,6 +458,13 @@ def submission(request, document_id, rpcapi: rpcapi_client.PurpleApi):
         draft = rpcapi.get_draft_by_id(document_id)
     if draft is None:
         raise NotFound(f"No draft found with id {document_id}")
+    # A new revision may have new references
+    for rev in (
+        Document.objects.filter(datatracker_id=document_id)
+        .exclude(rev=draft.rev)
+        .values_list("rev", flat=True)
+    ):
+        invalidate_draft_references(document_id, rev)
     subm = Submission.from_rpcapi_draft(draft)
     return Response(SubmissionSerializer(subm).data)
 
@@ -511,6 +526,7 @@ def import_submission(request, document_id, rpcapi: rpcapi_client.PurpleApi):
     if serializer.is_valid():
         with transaction.atomic():
             rfctobe = serializer.save()
+            PendingSubmission.objects.filter(datatracker_id=document_id).delete()
 
             # check for existing references where the new draft is the target
             # if "not-received" references exist, change them to "refqueue"
@@ -567,9 +583,9 @@ def import_submission(request, document_id, rpcapi: rpcapi_client.PurpleApi):
                     )
 
             # Find normative references and store them as RelatedDocs
-            # Get ref list from Datatracker
-            with datatracker_api():
-                references = rpcapi.get_draft_references(document_id)
+            # Get ref list from Datatracker, skipping any cached for another rev
+            invalidate_draft_references(document_id, draft.rev)
+            references = get_draft_references([document_id], rpcapi=rpcapi)[document_id]
             # Filter out I-Ds that already have an RfcToBe
             reference_ids = [s.id for s in references]
             existing_rfc_to_be = dict(
@@ -762,62 +778,57 @@ class QueueCounts(views.APIView):
         if cached is not None:
             return Response(cached)
 
-        enqueuing = RfcToBe.objects.filter(disposition__slug="created").count()
-        queue = RfcToBe.objects.filter(disposition__slug="in_progress").count()
         days_ago = datetime.date.today() - datetime.timedelta(days=30)
-        published = RfcToBe.objects.filter(
-            disposition__slug="published", published_at__gte=days_ago
-        ).count()
+        # Same conditions as in_queue().filter(finalapproval__isnull=False)
+        # .exclude(finalapproval__approved__isnull=True)
+        # .filter(assignment__role__slug="publisher")
+        # .exclude(assignment__state__in=ASSIGNMENT_INACTIVE_STATES)
         pending_announcement = (
-            RfcToBe.objects.in_queue()
-            .filter(finalapproval__isnull=False)
-            .exclude(finalapproval__approved__isnull=True)
-            .filter(assignment__role__slug="publisher")
-            .exclude(assignment__state__in=ASSIGNMENT_INACTIVE_STATES)
-            .distinct()
-            .count()
-        )
-        try:
-            rpcapi = get_rpcapi_client()
-            with datatracker_api():
-                submitted = rpcapi.submitted_to_rpc()
-            already_in_queue = set(
-                RfcToBe.objects.filter(
-                    draft__datatracker_id__in=[s.id for s in submitted]
-                ).values_list("draft__datatracker_id", flat=True)
+            Q(disposition__slug__in=("created", "in_progress"))
+            & Q(Exists(FinalApproval.objects.filter(rfc_to_be=OuterRef("pk"))))
+            & ~Q(
+                Exists(
+                    FinalApproval.objects.filter(
+                        rfc_to_be=OuterRef("pk"), approved__isnull=True
+                    )
+                )
             )
-            submissions = sum(1 for s in submitted if s.id not in already_in_queue)
-        except Exception:
-            submissions = None
+            & Q(
+                Exists(
+                    Assignment.objects.filter(
+                        rfc_to_be=OuterRef("pk"), role__slug="publisher"
+                    )
+                )
+            )
+            & ~Q(
+                Exists(
+                    Assignment.objects.filter(
+                        rfc_to_be=OuterRef("pk"), state__in=ASSIGNMENT_INACTIVE_STATES
+                    )
+                )
+            )
+        )
+        counts = RfcToBe.objects.aggregate(
+            enqueuing=Count("pk", filter=Q(disposition__slug="created")),
+            queue=Count("pk", filter=Q(disposition__slug="in_progress")),
+            published=Count(
+                "pk",
+                filter=Q(disposition__slug="published", published_at__gte=days_ago),
+            ),
+            pending_announcement=Count("pk", filter=pending_announcement),
+        )
+        submissions = PendingSubmission.objects.not_in_queue().count()
 
         data = QueueCountsSerializer(
             {
                 "submissions": submissions,
-                "enqueuing": enqueuing,
-                "queue": queue,
-                "pending_announcement": pending_announcement,
-                "published": published,
+                **counts,
             }
         ).data
         cache.set(self.CACHE_KEY, data, self.CACHE_TTL)
         return Response(data)
 
 
-def _collect_queue_person_ids(items) -> list[int]:
-    """Collect all DatatrackerPerson IDs from action holders and final approvals."""
-    ids: set[int] = set()
-    for item in items:
-        for ah in item.active_actionholders:
-            if ah.datatracker_person_id is not None:
-                ids.add(ah.datatracker_person.datatracker_id)
-        for fa in item.finalapproval_set.all():
-            if fa.approver_id is not None:
-                ids.add(fa.approver.datatracker_id)
-            if fa.overriding_approver_id is not None:
-                ids.add(fa.overriding_approver.datatracker_id)
-    return list(ids)
-
-
 class QueueList(ListAPIView):
     """Queue view for purple application"""
 
@@ -831,20 +842,29 @@ class QueueList(ListAPIView):
         .with_active_actionholders()
         .with_blocking_reasons()
         .with_final_approvals()
+        .with_cluster()
+        .with_pending_activities()
     )
     serializer_class = QueueItemSerializer
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = QueueFilter
+    snapshot_name = "rpc"
+
+    @classmethod
+    def build_queue_data(cls) -> list:
+        """Serialize the full, unfiltered queue"""
+        return cls.serializer_class(cls.queryset.all(), many=True).data
 
     def list(self, request, *args, **kwargs):
-        queryset = list(self.filter_queryset(self.get_queryset()))
-        DatatrackerPerson.warm_cache(_collect_queue_person_ids(queryset))
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        # The unfiltered JSON queue is served from a snapshot that is rebuilt
+        # only when queue data changes
+        if request.accepted_renderer.format == "json" and not set(
+            request.query_params
+        ) - {"format"}:
+            return get_queue_snapshot(
+                self.snapshot_name, self.build_queue_data
+            ).as_response(request)
+        return super().list(request, *args, **kwargs)
 
 
 QueueList = extend_schema_view(
@@ -869,7 +889,8 @@ class PublicQueueList(QueueList):
     permission_classes = [HasApiKey]
     api_key_endpoint = PUB_QUEUE_API_KEY_ENDPOINT
     serializer_class = PublicQueueItemSerializer
-    queryset = QueueList.queryset.prefetch_related(
+    snapshot_name = "public"
+    queryset = QueueList.queryset.with_authors().prefetch_related(
         Prefetch(
             "actionholder_set",
             queryset=ActionHolder.objects.select_related("datatracker_person").order_by(
@@ -879,7 +900,24 @@ class PublicQueueList(QueueList):
         ),
         Prefetch(
             "approvallogmessage_set",
-            queryset=ApprovalLogMessage.objects.order_by("-time"),
+            queryset=ApprovalLogMessage.objects.select_related(
+                "by__rpcperson"
+            ).order_by("-time"),
+        ),
+        Prefetch(
+            "rpcrelateddocument_set",
+            queryset=RpcRelatedDocument.objects.filter(
+                relationship_id__in=(
+                    PublicQueueItemSerializer.REFERENCE_RELATIONSHIP_SLUGS
+                )
+            )
+            .select_related(
+                "target_document",
+                "target_rfctobe__draft",
+                "target_rfctobe__disposition",
+            )
+            .with_target_status_annotated(),
+            to_attr="queue_references",
         ),
     )
 
@@ -1110,8 +1148,14 @@ class ClusterViewSet(
             )
 
         doc_map = {cluster_doc.doc.name: cluster_doc for cluster_doc in cluster_docs}
-
-        # Update cluster_order for each document
+        changed = []
+        for idx, draft_name in enumerate(draft_names, start=1):
+            doc = doc_map[draft_name]
+            if doc.order != idx:
+                doc.order = idx
+                changed.append(doc)
+
+        # Update cluster_order for all changed documents at once
         with transaction.atomic():
             # Null out order for inactive members (published/withdrawn) so they don't
             # collide with the sequential order values assigned to active members.
@@ -1119,11 +1163,9 @@ class ClusterViewSet(
                 doc__rfctobe__disposition__slug__in=DispositionName.ACTIVE_SLUGS
             ).update(order=None)
 
-            for idx, draft_name in enumerate(draft_names, start=1):
-                doc = doc_map[draft_name]
-                if doc.order != idx:
-                    doc.order = idx
-                    doc.save()
+            if changed:
+                bulk_update_with_history(changed, ClusterMember, ["order"])
+                cluster_members_bulk_updated(changed)
 
         cluster = (
             Cluster.objects.with_data_annotated()
@@ -1180,22 +1222,40 @@ class AssignmentViewSet(viewsets.ModelViewSet):
     ordering = ["-id"]
 
 
-class RfcToBeQueryParamsForm(forms.Form):
-    published_within_days = forms.IntegerField(required=False, min_value=0)
+HISTORY_PAGE_DEFAULT_LIMIT = 100
+HISTORY_PAGE_MAX_LIMIT = 1000
+
 
+class HistoryQueryParamsForm(forms.Form):
+    before = forms.DateTimeField(required=False)
+    after = forms.DateTimeField(required=False)
+    model = forms.MultipleChoiceField(
+        choices=[(model, model) for model in HISTORY_MODELS], required=False
+    )
+    limit = forms.IntegerField(
+        min_value=1, max_value=HISTORY_PAGE_MAX_LIMIT, required=False
+    )
 
-def _collect_document_person_ids(items) -> list[int]:
-    """Collect all DatatrackerPerson IDs from authors, shepherd, IESG contact, and
-    stream manager."""
-    ids: set[int] = set()
-    for item in items:
-        for author in item.authors.all():
-            if author.datatracker_person_id is not None:
-                ids.add(author.datatracker_person.datatracker_id)
-        for person in (item.iesg_contact, item.shepherd, item.stream_manager):
-            if person is not None:
-                ids.add(person.datatracker_id)
-    return list(ids)
+
+TYPEAHEAD_DEFAULT_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+
+
+class TypeaheadQueryParamsForm(forms.Form):
+    q = forms.CharField(max_length=200)
+    limit = forms.IntegerField(
+        min_value=1, max_value=TYPEAHEAD_MAX_LIMIT, required=False
+    )
+
+    def clean_q(self):
+        q = self.cleaned_data["q"]
+        if not q.isprintable():
+            raise forms.ValidationError("Invalid characters in search query.")
+        return q
+
+
+class RfcToBeQueryParamsForm(forms.Form):
+    published_within_days = forms.IntegerField(required=False, min_value=0)
 
 
 def _rfc_numbers_for_relationship(rfctobe: RfcToBe, relationship_id: str) -> list[int]:
@@ -1254,25 +1314,7 @@ class RfcToBeViewSet(viewsets.ModelViewSet):
     filterset_fields = ["disposition"]
     ordering_fields = ["id", "published_at", "draft__name"]
     ordering = ["-id"]
-    pagination_class = DefaultLimitOffsetPagination
-
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            DatatrackerPerson.warm_cache(_collect_document_person_ids(page))
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        items = list(queryset)
-        DatatrackerPerson.warm_cache(_collect_document_person_ids(items))
-        serializer = self.get_serializer(items, many=True)
-        return Response(serializer.data)
-
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        DatatrackerPerson.warm_cache(_collect_document_person_ids([instance]))
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+    pagination_class = KeysetLimitOffsetPagination
 
     def get_object(self):
         lookup_value = self.kwargs.get(self.lookup_field)
@@ -1292,12 +1334,69 @@ class RfcToBeViewSet(viewsets.ModelViewSet):
             raise serializers.ValidationError(form.errors)
         return queryset
 
-    @extend_schema(responses=HistorySerializer(many=True))
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="before",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Only include history before this time.",
+            ),
+            OpenApiParameter(
+                name="after",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Only include history after this time.",
+            ),
+            OpenApiParameter(
+                name="model",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                many=True,
+                enum=HISTORY_MODELS,
+                description="Only include history of these models.",
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Number of results to return per page.",
+            ),
+        ],
+        responses=HistoryPageSerializer,
+    )
     @action(detail=True, pagination_class=None, filter_backends=[])
     def history(self, request, draft__name=None):
+        """Most recent history of a document, newest first
+
+        Follow the next link to get older history.
+        """
         rfc_to_be = self.get_object()
-        records = collect_rfctobe_history(rfc_to_be)
-        return Response([HistorySerializer(r).data for r in records])
+        form = HistoryQueryParamsForm(request.query_params)
+        if not form.is_valid():
+            raise serializers.ValidationError(form.errors)
+        page = rfctobe_history_page(
+            rfc_to_be,
+            limit=form.cleaned_data["limit"] or HISTORY_PAGE_DEFAULT_LIMIT,
+            before=form.cleaned_data["before"],
+            after=form.cleaned_data["after"],
+            models=form.cleaned_data["model"] or None,
+        )
+        next_url = None
+        if page.next_before is not None:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "before", page.next_before.isoformat()
+            )
+        return Response(
+            {
+                "next": next_url,
+                "results": [HistorySerializer(r).data for r in page.records],
+            }
+        )
 
     @extend_schema(
         operation_id="documents_publish",
@@ -1521,39 +1620,7 @@ class RfcToBeViewSet(viewsets.ModelViewSet):
                 {"error": "Search query too long (max 200 characters)"}, status=400
             )
 
-        # Check if query looks like an RFC number, cluster number, or subseries number
-        rfc_number = None
-        cluster_number = None
-        subseries_type = None
-        subseries_number = None
-        if query.isdigit():
-            rfc_number = int(query)
-        elif query.lower().startswith("rfc") and query[3:].strip().isdigit():
-            rfc_number = int(query[3:])
-        elif query.lower().startswith("c") and query[1:].isdigit():
-            cluster_number = int(query[1:])
-        else:
-            # hardcoded regex for subseries to avoid additional query overhead getting
-            # subseries types dynamically; needs update if new subseries types are added
-            subseries_match = re.match(r"^(bcp|std|fyi)\s*(\d+)$", query.lower())
-            if subseries_match:
-                subseries_type = subseries_match.group(1)
-                subseries_number = int(subseries_match.group(2))
-
-        q_filter = Q(draft__name__icontains=query) | Q(
-            authors__titlepage_name__icontains=query
-        )
-        if rfc_number:
-            q_filter |= Q(rfc_number=rfc_number)
-        if cluster_number:
-            q_filter |= Q(draft__clustermember__cluster__number=cluster_number)
-        if subseries_type and subseries_number:
-            q_filter |= Q(
-                subseriesmember__type__slug=subseries_type,
-                subseriesmember__number=subseries_number,
-            )
-
-        queryset = RfcToBe.objects.filter(q_filter).distinct().order_by("-id")
+        queryset = search_rfctobes(query).order_by("-rank", "-id")
         if disposition:
             queryset = queryset.filter(disposition_id=disposition)
 
@@ -1565,6 +1632,45 @@ class RfcToBeViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    @extend_schema(
+        operation_id="documents_typeahead",
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Start of a draft name, RFC number, cluster number or "
+                "subseries number (e.g., 'draft-ietf-ex', 'rfc99', 'c12', 'bcp1')",
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Maximum number of suggestions to return.",
+            ),
+        ],
+        responses=TypeaheadSuggestionSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="typeahead",
+        pagination_class=None,
+        filter_backends=[],
+    )
+    def typeahead(self, request):
+        """Suggest documents for a partially typed name or number"""
+        form = TypeaheadQueryParamsForm(request.query_params)
+        if not form.is_valid():
+            raise serializers.ValidationError(form.errors)
+        suggestions = typeahead_suggestions(
+            form.cleaned_data["q"],
+            limit=form.cleaned_data["limit"] or TYPEAHEAD_DEFAULT_LIMIT,
+        )
+        return Response(TypeaheadSuggestionSerializer(suggestions, many=True).data)
+
 
 @extend_schema_with_draft_name()
 class RpcAuthorViewSet(viewsets.ModelViewSet):
@@ -1873,9 +1979,38 @@ class RpcRoleViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = RpcRoleSerializer
 
 
+class LabelStatsQueryParamsForm(forms.Form):
+    since = forms.DateTimeField(required=False)
+    until = forms.DateTimeField(required=False)
+    document = SimpleArrayField(forms.IntegerField(), required=False)
+
+
 class StatsLabels(views.APIView):
     @extend_schema(
         operation_id="stats_labels",
+        parameters=[
+            OpenApiParameter(
+                name="since",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Only count time with a label after this time.",
+            ),
+            OpenApiParameter(
+                name="until",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Only count time with a label before this time.",
+            ),
+            OpenApiParameter(
+                name="document",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Comma-separated RfcToBe ids to limit results to.",
+            ),
+        ],
         responses=inline_serializer(
             name="LabelStats",
             fields={
@@ -1892,25 +2027,18 @@ class StatsLabels(views.APIView):
         ),
     )
     def get(self, request):
-        results = []
-        for rtb in RfcToBe.objects.all():
-            for label in Label.objects.all():
-                seconds_with_label = sum(
-                    [
-                        interval.end - interval.start
-                        for interval in rtb.time_intervals_with_label(label)
-                    ],
-                    start=datetime.timedelta(0),
-                ).total_seconds()
-                if seconds_with_label > 0:
-                    results.append(
-                        {
-                            "document_id": rtb.pk,
-                            "label_id": label.pk,
-                            "seconds": seconds_with_label,
-                        }
-                    )
-        return Response({"label_stats": results})
+        form = LabelStatsQueryParamsForm(request.query_params)
+        if not form.is_valid():
+            raise serializers.ValidationError(form.errors)
+        return Response(
+            {
+                "label_stats": label_stats(
+                    document_ids=form.cleaned_data["document"] or None,
+                    since=form.cleaned_data["since"],
+                    until=form.cleaned_data["until"],
+                )
+            }
+        )
 
 
 class UnusableRfcNumberViewSet(viewsets.ModelViewSet):
@@ -1993,7 +2121,7 @@ class DocumentCommentViewSet(
 
     queryset = RpcDocumentComment.objects.all()
     serializer_class = DocumentCommentSerializer
-    pagination_class = DefaultLimitOffsetPagination
+    pagination_class = KeysetLimitOffsetPagination
 
     def get_queryset(self):
         """Get queryset consisting of all comments for a given draft-name
@@ -30,9 +30,12 @@ def _get_cf_headers(url: str) -> dict:
     return {}
 
 
-def datatracker_name(namemodel: str, slug: str) -> tuple[str, str, str]:
+def datatracker_name(
+    namemodel: str, slug: str, *, refresh=False
+) -> tuple[str, str, str]:
+    """Get a name from the datatracker (uses cache unless refresh is True)"""
     cache_key = f"dt_name:{namemodel}:{slug}"
-    cached = cache.get(cache_key)
+    cached = None if refresh else cache.get(cache_key)
     if cached is not None:
         return cached
     url = f"{settings.DATATRACKER_API_V1_BASE}/name/{namemodel}"
@@ -57,10 +60,13 @@ def datatracker_streamname(slug: str) -> tuple[str, str, str]:
     return datatracker_name("streamname", slug)
 
 
-def _fetch_group_object(acronym: str) -> dict | None:
-    """Fetch the group object from the datatracker API for a given acronym."""
+def fetch_group_object(acronym: str, *, refresh=False) -> dict | None:
+    """Fetch the group object from the datatracker API for a given acronym.
+
+    Uses cache unless refresh is True.
+    """
     cache_key = f"dt_group_object:{acronym}"
-    cached = cache.get(cache_key)
+    cached = None if refresh else cache.get(cache_key)
     if cached is not None:
         return cached
     url = f"{settings.DATATRACKER_API_V1_BASE}/group/group/"
@@ -74,13 +80,13 @@ def _fetch_group_object(acronym: str) -> dict | None:
 
 def datatracker_group_list_email(acronym: str) -> str | None:
     """Return the mailing list email for a group, or None if not found."""
-    obj = _fetch_group_object(acronym)
+    obj = fetch_group_object(acronym)
     return obj.get("list_email") or None if obj else None
 
 
 def datatracker_group_name(acronym: str) -> str | None:
     """Return the full name of a group, or None if not found."""
-    obj = _fetch_group_object(acronym)
+    obj = fetch_group_object(acronym)
     return obj.get("name") or None if obj else None
 
 
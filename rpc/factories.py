@@ -13,6 +13,7 @@ from .models import (
     DispositionName,
     FinalApproval,
     Label,
+    PendingSubmission,
     PublicationAttempt,
     PublishedFormatName,
     RfcAuthor,
@@ -201,6 +202,16 @@ class FinalApprovalFactory(factory.django.DjangoModelFactory):
     approver = factory.SubFactory("datatracker.factories.DatatrackerPersonFactory")
 
 
+class PendingSubmissionFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = PendingSubmission
+
+    datatracker_id = factory.Sequence(lambda n: 20_000_000 + n)
+    name = factory.Sequence(lambda n: f"draft-pending-submission-{n}")
+    stream = "ietf"
+    submitted = factory.Faker("date_time", tzinfo=datetime.UTC)
+
+
 class SourceFormatNameFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = SourceFormatName
@@ -0,0 +1,757 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+"""History of an RfcToBe and its related models
+
+The history of an RfcToBe is merged from the simple-history tables of RfcToBe and
+of the models related to it. Each table is read newest-first in chunks and the
+tables are merged by date. Objects that the history refers to are loaded in bulk
+for each chunk, so the number of queries does not grow with the length of the
+history.
+
+History only ever grows, so the newest records of the rendered history of each
+RfcToBe are cached along with the greatest history_id and the number of rows of
+each table that they cover. Later requests only describe the history rows added
+since then (see
+_cached_history_feed()). A page of history that is not cached is served by
+reading the tables only until the page is full (see rfctobe_history_page()).
+"""
+
+import datetime
+import heapq
+import logging
+import pickle
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, replace
+from itertools import chain
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F, Func, OuterRef, Q, QuerySet, Subquery
+from django.utils import timezone
+
+from datatracker.models import DatatrackerPerson, Document
+
+from .models import (
+    Assignment,
+    BlockingReason,
+    Cluster,
+    ClusterMember,
+    FinalApproval,
+    Label,
+    RfcAuthor,
+    RfcToBe,
+    RfcToBeBlockingReason,
+    RpcPerson,
+    RpcRelatedDocument,
+    SubseriesMember,
+)
+from .serializers import HistoryRecord
+
+logger = logging.getLogger(__name__)
+
+# History rows read from each table at a time
+HISTORY_CHUNK_SIZE = 100
+
+_PERSON_FK_FIELDS = ("stream_manager", "iesg_contact", "shepherd")
+
+
+def _changed_field(fields: list[str]) -> str | None:
+    return fields[0].removesuffix("_id") if len(fields) == 1 else None
+
+
+def _describe_changes(delta) -> list[str]:
+    return [
+        f"{c.field.capitalize()} ({c.old} → {c.new}): Changed" for c in delta.changes
+    ]
+
+
+class _HistorySource:
+    """History of one model, read newest-first in chunks
+
+    Subclasses describe the history records of their model. HistoryRecord.model is
+    set to the model attribute, and HistoryRecord.field to the field attribute if
+    it is set.
+    """
+
+    model: str
+    field: str | None = None
+    created_desc = "Added"
+
+    def __init__(self, history: QuerySet, people: dict):
+        self.history = history
+        # history_user_id -> DatatrackerPerson, shared by all sources
+        self.people = people
+
+    def preload(self, rows: list):
+        """Load the objects that rows refer to in bulk"""
+
+    def prefix(self, h) -> str | None:
+        return None
+
+    def describe_changes(self, newer, older) -> tuple[list[str], str | None]:
+        """Describe changes between two history rows of an instance
+
+        Returns the descriptions and the name of the changed field if only one
+        field changed.
+        """
+        delta = newer.diff_against(older)
+        return _describe_changes(delta), _changed_field(
+            [c.field for c in delta.changes]
+        )
+
+    def rows(
+        self,
+        after_history_id: int | None = None,
+        since: datetime.datetime | None = None,
+        before: datetime.datetime | None = None,
+        chunk_size: int = HISTORY_CHUNK_SIZE,
+    ) -> Iterator:
+        """Yield history rows newest first, only those after after_history_id if given
+
+        Rows dated since since are yielded as well, whatever their history_id.
+        Only rows dated before before are yielded, if given. Each row's
+        previous_row attribute is set to the previous history row for the same
+        instance, or None if there is none.
+        """
+        history_model = self.history.model
+        previous_rows = history_model.objects.filter(id=OuterRef("id")).filter(
+            Q(history_date__lt=OuterRef("history_date"))
+            | Q(
+                history_date=OuterRef("history_date"),
+                history_id__lt=OuterRef("history_id"),
+            )
+        )
+        qs = self.history.annotate(
+            previous_history_id=Subquery(
+                previous_rows.order_by("-history_date", "-history_id").values(
+                    "history_id"
+                )[:1]
+            )
+        ).order_by("-history_date", "-history_id")
+        if after_history_id is not None:
+            new_rows = Q(history_id__gt=after_history_id)
+            if since is not None:
+                new_rows |= Q(history_date__gte=since)
+            qs = qs.filter(new_rows)
+        if before is not None:
+            qs = qs.filter(history_date__lt=before)
+        while True:
+            chunk = list(qs[:chunk_size])
+            if not chunk:
+                return
+            previous = history_model.objects.in_bulk(
+                {h.previous_history_id for h in chunk} - {None}
+            )
+            for h in chunk:
+                h.previous_row = previous.get(h.previous_history_id)
+            self._preload_people(chunk)
+            self.preload(chunk + list(previous.values()))
+            yield from chunk
+            if len(chunk) < chunk_size:
+                return
+            last = chunk[-1]
+            qs = qs.filter(
+                Q(history_date__lt=last.history_date)
+                | Q(history_date=last.history_date, history_id__lt=last.history_id)
+            )
+
+    def _preload_people(self, rows: list):
+        user_ids = {h.history_user_id for h in rows} - {None} - self.people.keys()
+        for user_id, user in get_user_model().objects.in_bulk(user_ids).items():
+            self.people[user_id] = user.datatracker_person()
+
+    def record(self, h) -> HistoryRecord | None:
+        """Describe a history row, or None if there is nothing to say about it"""
+        field = None
+        if h.history_type == "-":
+            parts = [h.history_change_reason or "Removed"]
+        elif h.previous_row is None:
+            parts = [h.history_change_reason or self.created_desc]
+        else:
+            parts, field = self.describe_changes(h, h.previous_row)
+            if not parts and h.history_change_reason:
+                parts = [h.history_change_reason]
+        if not parts:
+            return None
+        desc = "; ".join(parts)
+        prefix = self.prefix(h)
+        if prefix is not None:
+            desc = f"{prefix}: {desc}"
+        return HistoryRecord.from_simple_history(
+            h, desc, model=self.model, field=self.field or field, people=self.people
+        )
+
+
+class _RfcToBeHistory(_HistorySource):
+    model = "rfctobe"
+    created_desc = "Record created"
+
+    def __init__(self, history, people):
+        super().__init__(history, people)
+        self.persons = {}
+        # history_id -> label ids
+        self.labels_by_history_id: dict[int, set[int]] = defaultdict(set)
+        # label id -> [(history_date, slug or None if deleted)], oldest first
+        self.label_slugs: dict[int, list] | None = None
+
+    def preload(self, rows):
+        self.persons.update(
+            DatatrackerPerson.objects.in_bulk(
+                {getattr(h, f"{field}_id") for h in rows for field in _PERSON_FK_FIELDS}
+                - {None}
+                - self.persons.keys()
+            )
+        )
+        HistoricalRfcToBeLabel = apps.get_model("rpc", "HistoricalRfcToBeLabel")
+        for history_id, label_id in HistoricalRfcToBeLabel.objects.filter(
+            history_id__in=[h.history_id for h in rows], label__isnull=False
+        ).values_list("history_id", "label_id"):
+            self.labels_by_history_id[history_id].add(label_id)
+
+    def _person_label(self, pk) -> str:
+        """Resolve a DatatrackerPerson pk to 'Name (#datatracker_id)'"""
+        if pk is None:
+            return "none"
+        person = self.persons.get(pk)
+        if person is None:
+            return f"#{pk}"
+        return f"{person.plain_name} (#{person.datatracker_id})"
+
+    def _label_slug_as_of(self, label_id, date) -> str | None:
+        if self.label_slugs is None:
+            self.label_slugs = defaultdict(list)
+            for pk, slug, history_date, history_type in Label.history.order_by(
+                "history_date", "history_id"
+            ).values_list("id", "slug", "history_date", "history_type"):
+                self.label_slugs[pk].append(
+                    (history_date, None if history_type == "-" else slug)
+                )
+        slug = None
+        for history_date, hist_slug in self.label_slugs.get(label_id, []):
+            if history_date > date:
+                break
+            slug = hist_slug
+        return slug
+
+    def describe_changes(self, newer, older):
+        delta = newer.diff_against(older, excluded_fields=["labels"])
+        parts = []
+        for change in delta.changes:
+            display_field = change.field.removesuffix("_id")
+            if display_field in _PERSON_FK_FIELDS:
+                old_label = self._person_label(change.old)
+                new_label = self._person_label(change.new)
+                parts.append(
+                    f"{display_field.capitalize()} ({old_label} → {new_label}): Changed"
+                )
+            else:
+                parts.append(
+                    f"{change.field.capitalize()} ({change.old} → {change.new}): "
+                    "Changed"
+                )
+        changed_fields = [c.field for c in delta.changes]
+        new_labels = self.labels_by_history_id.get(newer.history_id, set())
+        old_labels = self.labels_by_history_id.get(older.history_id, set())
+        if new_labels != old_labels:
+            changed_fields.append("labels")
+            for label_ids, verb in (
+                (new_labels - old_labels, "Added"),
+                (old_labels - new_labels, "Removed"),
+            ):
+                for label_id in sorted(label_ids):
+                    slug = self._label_slug_as_of(label_id, newer.history_date)
+                    if slug is not None:
+                        parts.append(f"Label ({slug}): {verb}")
+        return parts, _changed_field(changed_fields)
+
+
+class _AssignmentHistory(_HistorySource):
+    model = "assignment"
+
+    def __init__(self, history, people):
+        super().__init__(history, people)
+        self.rpc_persons = {}
+
+    def preload(self, rows):
+        self.rpc_persons.update(
+            RpcPerson.objects.select_related("datatracker_person").in_bulk(
+                {h.person_id for h in rows} - {None} - self.rpc_persons.keys()
+            )
+        )
+
+    def prefix(self, h):
+        # RpcRole pk is its slug
+        role_slug = str(h.role_id) if h.role_id else "unknown"
+        rpc_person = self.rpc_persons.get(h.person_id)
+        try:
+            person_name = rpc_person.datatracker_person.plain_name
+        except Exception:
+            person_name = None
+        person_part = f", {person_name}" if person_name else ""
+        return f"Assignment ({role_slug}{person_part})"
+
+
+class _SubseriesHistory(_HistorySource):
+    model = "subseries"
+
+    def prefix(self, h):
+        # SubseriesTypeName pk is its slug
+        return f"Subseries ({str(h.type_id).upper()} {h.number})"
+
+
+class _RelatedDocumentHistory(_HistorySource):
+    model = "reference"
+
+    def __init__(self, history, people):
+        super().__init__(history, people)
+        self.documents = {}
+        self.rfctobes = {}
+
+    def preload(self, rows):
+        self.documents.update(
+            Document.objects.in_bulk(
+                {h.target_document_id for h in rows} - {None} - self.documents.keys()
+            )
+        )
+        self.rfctobes.update(
+            RfcToBe.objects.select_related("draft").in_bulk(
+                {h.target_rfctobe_id for h in rows} - {None} - self.rfctobes.keys()
+            )
+        )
+
+    def prefix(self, h):
+        # DocRelationshipName pk is its slug
+        rel_slug = str(h.relationship_id)
+        target = None
+        if h.target_document_id:
+            if h.target_document_id in self.documents:
+                target = self.documents[h.target_document_id].name
+            else:
+                target = f"doc#{h.target_document_id}"
+        elif h.target_rfctobe_id:
+            rt = self.rfctobes.get(h.target_rfctobe_id)
+            if rt is not None:
+                target = rt.name or (
+                    f"RFC {rt.rfc_number}" if rt.rfc_number else f"#{rt.pk}"
+                )
+            else:
+                target = f"#{h.target_rfctobe_id}"
+        return f"Reference ({rel_slug}{', ' + target if target else ''})"
+
+
+class _ClusterMemberHistory(_HistorySource):
+    model = "cluster_member"
+
+    def __init__(self, history, people):
+        super().__init__(history, people)
+        self.clusters = {}
+
+    def preload(self, rows):
+        self.clusters.update(
+            Cluster.objects.in_bulk(
+                {h.cluster_id for h in rows} - {None} - self.clusters.keys()
+            )
+        )
+
+    def prefix(self, h):
+        if h.cluster_id in self.clusters:
+            return f"Cluster membership (cluster #{self.clusters[h.cluster_id].number})"
+        return "Cluster membership"
+
+
+class _FinalApprovalHistory(_HistorySource):
+    model = "final_approval"
+
+    def __init__(self, history, people):
+        super().__init__(history, people)
+        self.approvers = {}
+
+    def preload(self, rows):
+        self.approvers.update(
+            DatatrackerPerson.objects.in_bulk(
+                {h.approver_id for h in rows} - {None} - self.approvers.keys()
+            )
+        )
+
+    def prefix(self, h):
+        if h.approver_id in self.approvers:
+            return f"Final approval ({self.approvers[h.approver_id].plain_name})"
+        return "Final approval"
+
+
+class _RfcAuthorHistory(_HistorySource):
+    model = "rfc_author"
+    field = "titlepage_author"
+
+    def prefix(self, h):
+        return f"Author ({h.titlepage_name})"
+
+
+class _BlockingReasonHistory(_HistorySource):
+    model = "blocking_reason"
+
+    def __init__(self, history, people):
+        super().__init__(history, people)
+        self.reason_slugs = None
+
+    def prefix(self, h):
+        if self.reason_slugs is None:
+            self.reason_slugs = set(BlockingReason.objects.values_list("pk", flat=True))
+        # BlockingReason pk is its slug
+        if h.reason_id in self.reason_slugs:
+            return f"Blocking reason ({h.reason_id})"
+        return "Blocking reason"
+
+
+# HistoryRecord.model values of the history of an RfcToBe
+HISTORY_MODELS = (
+    "rfctobe",
+    "assignment",
+    "subseries",
+    "reference",
+    "cluster_member",
+    "final_approval",
+    "rfc_author",
+    "blocking_reason",
+)
+
+
+def _history_sources(rfc_to_be: RfcToBe) -> list[_HistorySource]:
+    people = {}
+    sources = [
+        _RfcToBeHistory(RfcToBe.history.filter(id=rfc_to_be.pk), people),
+        _AssignmentHistory(Assignment.history.filter(rfc_to_be=rfc_to_be.pk), people),
+        _SubseriesHistory(
+            SubseriesMember.history.filter(rfc_to_be=rfc_to_be.pk), people
+        ),
+        _RelatedDocumentHistory(
+            RpcRelatedDocument.history.filter(source=rfc_to_be.pk), people
+        ),
+        _FinalApprovalHistory(
+            FinalApproval.history.filter(rfc_to_be=rfc_to_be.pk), people
+        ),
+        _RfcAuthorHistory(RfcAuthor.history.filter(rfc_to_be=rfc_to_be.pk), people),
+        _BlockingReasonHistory(
+            RfcToBeBlockingReason.history.filter(rfc_to_be=rfc_to_be.pk), people
+        ),
+    ]
+    if rfc_to_be.draft_id:
+        sources.append(
+            _ClusterMemberHistory(
+                ClusterMember.history.filter(doc=rfc_to_be.draft_id), people
+            )
+        )
+    return sources
+
+
+def _merged_rows(
+    sources,
+    high_water_marks=None,
+    since=None,
+    before=None,
+    chunk_size=HISTORY_CHUNK_SIZE,
+) -> Iterator:
+    """Merge the rows of sources, newest first, as (source, row) pairs
+
+    Only rows newer than high_water_marks or dated since since are included, if
+    given, and only rows dated before before. Rows are read lazily, chunk_size
+    rows of a source at a time.
+    """
+    high_water_marks = high_water_marks or {}
+    return heapq.merge(
+        *(
+            (
+                (source, h)
+                for h in source.rows(
+                    after_history_id=high_water_marks.get(source.model),
+                    since=since,
+                    before=before,
+                    chunk_size=chunk_size,
+                )
+            )
+            for source in sources
+        ),
+        key=lambda item: (item[1].history_date, item[1].history_id),
+        reverse=True,
+    )
+
+
+def _read_records(
+    sources, before=None, chunk_size=HISTORY_CHUNK_SIZE
+) -> Iterator[HistoryRecord]:
+    """Describe the history rows of sources, newest first, reading them lazily"""
+    for source, h in _merged_rows(sources, before=before, chunk_size=chunk_size):
+        record = source.record(h)
+        if record is not None:
+            yield record
+
+
+def _high_water_marks(
+    rfc_to_be: RfcToBe, sources
+) -> tuple[dict[str, int | None], dict[str, int]]:
+    """Greatest history_id and number of history rows of each source
+
+    The greatest history_id is None for sources without history.
+    """
+    marks = (
+        RfcToBe.objects.filter(pk=rfc_to_be.pk)
+        .values(
+            **{
+                f"{source.model}_high_water_mark": Subquery(
+                    source.history.order_by("-history_id").values("history_id")[:1]
+                )
+                for source in sources
+            },
+            **{
+                f"{source.model}_row_count": Subquery(
+                    source.history.order_by()
+                    .annotate(count=Func(F("history_id"), function="COUNT"))
+                    .values("count")
+                )
+                for source in sources
+            },
+        )
+        .get()
+    )
+    return (
+        {source.model: marks[f"{source.model}_high_water_mark"] for source in sources},
+        {source.model: marks[f"{source.model}_row_count"] for source in sources},
+    )
+
+
+@dataclass
+class _HistoryFeed:
+    # HistoryRecord.model -> greatest history_id described by records
+    high_water_marks: dict[str, int | None]
+    # newest first
+    records: list[HistoryRecord]
+    # HistoryRecord.model -> number of history rows described by records
+    row_counts: dict[str, int] | None = None
+    # when the history rows were last read
+    checked_at: datetime.datetime | None = None
+    # records holds all records dated since this, older ones must be read from
+    # the history tables; None if records holds the whole history
+    covers_since: datetime.datetime | None = None
+
+
+HISTORY_FEED_CACHE_KEY = "rfctobe_history_feed:{pk}:{draft_id}"
+HISTORY_FEED_CACHE_TTL = 24 * 60 * 60  # seconds
+# Only the newest records of a history are cached, older ones are read from the
+# history tables when they are asked for
+HISTORY_FEED_CACHE_RECORDS = 500
+# memcached does not store items over 1 MB by default
+HISTORY_FEED_CACHE_MAX_SIZE = 1000 * 1000  # bytes
+# History rows dated this long before the feed was last brought up to date are
+# read again, in case their transaction committed after a higher history_id did
+HISTORY_FEED_OVERLAP = datetime.timedelta(minutes=10)
+
+
+def _history_feed_cache_key(rfc_to_be: RfcToBe) -> str:
+    return HISTORY_FEED_CACHE_KEY.format(pk=rfc_to_be.pk, draft_id=rfc_to_be.draft_id)
+
+
+def _cache_history_feed(rfc_to_be: RfcToBe, feed: _HistoryFeed):
+    """Cache the newest HISTORY_FEED_CACHE_RECORDS records of a history"""
+    if len(feed.records) > HISTORY_FEED_CACHE_RECORDS:
+        left_out = feed.records[HISTORY_FEED_CACHE_RECORDS].date
+        # records from the same date as one left out are left out as well
+        records = [
+            record
+            for record in feed.records[:HISTORY_FEED_CACHE_RECORDS]
+            if record.date > left_out
+        ]
+        feed = replace(
+            feed,
+            records=records,
+            covers_since=(
+                records[-1].date
+                if records
+                else left_out + datetime.timedelta(microseconds=1)
+            ),
+        )
+    size = len(pickle.dumps(feed, pickle.HIGHEST_PROTOCOL))
+    if size > HISTORY_FEED_CACHE_MAX_SIZE:
+        logger.warning(
+            "Not caching history of RfcToBe %d, %d bytes is too large",
+            rfc_to_be.pk,
+            size,
+        )
+        return
+    cache.set(_history_feed_cache_key(rfc_to_be), feed, HISTORY_FEED_CACHE_TTL)
+
+
+def _cached_history_feed(rfc_to_be: RfcToBe, sources) -> _HistoryFeed | None:
+    """Get the cached history of an RfcToBe brought up to date, None if not cached
+
+    History only ever grows, so only history rows that were added since the
+    cached history was rendered are described and added to it. History ids are
+    not committed in order, so rows from the overlap window before the history
+    was last brought up to date are read again and added if they are new.
+    Only the newest records may be cached, see _HistoryFeed.covers_since.
+    """
+    feed = cache.get(_history_feed_cache_key(rfc_to_be))
+    if not isinstance(feed, _HistoryFeed):
+        return None
+    checked_at = timezone.now()
+    marks, row_counts = _high_water_marks(rfc_to_be, sources)
+    if feed.high_water_marks == marks and feed.row_counts == row_counts:
+        return feed
+    since = None
+    if feed.checked_at is not None:
+        since = feed.checked_at - HISTORY_FEED_OVERLAP
+    described = {(record.model, record.id) for record in feed.records}
+    new_records = []
+    for source, h in _merged_rows(sources, feed.high_water_marks, since):
+        if (source.model, h.history_id) in described:
+            continue
+        record = source.record(h)
+        if record is None:
+            continue
+        if feed.covers_since is not None and record.date < feed.covers_since:
+            continue  # older than the cached records, read with them
+        new_records.append(record)
+    feed = _HistoryFeed(
+        high_water_marks=marks,
+        records=sorted(
+            new_records + feed.records, key=lambda r: (r.date, r.id), reverse=True
+        ),
+        row_counts=row_counts,
+        checked_at=checked_at,
+        covers_since=feed.covers_since,
+    )
+    _cache_history_feed(rfc_to_be, feed)
+    return feed
+
+
+def _history_feed(rfc_to_be: RfcToBe) -> _HistoryFeed:
+    """Get the whole history of an RfcToBe, the newest of it from the cache"""
+    sources = _history_sources(rfc_to_be)
+    feed = _cached_history_feed(rfc_to_be, sources)
+    if feed is None:
+        checked_at = timezone.now()
+        marks, row_counts = _high_water_marks(rfc_to_be, sources)
+        feed = _HistoryFeed(
+            high_water_marks=marks,
+            records=list(_read_records(sources)),
+            row_counts=row_counts,
+            checked_at=checked_at,
+        )
+        _cache_history_feed(rfc_to_be, feed)
+    elif feed.covers_since is not None:
+        feed = replace(
+            feed,
+            records=feed.records
+            + list(_read_records(sources, before=feed.covers_since)),
+            covers_since=None,
+        )
+    return feed
+
+
+def _page_cursor(date: datetime.datetime) -> datetime.datetime:
+    # Truncated to milliseconds, the precision of dates in JavaScript clients
+    return date.replace(microsecond=date.microsecond // 1000 * 1000)
+
+
+@dataclass
+class HistoryPage:
+    records: list[HistoryRecord]
+    # Pass as before to get the next page, None if this is the last page
+    next_before: datetime.datetime | None
+
+
+def rfctobe_history_page(
+    rfc_to_be: RfcToBe,
+    limit: int,
+    *,
+    before: datetime.datetime | None = None,
+    after: datetime.datetime | None = None,
+    models: Iterable[str] | None = None,
+) -> HistoryPage:
+    """Get up to limit of the most recent history records of an RfcToBe
+
+    Only history from between after and before is included, if given, and only
+    for the models in models (see HISTORY_MODELS). A page may run over limit so
+    that it does not split records from the same millisecond between pages.
+
+    The page is served from the cached history if there is one, reading history
+    older than the cached records from the history tables. Otherwise only as
+    many history rows as the page needs are read and described, and the first
+    page is cached.
+    """
+    if models is not None:
+        models = set(models)
+    sources = _history_sources(rfc_to_be)
+
+    def _read_page_records(before):
+        return _read_records(
+            [s for s in sources if models is None or s.model in models],
+            before=before,
+            chunk_size=min(limit + 1, HISTORY_CHUNK_SIZE),
+        )
+
+    feed = _cached_history_feed(rfc_to_be, sources)
+    if feed is not None:
+        records = feed.records
+        if feed.covers_since is not None:
+            records = chain(
+                records,
+                _read_page_records(
+                    feed.covers_since
+                    if before is None
+                    else min(before, feed.covers_since)
+                ),
+            )
+        return _history_page(records, limit, before=before, after=after, models=models)
+
+    is_first_page = before is None and after is None and models is None
+    if is_first_page:
+        checked_at = timezone.now()
+        marks, row_counts = _high_water_marks(rfc_to_be, sources)
+    page = _history_page(
+        _read_page_records(before), limit, before=before, after=after, models=models
+    )
+    if is_first_page:
+        # a page holds all records from its oldest record's date onwards
+        _cache_history_feed(
+            rfc_to_be,
+            _HistoryFeed(
+                high_water_marks=marks,
+                records=page.records,
+                row_counts=row_counts,
+                checked_at=checked_at,
+                covers_since=page.records[-1].date if page.next_before else None,
+            ),
+        )
+    return page
+
+
+def _history_page(
+    records: Iterable[HistoryRecord],
+    limit: int,
+    *,
+    before: datetime.datetime | None,
+    after: datetime.datetime | None,
+    models: set[str] | None,
+) -> HistoryPage:
+    """Take a page of history from records, newest first"""
+    page = []
+    last_cursor = None
+    for record in records:
+        if before is not None and record.date >= before:
+            continue
+        if after is not None and record.date <= after:
+            break
+        if models is not None and record.model not in models:
+            continue
+        cursor = _page_cursor(record.date)
+        if len(page) >= limit and cursor != last_cursor:
+            return HistoryPage(records=page, next_before=last_cursor)
+        last_cursor = cursor
+        page.append(record)
+    return HistoryPage(records=page, next_before=None)
+
+
+def collect_rfctobe_history(rfc_to_be: RfcToBe) -> list[HistoryRecord]:
+    """Collect and merge all history for an RfcToBe and its related models"""
+    return list(_history_feed(rfc_to_be).records)
@@ -0,0 +1,82 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+"""Statistics on how long documents have carried labels
+
+Label intervals are kept in the LabelInterval table, which is maintained as labels
+change (see sync_label_intervals()), so statistics are plain aggregate queries.
+"""
+
+import datetime
+from collections.abc import Iterable
+
+from django.db.models import DurationField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from .models import LabelInterval, RfcToBeLabel
+
+
+def sync_label_intervals(
+    rfc_to_be_ids: Iterable[int], now: datetime.datetime | None = None
+):
+    """Open and close LabelIntervals to match the current labels of RfcToBes"""
+    rfc_to_be_ids = list(rfc_to_be_ids)
+    if now is None:
+        now = timezone.now()
+    current = set(
+        RfcToBeLabel.objects.filter(rfctobe_id__in=rfc_to_be_ids).values_list(
+            "rfctobe_id", "label_id"
+        )
+    )
+    open_intervals = {
+        (rfc_to_be_id, label_id): pk
+        for pk, rfc_to_be_id, label_id in LabelInterval.objects.filter(
+            rfc_to_be_id__in=rfc_to_be_ids, end__isnull=True
+        ).values_list("pk", "rfc_to_be_id", "label_id")
+    }
+    LabelInterval.objects.filter(
+        pk__in=[pk for key, pk in open_intervals.items() if key not in current]
+    ).update(end=now)
+    LabelInterval.objects.bulk_create(
+        LabelInterval(rfc_to_be_id=rfc_to_be_id, label_id=label_id, start=now)
+        for rfc_to_be_id, label_id in current - open_intervals.keys()
+    )
+
+
+def label_stats(
+    document_ids: Iterable[int] | None = None,
+    since: datetime.datetime | None = None,
+    until: datetime.datetime | None = None,
+) -> list[dict]:
+    """Total seconds each document carried each label
+
+    Only time between since and until is counted, if given. Returns a list of
+    {"document_id", "label_id", "seconds"} dicts, omitting zero totals.
+    """
+    now = timezone.now()
+    start = F("start")
+    end = Coalesce(F("end"), Value(now))
+    intervals = LabelInterval.objects.all()
+    if document_ids is not None:
+        intervals = intervals.filter(rfc_to_be_id__in=document_ids)
+    if since is not None:
+        start = Greatest(start, Value(since))
+        intervals = intervals.exclude(end__lte=since)
+    if until is not None:
+        end = Least(end, Value(until))
+        intervals = intervals.filter(start__lt=until)
+    totals = (
+        intervals.values("rfc_to_be_id", "label_id")
+        .annotate(
+            duration=Sum(ExpressionWrapper(end - start, output_field=DurationField()))
+        )
+        .order_by("rfc_to_be_id", "label_id")
+    )
+    return [
+        {
+            "document_id": row["rfc_to_be_id"],
+            "label_id": row["label_id"],
+            "seconds": row["duration"].total_seconds(),
+        }
+        for row in totals
+        if row["duration"] is not None and row["duration"].total_seconds() > 0
+    ]
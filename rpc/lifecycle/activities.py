@@ -50,7 +50,23 @@ def complete_activities(rfctobe):
         state=Assignment.State.DONE,
         role__slug__in=role_map,
     ).values_list("role__slug", flat=True)
-    return {role_map[slug] for slug in completed_slugs}
+    return complete_activities_from_states(
+        (slug, Assignment.State.DONE) for slug in completed_slugs
+    )
+
+
+def complete_activities_from_states(assignment_states: Iterable[tuple[str, str]]):
+    """Get set of completed Activities from (role_slug, state) pairs
+
+    The pairs should cover the assignments of a single doc. This lets callers that
+    have already loaded assignments in bulk avoid a query per doc.
+    """
+    role_map = {ca.role_slug: ca for ca in ACTIVITIES}
+    return {
+        role_map[slug]
+        for slug, state in assignment_states
+        if slug in role_map and state == Assignment.State.DONE
+    }
 
 
 def incomplete_activities(rfctobe):
@@ -70,14 +86,27 @@ def pending_activities(rfctobe):
     created.
     """
     role_map = {ca.role_slug: ca for ca in ACTIVITIES}
-    # Get map from role slug to state
-    state_map = dict(
-        rfctobe.assignment_set.filter(role__slug__in=role_map)
-        .exclude(
-            state__in=[Assignment.State.WITHDRAWN, Assignment.State.CLOSED_FOR_HOLD]
+    return pending_activities_from_states(
+        rfctobe.assignment_set.filter(role__slug__in=role_map).values_list(
+            "role__slug", "state"
         )
-        .values_list("role__slug", "state")
     )
+
+
+def pending_activities_from_states(assignment_states: Iterable[tuple[str, str]]):
+    """Get set of pending Activities from (role_slug, state) pairs
+
+    Same as pending_activities(), but works from the assignments of a single doc
+    that the caller has already loaded.
+    """
+    role_map = {ca.role_slug: ca for ca in ACTIVITIES}
+    # Get map from role slug to state
+    state_map = {
+        slug: state
+        for slug, state in assignment_states
+        if slug in role_map
+        and state not in (Assignment.State.WITHDRAWN, Assignment.State.CLOSED_FOR_HOLD)
+    }
     # need an assignment for any without a non-withdrawn Assignment
     need_assignment = ACTIVITIES - {role_map[slug] for slug in state_map}
     completed = {
@@ -1,142 +1,202 @@
 import logging
+from collections import defaultdict
+from collections.abc import Iterable
 
 from django.db import transaction
 from django.utils import timezone
 from rest_framework.exceptions import NotFound
 
 from ..models import (
+    ASSIGNMENT_INACTIVE_STATES,
+    ActionHolder,
     Assignment,
     BlockingReason,
     DocRelationshipName,
+    FinalApproval,
     RfcToBe,
     RfcToBeBlockingReason,
+    RfcToBeLabel,
+    RpcRelatedDocument,
     RpcRole,
 )
+from .activities import (
+    complete_activities_from_states,
+    pending_activities_from_states,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def _is_active_or_pending_assignment(rfc: RfcToBe, slugs) -> bool:
-    # check for active assignments
-    active_assignments_qs = rfc.assignment_set.filter(role__slug__in=slugs).active()
-
-    # check for pending assignments
-    pending_assignments_qs = rfc.pending_activities().filter(slug__in=slugs)
-
-    if active_assignments_qs.exists() or pending_assignments_qs.exists():
-        return True
-
-    return False
-
+def get_block_reasons_for_rfcs(rfc_ids: Iterable[int]) -> dict[int, set[str]]:
+    """Compute blocking reasons for many RfcToBes at once
 
-def get_block_reasons(rfc: RfcToBe) -> set[str]:
-    """Compute whether blocked and collect blocking reasons."""
-    reasons: set[str] = set()
+    Loads labels, assignments, action holders, related documents, and final
+    approvals for all of them (and for their refqueue targets) in a fixed number
+    of queries, then evaluates the gates in memory. Returns a dict mapping each
+    id to its reasons.
+    """
+    rfc_ids = set(rfc_ids)
+    if not rfc_ids:
+        return {}
+
+    labels = defaultdict(set)
+    for rfc_id, label_slug in RfcToBeLabel.objects.filter(
+        rfctobe_id__in=rfc_ids
+    ).values_list("rfctobe_id", "label__slug"):
+        labels[rfc_id].add(label_slug)
+
+    relationships = defaultdict(set)
+    refqueue_targets = defaultdict(set)
+    for rfc_id, relationship, target_id in RpcRelatedDocument.objects.filter(
+        source_id__in=rfc_ids
+    ).values_list("source_id", "relationship_id", "target_rfctobe_id"):
+        relationships[rfc_id].add(relationship)
+        if (
+            relationship == DocRelationshipName.REFQUEUE_RELATIONSHIP_SLUG
+            and target_id is not None
+        ):
+            refqueue_targets[rfc_id].add(target_id)
+
+    # (role_slug, state) pairs for each doc and for each refqueue target
+    assignment_states = defaultdict(list)
+    target_ids = set().union(*refqueue_targets.values())
+    for rfc_id, role_slug, state in (
+        Assignment.objects.filter(rfc_to_be_id__in=rfc_ids | target_ids)
+        .order_by("pk")
+        .values_list("rfc_to_be_id", "role_id", "state")
+    ):
+        assignment_states[rfc_id].append((role_slug, state))
+
+    with_active_actionholder = set(
+        ActionHolder.objects.active()
+        .filter(target_rfctobe_id__in=rfc_ids)
+        .values_list("target_rfctobe_id", flat=True)
+    )
+    with_active_final_approval = set(
+        FinalApproval.objects.active()
+        .filter(rfc_to_be_id__in=rfc_ids)
+        .values_list("rfc_to_be_id", flat=True)
+    )
+    # pending_activities() / incomplete_activities() only report existing roles
+    known_roles = set(RpcRole.objects.values_list("slug", flat=True))
+
+    def _is_active_or_pending(rfc_id, slugs) -> bool:
+        states = assignment_states[rfc_id]
+        if any(
+            role_slug in slugs and state not in ASSIGNMENT_INACTIVE_STATES
+            for role_slug, state in states
+        ):
+            return True
+        return any(
+            activity.role_slug in slugs and activity.role_slug in known_roles
+            for activity in pending_activities_from_states(states)
+        )
 
-    # Gate 0: Always blocks regardless of current assignment
-    if rfc.labels.filter(slug="Author Input Required").exists():
-        reasons.add(BlockingReason.LABEL_AUTHOR_INPUT_REQUIRED)
-    if rfc.labels.filter(slug="Stream Hold").exists():
-        reasons.add(BlockingReason.LABEL_STREAM_HOLD)
-    if rfc.labels.filter(slug="Tools Issue").exists():
-        reasons.add(BlockingReason.TOOLS_ISSUE)
-    if rfc.rpcrelateddocument_set.filter(
-        relationship__slug=DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG
-    ).exists():
-        reasons.add(BlockingReason.REFERENCE_NOT_RECEIVED)
-    if reasons:
-        return reasons
+    def _first_edit_incomplete(target_id) -> bool:
+        if "first_editor" not in known_roles:
+            return False
+        return "first_editor" not in {
+            activity.role_slug
+            for activity in complete_activities_from_states(
+                assignment_states[target_id]
+            )
+        }
+
+    def _publish_done_or_active(target_id) -> bool:
+        return any(
+            role_slug == "publisher"
+            and (
+                state == Assignment.State.DONE
+                or state not in ASSIGNMENT_INACTIVE_STATES
+            )
+            for role_slug, state in assignment_states[target_id]
+        )
 
-    # Gate 1: Blocks formatting / reference checks
-    slugs = ["ref_checker", "formatting"]
-    if _is_active_or_pending_assignment(rfc, slugs):
-        if rfc.actionholder_set.active().exists():
-            reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
-        if rfc.labels.filter(slug="ExtRef Hold").exists():
-            reasons.add(BlockingReason.LABEL_EXTREF_HOLD)
-        # any related documents not received (2g/3g/withdrawn), add only first
-        blocking_slugs = [
-            DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG,
-            DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG,
-            DocRelationshipName.WITHDRAWNREF_RELATIONSHIP_SLUG,
-        ]
-        if rfc.rpcrelateddocument_set.filter(
-            relationship__slug__in=blocking_slugs
-        ).exists():
-            if rfc.rpcrelateddocument_set.filter(
-                relationship__slug=DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG
-            ).exists():
+    def _evaluate(rfc_id) -> set[str]:
+        reasons: set[str] = set()
+        rfc_labels = labels[rfc_id]
+        rfc_relationships = relationships[rfc_id]
+        has_active_actionholder = rfc_id in with_active_actionholder
+
+        # Gate 0: Always blocks regardless of current assignment
+        if "Author Input Required" in rfc_labels:
+            reasons.add(BlockingReason.LABEL_AUTHOR_INPUT_REQUIRED)
+        if "Stream Hold" in rfc_labels:
+            reasons.add(BlockingReason.LABEL_STREAM_HOLD)
+        if "Tools Issue" in rfc_labels:
+            reasons.add(BlockingReason.TOOLS_ISSUE)
+        if DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG in rfc_relationships:
+            reasons.add(BlockingReason.REFERENCE_NOT_RECEIVED)
+        if reasons:
+            return reasons
+
+        # Gate 1: Blocks formatting / reference checks
+        if _is_active_or_pending(rfc_id, ["ref_checker", "formatting"]):
+            if has_active_actionholder:
+                reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
+            if "ExtRef Hold" in rfc_labels:
+                reasons.add(BlockingReason.LABEL_EXTREF_HOLD)
+            # any related documents not received (2g/3g/withdrawn), add only first
+            if (
+                DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG
+                in rfc_relationships
+            ):
                 reasons.add(BlockingReason.REFERENCE_NOT_RECEIVED_2G)
-            elif rfc.rpcrelateddocument_set.filter(
-                relationship__slug=DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG
-            ).exists():
+            elif (
+                DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG
+                in rfc_relationships
+            ):
                 reasons.add(BlockingReason.REFERENCE_NOT_RECEIVED_3G)
-            elif rfc.rpcrelateddocument_set.filter(
-                relationship__slug=DocRelationshipName.WITHDRAWNREF_RELATIONSHIP_SLUG
-            ).exists():
+            elif (
+                DocRelationshipName.WITHDRAWNREF_RELATIONSHIP_SLUG in rfc_relationships
+            ):
                 reasons.add(BlockingReason.REFERENCE_NOT_RECEIVED)
+            return reasons
+
+        # Gate 2: Blocks first edit
+        if _is_active_or_pending(rfc_id, ["first_editor"]):
+            if has_active_actionholder:
+                reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
+            return reasons
+
+        # Gate 3: Blocks second edit
+        if _is_active_or_pending(rfc_id, ["second_editor"]):
+            if has_active_actionholder:
+                reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
+            if "IANA Hold" in rfc_labels:
+                reasons.add(BlockingReason.LABEL_IANA_HOLD)
+            if any(
+                _first_edit_incomplete(target_id)
+                for target_id in refqueue_targets[rfc_id]
+            ):
+                reasons.add(BlockingReason.REFQUEUE_FIRST_EDIT_INCOMPLETE)
+            return reasons
+
+        # Gate 4: Blocks final review
+        if _is_active_or_pending(rfc_id, ["final_review_editor"]):
+            if has_active_actionholder:
+                reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
+            return reasons
+
+        # Gate 5: Blocks publishing
+        if _is_active_or_pending(rfc_id, ["publisher"]):
+            if "IANA Hold" in rfc_labels:
+                reasons.add(BlockingReason.LABEL_IANA_HOLD)
+            if not all(
+                _publish_done_or_active(target_id)
+                for target_id in refqueue_targets[rfc_id]
+            ):
+                reasons.add(BlockingReason.REFQUEUE_PUBLISH_INCOMPLETE)
+            if rfc_id in with_active_final_approval:
+                reasons.add(BlockingReason.FINAL_APPROVAL_PENDING)
+            if has_active_actionholder:
+                reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
+            return reasons
+
+        # No active assignments in any gate - return empty set
         return reasons
 
-    # Gate 2: Blocks first edit
-    slugs = ["first_editor"]
-    if _is_active_or_pending_assignment(rfc, slugs):
-        if rfc.actionholder_set.active().exists():
-            reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
-        return reasons
-
-    # Gate 3: Blocks second edit
-    slugs = ["second_editor"]
-    if _is_active_or_pending_assignment(rfc, slugs):
-        if rfc.actionholder_set.active().exists():
-            reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
-        if rfc.labels.filter(slug="IANA Hold").exists():
-            reasons.add(BlockingReason.LABEL_IANA_HOLD)
-        # any document this draft normatively references has not completed first edit
-        refqueue_qs = rfc.rpcrelateddocument_set.filter(relationship="refqueue")
-        if refqueue_qs.exists():
-            for ref in refqueue_qs:
-                if (
-                    ref.target_rfctobe.incomplete_activities()
-                    .filter(slug="first_editor")
-                    .exists()
-                ):
-                    reasons.add(BlockingReason.REFQUEUE_FIRST_EDIT_INCOMPLETE)
-        return reasons
-
-    # Gate 4: Blocks final review
-    slugs = ["final_review_editor"]
-    if _is_active_or_pending_assignment(rfc, slugs):
-        if rfc.actionholder_set.active().exists():
-            reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
-        return reasons
-
-    # Gate 5: Blocks publishing
-    slugs = ["publisher"]
-    if _is_active_or_pending_assignment(rfc, slugs):
-        if rfc.labels.filter(slug="IANA Hold").exists():
-            reasons.add(BlockingReason.LABEL_IANA_HOLD)
-        # any document this draft normatively references is not ready for publication
-        refqueue_qs = rfc.rpcrelateddocument_set.filter(relationship="refqueue")
-        if refqueue_qs.exists():
-            for ref in refqueue_qs:
-                # block if publisher has no done or active assignment
-                publisher_qs = ref.target_rfctobe.assignment_set.filter(
-                    role__slug="publisher"
-                )
-                publisher_done_or_active = (
-                    publisher_qs.active()
-                    | publisher_qs.filter(state=Assignment.State.DONE)
-                ).exists()
-                if not publisher_done_or_active:
-                    reasons.add(BlockingReason.REFQUEUE_PUBLISH_INCOMPLETE)
-        if rfc.finalapproval_set.active().exists():
-            reasons.add(BlockingReason.FINAL_APPROVAL_PENDING)
-        if rfc.actionholder_set.active().exists():
-            reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
-        return reasons
-
-    # No active assignments in any gate - return empty set
-    return reasons
+    return {rfc_id: _evaluate(rfc_id) for rfc_id in rfc_ids}
 
 
 def _has_active_blocked_assignment(rfc: RfcToBe) -> bool:
@@ -147,6 +207,26 @@ def _has_active_blocked_assignment(rfc: RfcToBe) -> bool:
     return blocked_qs.exists()
 
 
+def rfcs_with_stale_blocked_state(rfc_ids: Iterable[int]) -> set[int]:
+    """Ids of RfcToBes whose blocked assignment state may need to change
+
+    Uses get_block_reasons_for_rfcs() to find docs whose computed blocked state
+    differs from whether they have an active 'blocked' assignment. Callers should
+    still use apply_blocked_assignment_for_rfc(), which re-checks under lock.
+    """
+    block_reasons = get_block_reasons_for_rfcs(rfc_ids)
+    blocked_before = set(
+        Assignment.objects.filter(rfc_to_be_id__in=block_reasons, role__slug="blocked")
+        .active()
+        .values_list("rfc_to_be_id", flat=True)
+    )
+    return {
+        rfc_id
+        for rfc_id, reasons in block_reasons.items()
+        if bool(reasons) != (rfc_id in blocked_before)
+    }
+
+
 def _create_blocked_assignments(rfc: RfcToBe, reasons: set[str] | None = None) -> bool:
     """Create new 'blocked' assignments and store blocking reasons."""
 
@@ -278,7 +358,7 @@ def apply_blocked_assignment_for_rfc(rfc: RfcToBe) -> bool:
             # lock the rfc row to avoid races
             locked = RfcToBe.objects.select_for_update().get(pk=rfc.pk)
 
-            block_reasons = get_block_reasons(locked)
+            block_reasons = get_block_reasons_for_rfcs([locked.pk])[locked.pk]
             blocked_now = bool(block_reasons)
             blocked_before = _has_active_blocked_assignment(locked)
 
@@ -367,7 +447,7 @@ def apply_manual_unblock(rfc: RfcToBe) -> None:
             ):
                 reason.resolved = now
                 reason.save(update_fields=["resolved"])
-            remaining_reasons = get_block_reasons(locked)
+            remaining_reasons = get_block_reasons_for_rfcs([locked.pk])[locked.pk]
             if not remaining_reasons and _has_active_blocked_assignment(locked):
                 _close_blocked_assignments(locked)
                 logger.info(
@@ -1,42 +1,67 @@
 import datetime
+import hashlib
+import json
 import logging
 
 import requests
 import rpcapi_client
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Count, Max, Q
 from django.utils import timezone
 
-from datatracker.models import DatatrackerPerson
 from datatracker.rpcapi import with_rpcapi
-from rpc.models import (
-    AdditionalEmail,
-    ApprovalLogMessage,
-    Assignment,
-    ClusterMember,
-    FinalApproval,
-    RfcAuthor,
-    RfcToBe,
-    RpcRelatedDocument,
-    SubseriesMember,
-    TaskRun,
-)
+from rpc.models import RfcToBeChange, TaskRun
+from rpc.queuesnapshot import get_queue_snapshot
 
 logger = logging.getLogger(__name__)
 
+QUEUE_PUSHED_HASHES_CACHE_KEY = "dt_queue_pushed_item_hashes"
+# Lost hashes only cost a full push, so this need not be long
+QUEUE_PUSHED_HASHES_CACHE_TTL = 24 * 60 * 60  # seconds
+
+# How long processed RfcToBeChange entries are kept
+CHANGE_LOG_RETENTION = datetime.timedelta(days=1)
+# Change log entries this recent are read again even if they are behind the
+# cursor, to pick up entries from transactions that committed after it passed them
+CHANGE_LOG_OVERLAP = datetime.timedelta(minutes=10)
+
 
 def build_public_queue_payload() -> list:
     """Build the same payload as the pubq/queue API endpoint."""
-    from rpc.api import PublicQueueList, _collect_queue_person_ids
+    from rpc.api import PublicQueueList
+
+    snapshot = get_queue_snapshot(
+        PublicQueueList.snapshot_name, PublicQueueList.build_queue_data
+    )
+    return json.loads(snapshot.content)
 
-    queryset = list(PublicQueueList.queryset.all())
-    DatatrackerPerson.warm_cache(_collect_queue_person_ids(queryset))
-    return PublicQueueList.serializer_class(queryset, many=True).data
 
+def queue_item_hashes(payload: list) -> dict[int, str]:
+    """Content hash of each queue item, keyed by item id"""
+    return {
+        item["id"]: hashlib.sha256(
+            json.dumps(item, sort_keys=True, separators=(",", ":")).encode()
+        ).hexdigest()
+        for item in payload
+    }
 
-def notify_datatracker_queue():
-    """Push the full public queue payload to the Datatracker queue endpoint."""
+
+def notify_datatracker_queue(full_sync=True):
+    """Push the public queue payload to the Datatracker queue endpoint
+
+    If full_sync is False, the push is skipped when no queue item was added,
+    changed or removed since the last push. The hashes of the pushed items are
+    kept only in the cache, so if they are evicted the next push is a full one. A
+    full sync always pushes and should be done periodically in case the
+    Datatracker's copy of the queue diverges from what was pushed.
+    """
     payload = build_public_queue_payload()
+    item_hashes = queue_item_hashes(payload)
+    if not full_sync and cache.get(QUEUE_PUSHED_HASHES_CACHE_KEY) == item_hashes:
+        logger.info("Public queue unchanged since last push, skipping push")
+        return
     logger.info("Pushing queue payload to Datatracker")
 
     @with_rpcapi
@@ -44,6 +69,12 @@ def notify_datatracker_queue():
         rpcapi.process_rpc_queue(rpcapi_client.RpcQueueDataRequest(data=payload))
 
     _push()
+    # Only record the hashes once the Datatracker has accepted the push
+    cache.set(
+        QUEUE_PUSHED_HASHES_CACHE_KEY,
+        item_hashes,
+        timeout=QUEUE_PUSHED_HASHES_CACHE_TTL,
+    )
     logger.info(
         "Successfully pushed queue payload to Datatracker (%d items)", len(payload)
     )
@@ -71,71 +102,25 @@ def notify_queue_precompute():
     logger.info("Successfully notified queue precompute system about updated RFCs")
 
 
-def get_updated_rfcs_since(current_check_time):
-    """Return a queryset of in-queue RFCs updated since last check."""
+def get_rfc_changes_since(task_run: TaskRun, now: datetime.datetime):
+    """Return a queryset of RfcToBeChange entries not yet processed by task_run
 
-    candidate_ids = set()
-
-    candidate_ids.update(
-        RfcToBe.history.filter(history_date__gt=current_check_time).values_list(
-            "id", flat=True
-        )
-    )
-    candidate_ids.update(
-        Assignment.history.filter(history_date__gt=current_check_time)
-        .exclude(rfc_to_be=None)
-        .values_list("rfc_to_be", flat=True)
-    )
-    candidate_ids.update(
-        RfcAuthor.history.filter(history_date__gt=current_check_time)
-        .exclude(rfc_to_be=None)
-        .values_list("rfc_to_be", flat=True)
-    )
-    candidate_ids.update(
-        RpcRelatedDocument.history.filter(history_date__gt=current_check_time)
-        .exclude(source=None)
-        .values_list("source", flat=True)
-    )
-    candidate_ids.update(
-        AdditionalEmail.history.filter(history_date__gt=current_check_time)
-        .exclude(rfc_to_be=None)
-        .values_list("rfc_to_be", flat=True)
-    )
-    doc_ids = set(
-        ClusterMember.history.filter(history_date__gt=current_check_time)
-        .exclude(doc=None)
-        .values_list("doc", flat=True)
-    )
-    if doc_ids:
-        candidate_ids.update(
-            RfcToBe.objects.filter(draft__in=doc_ids).values_list("id", flat=True)
-        )
-    candidate_ids.update(
-        SubseriesMember.history.filter(history_date__gt=current_check_time)
-        .exclude(rfc_to_be=None)
-        .values_list("rfc_to_be", flat=True)
-    )
-    candidate_ids.update(
-        FinalApproval.history.filter(history_date__gt=current_check_time)
-        .exclude(rfc_to_be=None)
-        .values_list("rfc_to_be", flat=True)
-    )
-    candidate_ids.update(
-        ApprovalLogMessage.history.filter(history_date__gt=current_check_time)
-        .exclude(rfc_to_be=None)
-        .values_list("rfc_to_be", flat=True)
-    )
-
-    return RfcToBe.objects.filter(pk__in=candidate_ids)
+    These are the entries logged after its cursor, and entries in the overlap
+    window before it that it has not processed. Ids are not committed in order,
+    so an entry behind the cursor can become visible after the cursor passed it.
+    """
+    return RfcToBeChange.objects.filter(
+        Q(pk__gt=task_run.cursor) | Q(changed_at__gte=now - CHANGE_LOG_OVERLAP)
+    ).exclude(pk__in=task_run.recent_changes)
 
 
 def process_rfctobe_changes_for_queue():
-    """Check history tables for RFC changes since the last run and, if any exist
+    """Check the change log for RFC changes since the last run and, if any exist
     and no edits occurred in the past minute, notify the queue precompute and
     datatracker endpoints (unless NOTIFY_DT_QUEUE_ENABLED is False).
     Uses a DB-level lock to prevent concurrent execution."""
 
-    logger.info("Processing RfcToBe changes from history")
+    logger.info("Processing RfcToBe changes from change log")
 
     current_check_time = timezone.now()
 
@@ -151,34 +136,52 @@ def process_rfctobe_changes_for_queue():
         task_run.save()
 
     try:
+        changes = get_rfc_changes_since(task_run, current_check_time)
         recent_change_threshold = current_check_time - datetime.timedelta(minutes=1)
 
         # Check for recent changes - if changes happened in last minute, abort
-        if get_updated_rfcs_since(recent_change_threshold).exists():
+        if changes.filter(changed_at__gt=recent_change_threshold).exists():
             logger.info(
                 "Changes detected in last minute, skipping notification to avoid "
                 "notifying during active edits"
             )
             return
 
-        # Get last successful notification time from DB
-        last_check = task_run.last_run_at
-        logger.info(f"Processing changes since last notification at {last_check}")
-
-        queue_rfcs = get_updated_rfcs_since(last_check)
+        logger.info(f"Processing changes since change log entry {task_run.cursor}")
+        overlap_start = current_check_time - CHANGE_LOG_OVERLAP
+        recent_changes = list(
+            changes.filter(changed_at__gte=overlap_start).values_list("pk", flat=True)
+        )
+        summary = changes.aggregate(
+            last_change=Max("pk"),
+            rfc_count=Count("rfc_to_be_id", distinct=True),
+        )
 
-        if queue_rfcs.exists():
+        if summary["last_change"] is not None:
             logger.info("Sending queue precompute notification to update in-queue RFCs")
             notify_queue_precompute()
             if getattr(settings, "NOTIFY_DT_QUEUE_ENABLED", True):
-                notify_datatracker_queue()
+                notify_datatracker_queue(full_sync=False)
+            task_run.cursor = max(task_run.cursor, summary["last_change"])
+            # Remember the processed entries that will be read again
+            task_run.recent_changes = list(
+                RfcToBeChange.objects.filter(
+                    pk__in=[*task_run.recent_changes, *recent_changes],
+                    changed_at__gte=overlap_start,
+                ).values_list("pk", flat=True)
+            )
+            # Keep processed entries around for a while for troubleshooting
+            RfcToBeChange.objects.filter(
+                pk__lte=task_run.cursor,
+                changed_at__lt=current_check_time - CHANGE_LOG_RETENTION,
+            ).delete()
         else:
             logger.info("No in-queue RFCs changed")
 
         task_run.last_run_at = current_check_time
-        logger.info("Completed processing history changes")
+        logger.info("Completed processing change log")
 
-        return queue_rfcs.count()
+        return summary["rfc_count"]
 
     except Exception as e:
         logger.exception(f"Unexpected error in process_rfctobe_changes_for_queue: {e}")
@@ -1,14 +1,39 @@
 # Copyright The IETF Trust 2025-2026, All Rights Reserved
+import datetime
 import logging
 from unittest.mock import MagicMock, patch
 
 import jsonschema.exceptions
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from rest_framework import serializers
 
-from rpc.factories import PublicationAttemptFactory, RfcToBeFactory
-from rpc.models import PublicationAttempt, RfcToBe
+from rpc.factories import (
+    AssignmentFactory,
+    FinalApprovalFactory,
+    LabelFactory,
+    PublicationAttemptFactory,
+    RfcToBeActionHolderFactory,
+    RfcToBeFactory,
+)
+from rpc.models import (
+    Assignment,
+    BlockingReason,
+    DocRelationshipName,
+    PublicationAttempt,
+    RfcToBe,
+    RfcToBeChange,
+    RpcRelatedDocument,
+    TaskRun,
+)
 
+from .blocked_assignments import get_block_reasons_for_rfcs
+from .notifications import (
+    get_rfc_changes_since,
+    notify_datatracker_queue,
+    process_rfctobe_changes_for_queue,
+)
 from .publication import (
     AmbiguousFilesError,
     MissingFilesError,
@@ -66,6 +91,510 @@ class RepoTests(TestCase):
             )
 
 
+def _is_active_or_pending_assignment(rfc: RfcToBe, slugs) -> bool:
+    # check for active assignments
+    active_assignments_qs = rfc.assignment_set.filter(role__slug__in=slugs).active()
+
+    # check for pending assignments
+    pending_assignments_qs = rfc.pending_activities().filter(slug__in=slugs)
+
+    if active_assignments_qs.exists() or pending_assignments_qs.exists():
+        return True
+
+    return False
+
+
+def get_block_reasons(rfc: RfcToBe) -> set[str]:
+    """Compute whether blocked and collect blocking reasons, one RfcToBe at a time
+
+    The original per-document implementation, kept to check that
+    get_block_reasons_for_rfcs() gives the same results.
+    """
+    reasons: set[str] = set()
+
+    # Gate 0: Always blocks regardless of current assignment
+    if rfc.labels.filter(slug="Author Input Required").exists():
+        reasons.add(BlockingReason.LABEL_AUTHOR_INPUT_REQUIRED)
+    if rfc.labels.filter(slug="Stream Hold").exists():
+        reasons.add(BlockingReason.LABEL_STREAM_HOLD)
+    if rfc.labels.filter(slug="Tools Issue").exists():
+        reasons.add(BlockingReason.TOOLS_ISSUE)
+    if rfc.rpcrelateddocument_set.filter(
+        relationship__slug=DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG
+    ).exists():
+        reasons.add(BlockingReason.REFERENCE_NOT_RECEIVED)
+    if reasons:
+        return reasons
+
+    # Gate 1: Blocks formatting / reference checks
+    slugs = ["ref_checker", "formatting"]
+    if _is_active_or_pending_assignment(rfc, slugs):
+        if rfc.actionholder_set.active().exists():
+            reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
+        if rfc.labels.filter(slug="ExtRef Hold").exists():
+            reasons.add(BlockingReason.LABEL_EXTREF_HOLD)
+        # any related documents not received (2g/3g/withdrawn), add only first
+        blocking_slugs = [
+            DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG,
+            DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG,
+            DocRelationshipName.WITHDRAWNREF_RELATIONSHIP_SLUG,
+        ]
+        if rfc.rpcrelateddocument_set.filter(
+            relationship__slug__in=blocking_slugs
+        ).exists():
+            if rfc.rpcrelateddocument_set.filter(
+                relationship__slug=DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG
+            ).exists():
+                reasons.add(BlockingReason.REFERENCE_NOT_RECEIVED_2G)
+            elif rfc.rpcrelateddocument_set.filter(
+                relationship__slug=DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG
+            ).exists():
+                reasons.add(BlockingReason.REFERENCE_NOT_RECEIVED_3G)
+            elif rfc.rpcrelateddocument_set.filter(
+                relationship__slug=DocRelationshipName.WITHDRAWNREF_RELATIONSHIP_SLUG
+            ).exists():
+                reasons.add(BlockingReason.REFERENCE_NOT_RECEIVED)
+        return reasons
+
+    # Gate 2: Blocks first edit
+    slugs = ["first_editor"]
+    if _is_active_or_pending_assignment(rfc, slugs):
+        if rfc.actionholder_set.active().exists():
+            reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
+        return reasons
+
+    # Gate 3: Blocks second edit
+    slugs = ["second_editor"]
+    if _is_active_or_pending_assignment(rfc, slugs):
+        if rfc.actionholder_set.active().exists():
+            reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
+        if rfc.labels.filter(slug="IANA Hold").exists():
+            reasons.add(BlockingReason.LABEL_IANA_HOLD)
+        # any document this draft normatively references has not completed first edit
+        refqueue_qs = rfc.rpcrelateddocument_set.filter(relationship="refqueue")
+        if refqueue_qs.exists():
+            for ref in refqueue_qs:
+                if (
+                    ref.target_rfctobe.incomplete_activities()
+                    .filter(slug="first_editor")
+                    .exists()
+                ):
+                    reasons.add(BlockingReason.REFQUEUE_FIRST_EDIT_INCOMPLETE)
+        return reasons
+
+    # Gate 4: Blocks final review
+    slugs = ["final_review_editor"]
+    if _is_active_or_pending_assignment(rfc, slugs):
+        if rfc.actionholder_set.active().exists():
+            reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
+        return reasons
+
+    # Gate 5: Blocks publishing
+    slugs = ["publisher"]
+    if _is_active_or_pending_assignment(rfc, slugs):
+        if rfc.labels.filter(slug="IANA Hold").exists():
+            reasons.add(BlockingReason.LABEL_IANA_HOLD)
+        # any document this draft normatively references is not ready for publication
+        refqueue_qs = rfc.rpcrelateddocument_set.filter(relationship="refqueue")
+        if refqueue_qs.exists():
+            for ref in refqueue_qs:
+                # block if publisher has no done or active assignment
+                publisher_qs = ref.target_rfctobe.assignment_set.filter(
+                    role__slug="publisher"
+                )
+                publisher_done_or_active = (
+                    publisher_qs.active()
+                    | publisher_qs.filter(state=Assignment.State.DONE)
+                ).exists()
+                if not publisher_done_or_active:
+                    reasons.add(BlockingReason.REFQUEUE_PUBLISH_INCOMPLETE)
+        if rfc.finalapproval_set.active().exists():
+            reasons.add(BlockingReason.FINAL_APPROVAL_PENDING)
+        if rfc.actionholder_set.active().exists():
+            reasons.add(BlockingReason.ACTION_HOLDER_ACTIVE)
+        return reasons
+
+    # No active assignments in any gate - return empty set
+    return reasons
+
+
+class BlockedAssignmentsTests(TestCase):
+    def _assign(self, rfctobe, role_slug, state=Assignment.State.IN_PROGRESS):
+        return AssignmentFactory(rfc_to_be=rfctobe, role__slug=role_slug, state=state)
+
+    def _complete(self, rfctobe, *role_slugs):
+        for role_slug in role_slugs:
+            self._assign(rfctobe, role_slug, state=Assignment.State.DONE)
+
+    def _relate(self, source, relationship, target):
+        return RpcRelatedDocument.objects.create(
+            source=source, relationship_id=relationship, target_rfctobe=target
+        )
+
+    def test_get_block_reasons_for_rfcs(self):
+        expected = {}
+
+        # no assignments at all
+        expected[RfcToBeFactory().pk] = set()
+
+        # gate 0: label and not-received reference
+        labeled = RfcToBeFactory()
+        labeled.labels.add(LabelFactory(slug="Stream Hold"))
+        expected[labeled.pk] = {BlockingReason.LABEL_STREAM_HOLD}
+        not_received = RfcToBeFactory()
+        RpcRelatedDocument.objects.create(
+            source=not_received,
+            relationship_id=DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG,
+            target_document=RfcToBeFactory().draft,
+        )
+        expected[not_received.pk] = {BlockingReason.REFERENCE_NOT_RECEIVED}
+
+        # gate 1: pending formatting, action holder, 3g reference
+        formatting = RfcToBeFactory()
+        self._complete(formatting, "enqueuer")
+        RfcToBeActionHolderFactory(target_rfctobe=formatting)
+        RpcRelatedDocument.objects.create(
+            source=formatting,
+            relationship_id=DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG,
+            target_document=RfcToBeFactory().draft,
+        )
+        expected[formatting.pk] = {
+            BlockingReason.ACTION_HOLDER_ACTIVE,
+            BlockingReason.REFERENCE_NOT_RECEIVED_3G,
+        }
+
+        # gate 3: second edit with a refqueue target that has not been first-edited
+        target = RfcToBeFactory()
+        self._complete(target, "enqueuer", "formatting")
+        second_edit = RfcToBeFactory()
+        second_edit.labels.add(LabelFactory(slug="IANA Hold"))
+        self._complete(second_edit, "enqueuer", "formatting", "first_editor")
+        self._assign(second_edit, "ref_checker", Assignment.State.DONE)
+        self._assign(second_edit, "second_editor")
+        self._relate(second_edit, "refqueue", target)
+        expected[target.pk] = set()
+        expected[second_edit.pk] = {
+            BlockingReason.LABEL_IANA_HOLD,
+            BlockingReason.REFQUEUE_FIRST_EDIT_INCOMPLETE,
+        }
+
+        # gate 5: publishing with pending approval and unpublished refqueue target
+        publishing = RfcToBeFactory()
+        self._complete(
+            publishing,
+            "enqueuer",
+            "formatting",
+            "first_editor",
+            "second_editor",
+            "ref_checker",
+            "final_review_editor",
+        )
+        self._assign(publishing, "publisher", Assignment.State.ASSIGNED)
+        FinalApprovalFactory(rfc_to_be=publishing)
+        self._relate(publishing, "refqueue", target)
+        expected[publishing.pk] = {
+            BlockingReason.REFQUEUE_PUBLISH_INCOMPLETE,
+            BlockingReason.FINAL_APPROVAL_PENDING,
+        }
+
+        # gate 5 again, but with its refqueue target already published
+        published_target = RfcToBeFactory()
+        self._complete(published_target, "publisher")
+        ready = RfcToBeFactory()
+        self._complete(
+            ready,
+            "enqueuer",
+            "formatting",
+            "first_editor",
+            "second_editor",
+            "ref_checker",
+            "final_review_editor",
+        )
+        self._assign(ready, "publisher")
+        self._relate(ready, "refqueue", published_target)
+        expected[published_target.pk] = set()
+        expected[ready.pk] = set()
+
+        self.assertEqual(get_block_reasons_for_rfcs(expected), expected)
+
+    def _at_gate(self, gate):
+        """RfcToBe whose activities are done up to the given gate"""
+        rfctobe = RfcToBeFactory()
+        done = [
+            ["enqueuer"],
+            ["enqueuer", "formatting", "ref_checker"],
+            ["enqueuer", "formatting", "ref_checker", "first_editor"],
+            [
+                "enqueuer",
+                "formatting",
+                "ref_checker",
+                "first_editor",
+                "second_editor",
+            ],
+            [
+                "enqueuer",
+                "formatting",
+                "ref_checker",
+                "first_editor",
+                "second_editor",
+                "final_review_editor",
+            ],
+        ][gate - 1]
+        self._complete(rfctobe, *done)
+        return rfctobe
+
+    def _reference(self, source, relationship):
+        RpcRelatedDocument.objects.create(
+            source=source,
+            relationship_id=relationship,
+            target_document=RfcToBeFactory().draft,
+        )
+
+    def test_get_block_reasons_for_rfcs_matches_get_block_reasons(self):
+        def _labeled(rfctobe, *slugs):
+            for slug in slugs:
+                rfctobe.labels.add(LabelFactory(slug=slug))
+            return rfctobe
+
+        def _with_action_holder(rfctobe):
+            RfcToBeActionHolderFactory(target_rfctobe=rfctobe)
+            return rfctobe
+
+        def _with_references(rfctobe, *relationships):
+            for relationship in relationships:
+                self._reference(rfctobe, relationship)
+            return rfctobe
+
+        def _with_refqueue(rfctobe, *targets):
+            for target in targets:
+                self._relate(rfctobe, "refqueue", target)
+            return rfctobe
+
+        def _first_edited():
+            target = self._at_gate(3)
+            self._complete(target, "first_editor")
+            return target
+
+        def _published():
+            target = RfcToBeFactory()
+            self._complete(target, "publisher")
+            return target
+
+        def _publishing():
+            rfctobe = self._at_gate(5)
+            self._assign(rfctobe, "publisher", Assignment.State.ASSIGNED)
+            return rfctobe
+
+        def _with_final_approval(rfctobe):
+            FinalApprovalFactory(rfc_to_be=rfctobe)
+            return rfctobe
+
+        cases = {
+            "no assignments": lambda: RfcToBeFactory(),
+            "author input required": lambda: _labeled(
+                RfcToBeFactory(), "Author Input Required"
+            ),
+            "stream hold": lambda: _labeled(self._at_gate(3), "Stream Hold"),
+            "tools issue": lambda: _labeled(self._at_gate(5), "Tools Issue"),
+            "not received": lambda: _with_references(
+                self._at_gate(1), DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG
+            ),
+            "gate 1": lambda: self._at_gate(1),
+            "gate 1 action holder and extref hold": lambda: _with_action_holder(
+                _labeled(self._at_gate(1), "ExtRef Hold")
+            ),
+            "gate 1 2g and 3g": lambda: _with_references(
+                self._at_gate(1),
+                DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG,
+                DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG,
+            ),
+            "gate 1 3g": lambda: _with_references(
+                self._at_gate(1), DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG
+            ),
+            "gate 1 withdrawn": lambda: _with_references(
+                self._at_gate(1), DocRelationshipName.WITHDRAWNREF_RELATIONSHIP_SLUG
+            ),
+            "gate 2 2g and extref hold": lambda: _with_references(
+                _labeled(self._at_gate(2), "ExtRef Hold"),
+                DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG,
+            ),
+            "gate 2 action holder": lambda: _with_action_holder(self._at_gate(2)),
+            "gate 3 iana hold and refqueue": lambda: _with_refqueue(
+                _labeled(self._at_gate(3), "IANA Hold"),
+                self._at_gate(1),
+                _first_edited(),
+            ),
+            "gate 3 first-edited refqueue": lambda: _with_action_holder(
+                _with_refqueue(self._at_gate(3), _first_edited())
+            ),
+            "gate 4 action holder and iana hold": lambda: _with_action_holder(
+                _labeled(self._at_gate(4), "IANA Hold")
+            ),
+            "gate 5 unpublished refqueue": lambda: _with_final_approval(
+                _with_refqueue(_labeled(_publishing(), "IANA Hold"), self._at_gate(2))
+            ),
+            "gate 5 published refqueue": lambda: _with_action_holder(
+                _with_refqueue(_publishing(), _published())
+            ),
+            "gate 5 active publisher refqueue": lambda: _with_refqueue(
+                _publishing(), _publishing()
+            ),
+        }
+        rfctobes = {name: make_case() for name, make_case in cases.items()}
+        batch = get_block_reasons_for_rfcs(r.pk for r in rfctobes.values())
+        for name, rfctobe in rfctobes.items():
+            with self.subTest(name):
+                self.assertEqual(batch[rfctobe.pk], get_block_reasons(rfctobe))
+        self.assertTrue(any(batch.values()))  # make sure we tested something
+
+    def test_get_block_reasons_for_rfcs_query_count(self):
+        rfctobes = RfcToBeFactory.create_batch(5)
+        for rfctobe in rfctobes:
+            self._complete(rfctobe, "enqueuer")
+            RfcToBeActionHolderFactory(target_rfctobe=rfctobe)
+        with self.assertNumQueries(6):
+            get_block_reasons_for_rfcs(rfctobe.pk for rfctobe in rfctobes)
+        with self.assertNumQueries(6):
+            get_block_reasons_for_rfcs(rfctobe.pk for rfctobe in rfctobes[:2])
+
+
+@patch("rpc.lifecycle.notifications.notify_datatracker_queue")
+@patch("rpc.lifecycle.notifications.notify_queue_precompute")
+class QueueChangeNotificationTests(TestCase):
+    def _age_change_log(self):
+        RfcToBeChange.objects.update(
+            changed_at=timezone.now() - datetime.timedelta(minutes=5)
+        )
+
+    def test_changes_are_logged(self, mock_precompute, mock_dt):
+        rfc = RfcToBeFactory()
+        AssignmentFactory(rfc_to_be=rfc, role__slug="formatting")
+        self.assertTrue(RfcToBeChange.objects.filter(rfc_to_be_id=rfc.pk).exists())
+
+    def test_label_changes_are_logged(self, mock_precompute, mock_dt):
+        rfc = RfcToBeFactory()
+        other = RfcToBeFactory()
+        label = LabelFactory()
+        task_run = TaskRun(
+            cursor=RfcToBeChange.objects.latest("pk").pk,
+            recent_changes=list(RfcToBeChange.objects.values_list("pk", flat=True)),
+        )
+
+        def _changed_rfc_ids():
+            changes = list(
+                get_rfc_changes_since(task_run, timezone.now()).values_list(
+                    "pk", "rfc_to_be_id"
+                )
+            )
+            task_run.recent_changes.extend(pk for pk, _ in changes)
+            return sorted(rfc_id for _, rfc_id in changes)
+
+        rfc.labels.add(label)
+        self.assertEqual(_changed_rfc_ids(), [rfc.pk])
+        rfc.labels.remove(label)
+        self.assertEqual(_changed_rfc_ids(), [rfc.pk])
+        label.rfctobe_set.add(rfc, other)
+        self.assertEqual(_changed_rfc_ids(), sorted([rfc.pk, other.pk]))
+        label.rfctobe_set.clear()
+        self.assertEqual(_changed_rfc_ids(), sorted([rfc.pk, other.pk]))
+
+    def test_process_changes(self, mock_precompute, mock_dt):
+        rfc = RfcToBeFactory()
+        RfcToBeFactory()
+
+        # recent edits defer notification
+        self.assertIsNone(process_rfctobe_changes_for_queue())
+        self.assertFalse(mock_precompute.called)
+
+        self._age_change_log()
+        self.assertEqual(process_rfctobe_changes_for_queue(), 2)
+        self.assertEqual(mock_precompute.call_count, 1)
+        self.assertEqual(mock_dt.call_count, 1)
+        task_run = TaskRun.objects.get(task_name="process_rfctobe_changes_for_queue")
+        self.assertEqual(task_run.cursor, RfcToBeChange.objects.latest("pk").pk)
+        self.assertFalse(task_run.is_running)
+
+        # nothing new since the cursor
+        self.assertEqual(process_rfctobe_changes_for_queue(), 0)
+        self.assertEqual(mock_precompute.call_count, 1)
+
+        # only changes after the cursor are counted
+        rfc.save()
+        self._age_change_log()
+        self.assertEqual(process_rfctobe_changes_for_queue(), 1)
+        self.assertEqual(mock_precompute.call_count, 2)
+
+    def test_process_changes_committed_behind_cursor(self, mock_precompute, mock_dt):
+        rfc = RfcToBeFactory()
+        late_pk = RfcToBeChange.objects.create(rfc_to_be_id=rfc.pk).pk
+        RfcToBeChange.objects.create(rfc_to_be_id=rfc.pk + 1)
+        # the transaction that logged late_pk has not committed yet
+        RfcToBeChange.objects.filter(pk=late_pk).delete()
+        self._age_change_log()
+        process_rfctobe_changes_for_queue()
+        self.assertEqual(mock_precompute.call_count, 1)
+        task_run = TaskRun.objects.get(task_name="process_rfctobe_changes_for_queue")
+        self.assertGreater(task_run.cursor, late_pk)
+
+        # it commits after the cursor has passed it
+        RfcToBeChange.objects.create(pk=late_pk, rfc_to_be_id=rfc.pk)
+        self._age_change_log()
+        self.assertEqual(process_rfctobe_changes_for_queue(), 1)
+        self.assertEqual(mock_precompute.call_count, 2)
+
+        # and is not processed again
+        self.assertEqual(process_rfctobe_changes_for_queue(), 0)
+        self.assertEqual(mock_precompute.call_count, 2)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+@patch("rpc.lifecycle.notifications.build_public_queue_payload")
+class NotifyDatatrackerQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.rpcapi = MagicMock()
+        for patcher in (
+            patch("datatracker.rpcapi.get_rpcapi_client", return_value=self.rpcapi),
+            patch("rpc.lifecycle.notifications.rpcapi_client"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_skips_unchanged_queue(self, mock_payload):
+        mock_payload.return_value = [
+            {"id": 1, "labels": []},
+            {"id": 2, "labels": []},
+        ]
+        notify_datatracker_queue(full_sync=False)
+        notify_datatracker_queue(full_sync=False)
+        self.assertEqual(self.rpcapi.process_rpc_queue.call_count, 1)
+
+        # a full sync always pushes
+        notify_datatracker_queue(full_sync=True)
+        self.assertEqual(self.rpcapi.process_rpc_queue.call_count, 2)
+
+        # changed, added and removed items are all pushed
+        for payload in (
+            [{"id": 1, "labels": ["bis"]}, {"id": 2, "labels": []}],
+            [{"id": 1, "labels": ["bis"]}, {"id": 2, "labels": []}, {"id": 3}],
+            [{"id": 1, "labels": ["bis"]}, {"id": 3}],
+        ):
+            mock_payload.return_value = payload
+            notify_datatracker_queue(full_sync=False)
+        self.assertEqual(self.rpcapi.process_rpc_queue.call_count, 5)
+
+    def test_failed_push_is_retried(self, mock_payload):
+        mock_payload.return_value = [{"id": 1, "labels": []}]
+        self.rpcapi.process_rpc_queue.side_effect = RuntimeError("unavailable")
+        with self.assertRaises(RuntimeError):
+            notify_datatracker_queue(full_sync=False)
+        self.rpcapi.process_rpc_queue.side_effect = None
+        notify_datatracker_queue(full_sync=False)
+        self.assertEqual(self.rpcapi.process_rpc_queue.call_count, 2)
+
+
 class PublicationTests(TestCase):
     def test_begin_publication_attempt(self):
         rfc_to_be = RfcToBeFactory()
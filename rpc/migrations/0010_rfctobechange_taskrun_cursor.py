@@ -0,0 +1,39 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rpc", "0009_populate_rfctobe_published_formats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RfcToBeChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rfc_to_be_id", models.PositiveBigIntegerField()),
+                (
+                    "changed_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="taskrun",
+            name="cursor",
+            field=models.PositiveBigIntegerField(
+                default=0, help_text="Last RfcToBeChange processed by the task"
+            ),
+        ),
+    ]
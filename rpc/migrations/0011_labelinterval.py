@@ -0,0 +1,118 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def forward(apps, schema_editor):
+    """Backfill LabelIntervals by replaying the RfcToBe label history
+
+    An interval starts at the first label change that leaves a document with a label
+    and ends at the first label change that leaves it without, as computed by the
+    former history-based RfcToBe.time_intervals_with_label().
+    """
+    HistoricalRfcToBe = apps.get_model("rpc", "HistoricalRfcToBe")
+    HistoricalRfcToBeLabel = apps.get_model("rpc", "HistoricalRfcToBeLabel")
+    LabelInterval = apps.get_model("rpc", "LabelInterval")
+    RfcToBe = apps.get_model("rpc", "RfcToBe")
+
+    existing_rfc_ids = set(RfcToBe.objects.values_list("pk", flat=True))
+    labels_by_history_id = defaultdict(set)
+    for history_id, label_id in HistoricalRfcToBeLabel.objects.filter(
+        label__isnull=False
+    ).values_list("history_id", "label_id"):
+        labels_by_history_id[history_id].add(label_id)
+
+    intervals = []
+    document_id = None
+    labels = set()
+    for doc_id, history_id, history_date in (
+        HistoricalRfcToBe.objects.order_by("id", "history_date", "history_id")
+        .values_list("id", "history_id", "history_date")
+        .iterator(chunk_size=BATCH_SIZE)
+    ):
+        new_labels = labels_by_history_id.get(history_id, set())
+        if doc_id != document_id:
+            # First record for a document is the baseline, not a change
+            document_id = doc_id
+            labels = new_labels
+            open_intervals = {}
+            continue
+        if new_labels == labels or doc_id not in existing_rfc_ids:
+            continue
+        for label_id in new_labels:
+            if label_id not in open_intervals:
+                open_intervals[label_id] = LabelInterval(
+                    rfc_to_be_id=doc_id, label_id=label_id, start=history_date
+                )
+                intervals.append(open_intervals[label_id])
+        for label_id in list(open_intervals):
+            if label_id not in new_labels:
+                open_intervals.pop(label_id).end = history_date
+        labels = new_labels
+    LabelInterval.objects.bulk_create(intervals, batch_size=BATCH_SIZE)
+
+
+def reverse(apps, schema_editor):
+    pass  # table is dropped by the schema migration
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rpc", "0010_rfctobechange_taskrun_cursor"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LabelInterval",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start", models.DateTimeField()),
+                ("end", models.DateTimeField(blank=True, null=True)),
+                (
+                    "label",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT, to="rpc.label"
+                    ),
+                ),
+                (
+                    "rfc_to_be",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="rpc.rfctobe"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["label", "start"], name="labelinterval_label_start"
+                    ),
+                    models.Index(
+                        fields=["rfc_to_be", "label"],
+                        name="labelinterval_rfc_label",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("end__isnull", True)),
+                        fields=("rfc_to_be", "label"),
+                        name="unique_open_label_interval_per_rfc",
+                        violation_error_message="label already has an open interval",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(forward, reverse),
+    ]
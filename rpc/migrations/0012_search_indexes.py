@@ -0,0 +1,55 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("datatracker", "0003_document_name_trgm"),
+        ("rpc", "0011_labelinterval"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="rfctobe",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("title"),
+                    name="gin_trgm_ops",
+                ),
+                name="rfctobe_title_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rfctobe",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("keywords"),
+                    name="gin_trgm_ops",
+                ),
+                name="rfctobe_keywords_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rfctobe",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "title", "abstract", config="english"
+                ),
+                name="rfctobe_search_vector",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rfcauthor",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("titlepage_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="rfcauthor_name_trgm",
+            ),
+        ),
+    ]
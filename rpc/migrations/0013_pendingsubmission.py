@@ -0,0 +1,30 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rpc", "0012_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingSubmission",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("datatracker_id", models.PositiveIntegerField(unique=True)),
+                ("name", models.CharField(max_length=255)),
+                ("stream", models.CharField(max_length=32)),
+                ("submitted", models.DateTimeField()),
+            ],
+        ),
+    ]
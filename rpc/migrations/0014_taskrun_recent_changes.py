@@ -0,0 +1,22 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rpc", "0013_pendingsubmission"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskrun",
+            name="recent_changes",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Recent RfcToBeChanges processed by the task, whether or "
+                "not they are behind the cursor",
+            ),
+        ),
+    ]
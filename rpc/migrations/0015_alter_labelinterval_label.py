@@ -0,0 +1,20 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rpc", "0014_taskrun_recent_changes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="labelinterval",
+            name="label",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="rpc.label"
+            ),
+        ),
+    ]
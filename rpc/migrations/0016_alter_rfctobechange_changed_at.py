@@ -0,0 +1,20 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rpc", "0015_alter_labelinterval_label"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="rfctobechange",
+            name="changed_at",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now
+            ),
+        ),
+    ]
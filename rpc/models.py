@@ -5,10 +5,11 @@ import logging
 from collections.abc import Iterable
 from dataclasses import dataclass
 from email.policy import EmailPolicy
-from itertools import pairwise
 
 from django import forms
 from django.contrib.postgres.forms import SimpleArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import (
@@ -17,6 +18,7 @@ from django.db.models import (
     Prefetch,
     Subquery,
 )
+from django.db.models.functions import Upper
 from django.utils import timezone
 from rules import always_deny
 from rules.contrib.models import RulesModel
@@ -47,6 +49,15 @@ class TaskRun(models.Model):
     task_name = models.CharField(max_length=255, unique=True)
     last_run_at = models.DateTimeField()
     is_running = models.BooleanField(default=False)
+    cursor = models.PositiveBigIntegerField(
+        default=0, help_text="Last RfcToBeChange processed by the task"
+    )
+    recent_changes = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Recent RfcToBeChanges processed by the task, whether or not "
+        "they are behind the cursor",
+    )
 
     class Meta:
         constraints = [
@@ -62,6 +73,23 @@ class TaskRun(models.Model):
         return f"{self.task_name} last ran at {self.last_run_at}"
 
 
+class RfcToBeChange(models.Model):
+    """Append-only log of changes that affect an RfcToBe's queue entry
+
+    Rows are written by rpc.signals in the same transaction as the change they
+    record. Periodic tasks read the log incrementally, remembering the last id
+    they processed in a TaskRun cursor, instead of scanning the history tables.
+    Ids are not committed in order, so they also re-read recent entries behind
+    the cursor, skipping those they already processed.
+    """
+
+    rfc_to_be_id = models.PositiveBigIntegerField()  # not a FK, may be deleted
+    changed_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"RfcToBe {self.rfc_to_be_id} changed at {self.changed_at}"
+
+
 class RpcPerson(models.Model):
     datatracker_person = models.OneToOneField(
         "datatracker.DatatrackerPerson", on_delete=models.PROTECT
@@ -196,6 +224,34 @@ class RfcToBeQuerySet(models.QuerySet):
             )
         )
 
+    def with_cluster(self):
+        """Prefetch the draft's cluster for use by RfcToBe.cluster"""
+        return self.prefetch_related(
+            Prefetch(
+                "draft__cluster_set",
+                queryset=Cluster.objects.order_by("pk"),
+                to_attr="clusters_annotated",
+            )
+        )
+
+    def with_pending_activities(self):
+        """Prefetch assignment states needed to compute pending activities
+
+        See pending_activities_from_states() in rpc.lifecycle.activities.
+        """
+        return self.prefetch_related(
+            Prefetch(
+                "assignment_set",
+                queryset=Assignment.objects.order_by("pk"),
+                to_attr="activity_assignments",
+            )
+        )
+
+
+# Full-text search vector over RfcToBe title and abstract. Queries must use this
+# same expression for the rfctobe_search_vector index to be used.
+RFCTOBE_SEARCH_VECTOR = SearchVector("title", "abstract", config="english")
+
 
 class RfcToBe(models.Model):
     """RPC representation of a pre-publication RFC"""
@@ -339,6 +395,17 @@ class RfcToBe(models.Model):
 
     class Meta:
         verbose_name_plural = "RfcToBes"
+        indexes = [
+            # Trigram indexes for case-insensitive substring search (__icontains)
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"), name="rfctobe_title_trgm"
+            ),
+            GinIndex(
+                OpClass(Upper("keywords"), name="gin_trgm_ops"),
+                name="rfctobe_keywords_trgm",
+            ),
+            GinIndex(RFCTOBE_SEARCH_VECTOR, name="rfctobe_search_vector"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["rfc_number"],
@@ -392,7 +459,13 @@ class RfcToBe(models.Model):
     # Easier interface to the cluster_set
     @property
     def cluster(self) -> "Cluster | None":
-        return self.draft.cluster_set.first() if self.draft else None
+        if self.draft is None:
+            return None
+        # Use prefetched value if present (see RfcToBeQuerySet.with_cluster())
+        clusters = getattr(self.draft, "clusters_annotated", None)
+        if clusters is not None:
+            return clusters[0] if clusters else None
+        return self.draft.cluster_set.first()
 
     @property
     def obsoletes(self) -> models.QuerySet["RfcToBe"]:
@@ -432,29 +505,11 @@ class RfcToBe(models.Model):
         end: datetime.datetime | None = None
 
     def time_intervals_with_label(self, label) -> list[Interval]:
-        hist = list(self.history.all())
-        label_changes = filter(
-            lambda delta: len(delta.changes) > 0,
-            (
-                newer.diff_against(older, included_fields=["labels"])
-                for newer, older in pairwise(hist)
-            ),
-        )
-
-        intervals: list[RfcToBe.Interval] = []
-        for ch in reversed(list(label_changes)):
-            # Every changeset will have 1 change because we specified 1 included_field
-            if label.pk in [
-                related_label["label"] for related_label in ch.changes[0].new
-            ]:
-                if len(intervals) == 0 or intervals[-1].end is not None:
-                    intervals.append(RfcToBe.Interval(start=ch.new_record.history_date))
-            else:
-                if len(intervals) > 0 and intervals[-1].end is None:
-                    intervals[-1].end = ch.new_record.history_date
-        if len(intervals) > 0 and intervals[-1].end is None:
-            intervals[-1].end = datetime.datetime.now().astimezone(datetime.UTC)
-        return intervals
+        now = timezone.now()
+        return [
+            RfcToBe.Interval(start=interval.start, end=interval.end or now)
+            for interval in self.labelinterval_set.filter(label=label).order_by("start")
+        ]
 
     def incomplete_activities(self):
         from .lifecycle.activities import incomplete_activities
@@ -683,7 +738,11 @@ class ClusterMember(models.Model):
 
 class ClusterQuerySet(models.QuerySet):
     def with_data_annotated(self):
-        """Prefetch cluster members with related data to avoid N+1 queries"""
+        """Prefetch cluster members with related data to avoid N+1 queries
+
+        Members' RfcToBes are annotated with their blocked state and final approval
+        counts, and their references with the status of their targets.
+        """
 
         return self.prefetch_related(
             Prefetch(
@@ -699,6 +758,18 @@ class ClusterQuerySet(models.QuerySet):
                         "doc__rfctobe_set",
                         queryset=RfcToBe.objects.exclude(disposition__slug="withdrawn")
                         .select_related("disposition")
+                        .annotate(
+                            is_blocked_annotated=Exists(
+                                Assignment.objects.filter(
+                                    rfc_to_be=OuterRef("pk"), role_id="blocked"
+                                ).active()
+                            ),
+                            final_approval_total=models.Count("finalapproval"),
+                            final_approval_approved=models.Count(
+                                "finalapproval",
+                                filter=models.Q(finalapproval__approved__isnull=False),
+                            ),
+                        )
                         .prefetch_related(
                             Prefetch(
                                 "rpcrelateddocument_set",
@@ -706,11 +777,14 @@ class ClusterQuerySet(models.QuerySet):
                                     relationship__slug__in=(
                                         DocRelationshipName.REFERENCE_RELATIONSHIP_SLUGS
                                     )
-                                ).select_related(
+                                )
+                                .select_related(
                                     "relationship",
                                     "target_document",
                                     "target_rfctobe__draft",
-                                ),
+                                    "target_rfctobe__disposition",
+                                )
+                                .with_target_status_annotated(),
                                 to_attr="references_annotated",
                             )
                         ),
@@ -865,6 +939,12 @@ class RfcAuthor(models.Model):
         return f"{self.datatracker_person} as author of {self.rfc_to_be}"
 
     class Meta:
+        indexes = [
+            GinIndex(
+                OpClass(Upper("titlepage_name"), name="gin_trgm_ops"),
+                name="rfcauthor_name_trgm",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["datatracker_person", "rfc_to_be"],
@@ -1023,6 +1103,28 @@ class ActionHolder(models.Model):
         )
 
 
+class RpcRelatedDocumentQuerySet(models.QuerySet):
+    def with_target_status_annotated(self):
+        """Annotate whether each target is received and whether it is blocked
+
+        A target is received if it has a non-withdrawn RfcToBe. It is blocked if
+        its RfcToBe has an active 'blocked' assignment.
+        """
+        return self.annotate(
+            target_is_received_annotated=Exists(
+                RfcToBe.objects.filter(
+                    models.Q(pk=OuterRef("target_rfctobe"))
+                    | models.Q(draft=OuterRef("target_document"))
+                ).exclude(disposition_id="withdrawn")
+            ),
+            target_is_blocked_annotated=Exists(
+                Assignment.objects.filter(
+                    rfc_to_be=OuterRef("target_rfctobe"), role_id="blocked"
+                ).active()
+            ),
+        )
+
+
 class RpcRelatedDocument(models.Model):
     """Relationship between an RFC-to-be and a draft, RFC, or RFC-to-be
 
@@ -1031,6 +1133,8 @@ class RpcRelatedDocument(models.Model):
     rtb.rpcrelateddocument_target_set()  # relationships where rtb is target
     """
 
+    objects = RpcRelatedDocumentQuerySet.as_manager()
+
     relationship = models.ForeignKey("DocRelationshipName", on_delete=models.PROTECT)
     source = models.ForeignKey(RfcToBe, on_delete=models.PROTECT)
     target_document = models.ForeignKey(
@@ -1175,6 +1279,68 @@ class Label(models.Model):
         return self.slug
 
 
+class LabelInterval(models.Model):
+    """Period during which an RfcToBe carried a Label
+
+    Maintained from label changes (see rpc.signals) so that label statistics can
+    be computed without replaying the RfcToBe history. An interval with no end is
+    still open.
+    """
+
+    rfc_to_be = models.ForeignKey(RfcToBe, on_delete=models.CASCADE)
+    label = models.ForeignKey(Label, on_delete=models.CASCADE)
+    start = models.DateTimeField()
+    end = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["label", "start"], name="labelinterval_label_start"),
+            models.Index(fields=["rfc_to_be", "label"], name="labelinterval_rfc_label"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["rfc_to_be", "label"],
+                condition=models.Q(end__isnull=True),
+                name="unique_open_label_interval_per_rfc",
+                violation_error_message="label already has an open interval",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.label} on {self.rfc_to_be} from {self.start} to {self.end}"
+
+
+class PendingSubmissionQuerySet(models.QuerySet):
+    def not_in_queue(self):
+        """PendingSubmissions without an active (non-withdrawn) RfcToBe"""
+        return self.exclude(
+            Exists(
+                RfcToBe.objects.filter(
+                    draft__datatracker_id=OuterRef("datatracker_id")
+                ).exclude(disposition__slug="withdrawn")
+            )
+        )
+
+
+class PendingSubmission(models.Model):
+    """Document submitted to the RPC, as last listed by the datatracker
+
+    Mirrors the datatracker's submitted_to_rpc() list so that the submissions inbox
+    is served from the database. Refreshed by refresh_pending_submissions_task and
+    updated by import_submission.
+    """
+
+    datatracker_id = models.PositiveIntegerField(unique=True)
+    name = models.CharField(max_length=255)
+    stream = models.CharField(max_length=32)
+    submitted = models.DateTimeField()
+
+    objects = PendingSubmissionQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.name} submitted {self.submitted}"
+
+
 class RpcAuthorComment(models.Model):
     """Private RPC comment about an author
 
@@ -1,5 +1,16 @@
 # Copyright The IETF Trust 2025, All Rights Reserved
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class DefaultLimitOffsetPagination(LimitOffsetPagination):
@@ -13,3 +24,185 @@ class DefaultLimitOffsetPagination(LimitOffsetPagination):
     # Setting a default ensures the pagination fields are always present in the
     # response. Without it, the OpenAPI schema gives a grossly wrong response schema
     default_limit = 100
+
+
+def approximate_count(queryset) -> int:
+    """Planner's estimate of the number of rows in a queryset"""
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class _CursorEncoder(json.JSONEncoder):
+    # Unlike DjangoJSONEncoder, keeps the full precision of datetimes
+    def default(self, o):
+        if isinstance(o, datetime.date | datetime.time):
+            return o.isoformat()
+        return str(o)
+
+
+class KeysetLimitOffsetPagination(DefaultLimitOffsetPagination):
+    """LimitOffset pagination with an opt-in keyset (cursor) mode
+
+    Passing the cursor query parameter, empty for the first page, selects keyset
+    pagination. Each page is then found by filtering on the ordering fields of the
+    last item of the previous page rather than with an OFFSET, and no count query
+    is made, so walking through every page is linear overall. The pk is added to
+    the ordering to break ties. Only next links are provided in keyset mode. Pass
+    count=true to get the planner's estimate of the number of results as count.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = (
+        "Cursor for keyset pagination, from a next link. Pass an empty value to get "
+        "the first page with keyset pagination instead of limit/offset."
+    )
+    count_query_param = "count"
+    count_query_description = (
+        "With keyset pagination, include an approximate count of the results."
+    )
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = self._keyset_ordering(queryset)
+        self.count = None
+        if request.query_params.get(self.count_query_param, "").lower() in (
+            "1",
+            "true",
+        ):
+            self.count = approximate_count(queryset)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = self._decode_cursor(request.query_params[self.cursor_query_param])
+        if cursor is not None:
+            queryset = queryset.filter(self._after_cursor(queryset.model, cursor))
+        results = list(queryset[: self.limit + 1])
+        self.next_cursor = None
+        if len(results) > self.limit:
+            results = results[: self.limit]
+            self.next_cursor = self._encode_cursor(results[-1])
+        return results
+
+    @staticmethod
+    def _keyset_ordering(queryset) -> list[str]:
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            raise NotFound("Keyset pagination is not supported for this ordering")
+        ordering = [
+            field.replace("pk", queryset.model._meta.pk.name)
+            if field.lstrip("-") == "pk"
+            else field
+            for field in ordering
+        ]
+        if not any(
+            field.lstrip("-") == queryset.model._meta.pk.name for field in ordering
+        ):
+            ordering.append(queryset.model._meta.pk.name)
+        return ordering
+
+    def _encode_cursor(self, item) -> str:
+        values = []
+        for field in self.ordering:
+            value = item
+            for part in field.lstrip("-").split(LOOKUP_SEP):
+                value = getattr(value, part, None)
+                if value is None:
+                    break
+            values.append(value)
+        payload = json.dumps([self.ordering, values], cls=_CursorEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def _decode_cursor(self, encoded: str) -> list | None:
+        if not encoded:
+            return None
+        try:
+            ordering, values = json.loads(base64.urlsafe_b64decode(encoded))
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as err:
+            raise NotFound(self.invalid_cursor_message) from err
+        if ordering != self.ordering or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    @staticmethod
+    def _is_nullable(model, field_path: str) -> bool:
+        for part in field_path.split(LOOKUP_SEP):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return True
+            if field.null:
+                return True
+            model = field.related_model
+        return False
+
+    def _after_cursor(self, model, values) -> Q:
+        """Q for items after the cursor values in the keyset ordering
+
+        Follows PostgreSQL's ordering of NULLs: last when ascending, first when
+        descending.
+        """
+        after = Q(pk__in=[])
+        equal = Q()
+        for field, value in zip(self.ordering, values, strict=True):
+            descending = field.startswith("-")
+            name = field.lstrip("-")
+            nullable = self._is_nullable(model, name)
+            if value is None:
+                beyond = Q(**{f"{name}__isnull": False}) if descending else Q(pk__in=[])
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                beyond = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+                if nullable and not descending:
+                    beyond |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            after |= equal & beyond
+            equal &= same
+        return after
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": None,
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_cursor is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.offset_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"]["nullable"] = True
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.cursor_query_description,
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.count_query_description,
+                "schema": {"type": "boolean"},
+            },
+        ]
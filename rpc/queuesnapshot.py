@@ -0,0 +1,83 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+"""Materialized snapshots of the serialized queue
+
+Rendering the queue is expensive, but its contents only change when one of the
+models that feed it is written. Writes bump a generation counter (see
+rpc.signals) and readers are served the JSON rendered for the current generation,
+rebuilding it only when the generation has moved on.
+"""
+
+import hashlib
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+QUEUE_GENERATION_CACHE_KEY = "queue_snapshot_generation"
+QUEUE_SNAPSHOT_CACHE_KEY = "queue_snapshot:{name}:{generation}"
+# Bounds the staleness of datatracker-derived data (names, etc) in a snapshot
+QUEUE_SNAPSHOT_CACHE_TTL = 5 * 60  # seconds
+
+
+@dataclass
+class QueueSnapshot:
+    etag: str
+    content: bytes
+
+    def as_response(self, request) -> HttpResponse:
+        if self.etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(self.content, content_type="application/json")
+        response["ETag"] = self.etag
+        return response
+
+
+def _initial_generation() -> int:
+    # Use a clock value so that a generation counter that was evicted from the cache
+    # does not restart at a value whose snapshot may still be cached.
+    return time.time_ns()
+
+
+def current_queue_generation() -> int:
+    generation = cache.get(QUEUE_GENERATION_CACHE_KEY)
+    if generation is None:
+        generation = _initial_generation()
+        if not cache.add(QUEUE_GENERATION_CACHE_KEY, generation, timeout=None):
+            # someone else beat us to it
+            generation = cache.get(QUEUE_GENERATION_CACHE_KEY, generation)
+    return generation
+
+
+def bump_queue_generation():
+    """Invalidate existing queue snapshots"""
+    try:
+        cache.incr(QUEUE_GENERATION_CACHE_KEY)
+    except ValueError:
+        # key is missing
+        cache.set(QUEUE_GENERATION_CACHE_KEY, _initial_generation(), timeout=None)
+
+
+def get_queue_snapshot(name: str, build: Callable[[], list]) -> QueueSnapshot:
+    """Get the snapshot of the named queue for the current generation
+
+    If no snapshot is cached, build() is called to get the serialized data and the
+    rendered result is cached.
+    """
+    generation = current_queue_generation()
+    cache_key = QUEUE_SNAPSHOT_CACHE_KEY.format(name=name, generation=generation)
+    snapshot = cache.get(cache_key)
+    if snapshot is None:
+        logger.debug("Building %s queue snapshot for generation %d", name, generation)
+        content = JSONRenderer().render(build())
+        snapshot = QueueSnapshot(
+            etag=f'"{hashlib.sha256(content).hexdigest()}"', content=content
+        )
+        cache.set(cache_key, snapshot, QUEUE_SNAPSHOT_CACHE_TTL)
+    return snapshot
@@ -0,0 +1,87 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+"""Document search
+
+Each kind of match is found with its own indexed lookup: RFC, cluster and subseries
+numbers with their (unique) indexes, substrings of draft names, titles, keywords
+and author names with pg_trgm GIN indexes, and words in the title and abstract
+with a full-text index. The database combines the lookups with a UNION, and only
+the matching RfcToBes are then ranked, so search time depends on the number of
+matches rather than on the size of the corpus.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import Case, F, FloatField, QuerySet, Value, When
+from django.db.models.functions import Greatest
+
+from .models import RFCTOBE_SEARCH_VECTOR, RfcAuthor, RfcToBe, SubseriesMember
+
+# hardcoded regex for subseries to avoid additional query overhead getting
+# subseries types dynamically; needs update if new subseries types are added
+SUBSERIES_QUERY_RE = re.compile(r"^(bcp|std|fyi)\s*(\d+)$")
+
+
+def _number_matches(query: str) -> QuerySet:
+    """Ids of RfcToBes that a query for an RFC, cluster or subseries number matches"""
+    if query.isdigit():
+        rfc_number = int(query)
+    elif query.lower().startswith("rfc") and query[3:].strip().isdigit():
+        rfc_number = int(query[3:])
+    else:
+        rfc_number = None
+    if rfc_number is not None:
+        return RfcToBe.objects.filter(rfc_number=rfc_number).values("pk")
+    if query.lower().startswith("c") and query[1:].isdigit():
+        return RfcToBe.objects.filter(
+            draft__clustermember__cluster__number=int(query[1:])
+        ).values("pk")
+    subseries_match = SUBSERIES_QUERY_RE.match(query.lower())
+    if subseries_match:
+        return SubseriesMember.objects.filter(
+            type__slug=subseries_match.group(1),
+            number=int(subseries_match.group(2)),
+        ).values("rfc_to_be_id")
+    return RfcToBe.objects.none().values("pk")
+
+
+def _text_matches(query: str) -> list[QuerySet]:
+    """Ids of RfcToBes whose text matches a query, one queryset per index"""
+    return [
+        RfcToBe.objects.filter(draft__name__icontains=query).values("pk"),
+        RfcAuthor.objects.filter(titlepage_name__icontains=query).values(
+            "rfc_to_be_id"
+        ),
+        RfcToBe.objects.filter(title__icontains=query).values("pk"),
+        RfcToBe.objects.filter(keywords__icontains=query).values("pk"),
+        RfcToBe.objects.annotate(search_vector=RFCTOBE_SEARCH_VECTOR)
+        .filter(search_vector=_search_query(query))
+        .values("pk"),
+    ]
+
+
+def _search_query(query: str) -> SearchQuery:
+    return SearchQuery(query, search_type="websearch", config="english")
+
+
+def search_rfctobes(query: str) -> QuerySet:
+    """RfcToBes that match a search query, annotated with a rank
+
+    Matches by RFC, cluster or subseries number rank first, then matches by how
+    similar the draft name and title are to the query and by how well the title
+    and abstract match it as a full-text query.
+    """
+    number_matches = _number_matches(query)
+    matches = number_matches.union(*_text_matches(query))
+    return RfcToBe.objects.filter(pk__in=matches).annotate(
+        rank=Case(
+            When(pk__in=number_matches, then=Value(2.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        + Greatest(
+            TrigramSimilarity(F("draft__name"), query),
+            TrigramSimilarity(F("title"), query),
+        )
+        + SearchRank(RFCTOBE_SEARCH_VECTOR, _search_query(query)),
+    )
@@ -2,7 +2,7 @@
 
 import datetime
 import warnings
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from email.policy import EmailPolicy
 from itertools import pairwise
@@ -18,8 +18,10 @@ from simple_history.models import ModelDelta
 from simple_history.utils import update_change_reason
 
 from datatracker.models import DatatrackerPerson, Document
-from datatracker.rpcapi import datatracker_api, with_rpcapi
+from datatracker.references import get_draft_references
+from datatracker.rpcapi import with_rpcapi
 from datatracker.utils import build_datatracker_url
+from rpc.lifecycle.activities import pending_activities_from_states
 from rpc.lifecycle.metadata import MetadataComparator
 
 from .dt_v1_api_utils import datatracker_group_name
@@ -41,7 +43,6 @@ from .models import (
     MetadataValidationResults,
     RfcAuthor,
     RfcToBe,
-    RfcToBeBlockingReason,
     RpcDocumentComment,
     RpcPerson,
     RpcRelatedDocument,
@@ -119,10 +120,20 @@ class HistoryRecord:
     field: str | None = None
 
     @classmethod
-    def from_simple_history(cls, sh, desc, *, model=None, field=None):
-        dt_person = (
-            None if sh.history_user is None else sh.history_user.datatracker_person()
-        )
+    def from_simple_history(cls, sh, desc, *, model=None, field=None, people=None):
+        """Create from a simple-history record
+
+        If given, people maps history_user_id to DatatrackerPerson and is used
+        instead of looking up the history_user's DatatrackerPerson.
+        """
+        if people is not None:
+            dt_person = people.get(sh.history_user_id)
+        else:
+            dt_person = (
+                None
+                if sh.history_user is None
+                else sh.history_user.datatracker_person()
+            )
         return cls(
             id=sh.history_id,
             date=sh.history_date,
@@ -203,6 +214,23 @@ class HistorySerializer(serializers.Serializer):
         super().__init__(instance, data, **kwargs)
 
 
+class HistoryPageSerializer(serializers.Serializer):
+    """Serialize a HistoryPage"""
+
+    next = serializers.URLField(allow_null=True)
+    results = serializers.ListField(child=HistorySerializer(), source="records")
+
+
+class TypeaheadSuggestionSerializer(serializers.Serializer):
+    """Serialize a typeahead suggestion for a document"""
+
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    rfc_number = serializers.IntegerField(allow_null=True)
+    title = serializers.CharField()
+    disposition = serializers.CharField()
+
+
 class HistoryLastEditSerializer(serializers.Serializer):
     """Serialize the most recent change in a HistoricalRecord"""
 
@@ -555,7 +583,7 @@ class QueueItemSerializer(serializers.ModelSerializer):
     actionholder_set = ActionHolderSerializer(
         source="active_actionholders", many=True, read_only=True
     )
-    pending_activities = RpcRoleSerializer(many=True, read_only=True)
+    pending_activities = serializers.SerializerMethodField()
     enqueued_at = serializers.SerializerMethodField()
     final_review_started_at = serializers.DateTimeField(read_only=True, allow_null=True)
     final_approval = FinalApprovalSerializer(
@@ -588,6 +616,26 @@ class QueueItemSerializer(serializers.ModelSerializer):
             "blocking_reasons",
         ]
 
+    @extend_schema_field(RpcRoleSerializer(many=True))
+    def get_pending_activities(self, obj):
+        """Get the roles of activities waiting for assignment"""
+        # Use prefetched assignments if present to avoid per-row queries
+        assignments = getattr(obj, "activity_assignments", None)
+        if assignments is None:
+            return RpcRoleSerializer(obj.pending_activities(), many=True).data
+        pending_slugs = {
+            activity.role_slug
+            for activity in pending_activities_from_states(
+                (assignment.role_id, assignment.state) for assignment in assignments
+            )
+        }
+        # The list serializer shares one child, so this loads roles once per response
+        if not hasattr(self, "_roles"):
+            self._roles = list(RpcRole.objects.all())
+        return RpcRoleSerializer(
+            [role for role in self._roles if role.slug in pending_slugs], many=True
+        ).data
+
     @extend_schema_field(serializers.DateField())
     def get_enqueued_at(self, obj):
         """Get the date when the RFC was added to the queue"""
@@ -848,302 +896,6 @@ class RfcToBeSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-def _person_label(pk) -> str:
-    """Resolve a DatatrackerPerson pk to 'Name (#datatracker_id)'."""
-    if pk is None:
-        return "none"
-    try:
-        person = DatatrackerPerson.objects.get(pk=int(pk))
-        return f"{person.plain_name} (#{person.datatracker_id})"
-    except (DatatrackerPerson.DoesNotExist, ValueError, TypeError):
-        return f"#{pk}"
-
-
-_PERSON_FK_FIELDS = {
-    "stream_manager",
-    "stream_manager_id",
-    "iesg_contact",
-    "iesg_contact_id",
-    "shepherd",
-    "shepherd_id",
-}
-
-
-def _process_history_qs(qs, describe_delta=None, *, model=None) -> list[HistoryRecord]:
-    """Convert a simple-history queryset to HistoryRecord objects."""
-    records = []
-    model_histories = list(qs.all())
-    if not model_histories:
-        return records
-    for newer, older in pairwise(model_histories):
-        delta = newer.diff_against(older)
-        if delta.changes:
-            if describe_delta:
-                parts = list(describe_delta(delta))
-            else:
-                parts = [
-                    f"{c.field.capitalize()} ({c.old} → {c.new}): Changed"
-                    for c in delta.changes
-                ]
-            field = (
-                delta.changes[0].field.removesuffix("_id")
-                if len(delta.changes) == 1
-                else None
-            )
-        elif newer.history_change_reason:
-            parts = [newer.history_change_reason]
-            field = None
-        else:
-            parts = []
-            field = None
-        if parts:
-            records.append(
-                HistoryRecord.from_simple_history(
-                    newer, "; ".join(parts), model=model, field=field
-                )
-            )
-    first = model_histories[-1]
-    records.append(
-        HistoryRecord.from_simple_history(
-            first,
-            first.history_change_reason or "Record created",
-            model=model,
-            field=None,
-        )
-    )
-    return records
-
-
-def _instance_history_records(
-    histories: list, prefix: str, *, model=None, field=None
-) -> list[HistoryRecord]:
-    """Convert per-instance history records (newest-first) to HistoryRecord objects."""
-    records = []
-    if histories[0].history_type == "-":
-        h = histories[0]
-        desc = h.history_change_reason or "Removed"
-        records.append(
-            HistoryRecord.from_simple_history(
-                h, f"{prefix}: {desc}", model=model, field=field
-            )
-        )
-        histories = histories[1:]
-    if not histories:
-        return records
-    for newer, older in pairwise(histories):
-        delta = newer.diff_against(older)
-        if delta.changes:
-            parts = [
-                f"{c.field.capitalize()} ({c.old} → {c.new}): Changed"
-                for c in delta.changes
-            ]
-            inferred_field = (
-                delta.changes[0].field.removesuffix("_id")
-                if len(delta.changes) == 1
-                else None
-            )
-        elif newer.history_change_reason:
-            parts = [newer.history_change_reason]
-            inferred_field = None
-        else:
-            parts = []
-            inferred_field = None
-        if parts:
-            records.append(
-                HistoryRecord.from_simple_history(
-                    newer,
-                    f"{prefix}: {'; '.join(parts)}",
-                    model=model,
-                    field=field or inferred_field,
-                )
-            )
-    first = histories[-1]
-    desc = first.history_change_reason or "Added"
-    records.append(
-        HistoryRecord.from_simple_history(
-            first, f"{prefix}: {desc}", model=model, field=field
-        )
-    )
-    return records
-
-
-def _related_history(
-    history_qs, make_prefix, *, model=None, field=None
-) -> list[HistoryRecord]:
-    """Collect HistoryRecord objects from a related model's history queryset.
-
-    Processes each instance's history with _instance_history_records.
-    make_prefix(newest_history_record) -> str prefix for descriptions.
-    """
-    by_pk: dict[int, list] = {}
-    for h in history_qs.order_by("id", "-history_date"):
-        by_pk.setdefault(h.id, []).append(h)
-    records = []
-    for _pk, histories in by_pk.items():
-        records.extend(
-            _instance_history_records(
-                histories, make_prefix(histories[0]), model=model, field=field
-            )
-        )
-    return records
-
-
-def _rfctobe_describe_delta(delta: ModelDelta):
-    for change in delta.changes:
-        if change.field == "labels":
-            old = set(delta.old_record.labels.values_list("label__pk", flat=True))
-            new = set(delta.new_record.labels.values_list("label__pk", flat=True))
-            added = new - old
-            removed = old - new
-            hist_labels = Label.history.as_of(delta.new_record.history_date)
-            for label in hist_labels.filter(id__in=added):
-                yield f"Label ({label.slug}): Added"
-            for label in hist_labels.filter(id__in=removed):
-                yield f"Label ({label.slug}): Removed"
-        elif change.field in _PERSON_FK_FIELDS:
-            display_field = change.field.removesuffix("_id")
-            old_label = _person_label(change.old)
-            new_label = _person_label(change.new)
-            yield f"{display_field.capitalize()} ({old_label} → {new_label}): Changed"
-        else:
-            yield f"{change.field.capitalize()} ({change.old} → {change.new}): Changed"
-
-
-def collect_rfctobe_history(rfc_to_be: RfcToBe) -> list[HistoryRecord]:
-    """Collect and merge all history for an RfcToBe and its related models."""
-    records = _process_history_qs(
-        rfc_to_be.history, _rfctobe_describe_delta, model="rfctobe"
-    )
-
-    def _assignment_prefix(h):
-        try:
-            role_slug = RpcRole.objects.get(pk=h.role_id).slug
-        except (RpcRole.DoesNotExist, AttributeError):
-            role_slug = str(h.role_id) if h.role_id else "unknown"
-        try:
-            person_name = RpcPerson.objects.get(
-                pk=h.person_id
-            ).datatracker_person.plain_name
-        except Exception:
-            person_name = None
-        person_part = f", {person_name}" if person_name else ""
-        return f"Assignment ({role_slug}{person_part})"
-
-    records.extend(
-        _related_history(
-            Assignment.history.filter(rfc_to_be=rfc_to_be.pk),
-            _assignment_prefix,
-            model="assignment",
-        )
-    )
-
-    def _subseries_prefix(h):
-        try:
-            type_slug = SubseriesTypeName.objects.get(pk=h.type_id).slug.upper()
-        except Exception:
-            type_slug = str(h.type_id)
-        return f"Subseries ({type_slug} {h.number})"
-
-    records.extend(
-        _related_history(
-            SubseriesMember.history.filter(rfc_to_be=rfc_to_be.pk),
-            _subseries_prefix,
-            model="subseries",
-        )
-    )
-
-    def _related_doc_prefix(h):
-        try:
-            rel_slug = DocRelationshipName.objects.get(pk=h.relationship_id).slug
-        except Exception:
-            rel_slug = str(h.relationship_id)
-        target = None
-        if h.target_document_id:
-            try:
-                target = Document.objects.get(pk=h.target_document_id).name
-            except Document.DoesNotExist:
-                target = f"doc#{h.target_document_id}"
-        elif h.target_rfctobe_id:
-            try:
-                rt = RfcToBe.objects.get(pk=h.target_rfctobe_id)
-                target = rt.name or (
-                    f"RFC {rt.rfc_number}" if rt.rfc_number else f"#{rt.pk}"
-                )
-            except RfcToBe.DoesNotExist:
-                target = f"#{h.target_rfctobe_id}"
-        return f"Reference ({rel_slug}{', ' + target if target else ''})"
-
-    records.extend(
-        _related_history(
-            RpcRelatedDocument.history.filter(source=rfc_to_be.pk),
-            _related_doc_prefix,
-            model="reference",
-        )
-    )
-
-    if rfc_to_be.draft_id:
-
-        def _cluster_member_prefix(h):
-            try:
-                return (
-                    "Cluster membership (cluster "
-                    f"#{Cluster.objects.get(pk=h.cluster_id).number})"
-                )
-            except Cluster.DoesNotExist:
-                return "Cluster membership"
-
-        records.extend(
-            _related_history(
-                ClusterMember.history.filter(doc=rfc_to_be.draft_id),
-                _cluster_member_prefix,
-                model="cluster_member",
-            )
-        )
-
-    def _final_approval_prefix(h):
-        if h.approver_id:
-            try:
-                name = DatatrackerPerson.objects.get(pk=h.approver_id).plain_name
-                return f"Final approval ({name})"
-            except DatatrackerPerson.DoesNotExist:
-                pass
-        return "Final approval"
-
-    records.extend(
-        _related_history(
-            FinalApproval.history.filter(rfc_to_be=rfc_to_be.pk),
-            _final_approval_prefix,
-            model="final_approval",
-        )
-    )
-
-    records.extend(
-        _related_history(
-            RfcAuthor.history.filter(rfc_to_be=rfc_to_be.pk),
-            lambda h: f"Author ({h.titlepage_name})",
-            model="rfc_author",
-            field="titlepage_author",
-        )
-    )
-
-    def _blocking_reason_prefix(h):
-        try:
-            slug = BlockingReason.objects.get(pk=h.reason_id).slug
-            return f"Blocking reason ({slug})"
-        except BlockingReason.DoesNotExist:
-            return "Blocking reason"
-
-    records.extend(
-        _related_history(
-            RfcToBeBlockingReason.history.filter(rfc_to_be=rfc_to_be.pk),
-            _blocking_reason_prefix,
-            model="blocking_reason",
-        )
-    )
-
-    return sorted(records, key=lambda r: r.date, reverse=True)
-
-
 class CreateRfcToBeSerializer(serializers.ModelSerializer):
     """Serializer for RfcToBe fields that need to be specified explicitly on import"""
 
@@ -1264,6 +1016,10 @@ class RpcRelatedDocumentSerializer(serializers.ModelSerializer):
     @extend_schema_field(serializers.BooleanField())
     def get_target_is_received(self, obj: RpcRelatedDocument) -> bool:
         """True if the target document has a non-withdrawn RfcToBe."""
+        # Use annotated value if present to avoid per-row queries
+        annotated = getattr(obj, "target_is_received_annotated", None)
+        if annotated is not None:
+            return annotated
         if obj.target_rfctobe is not None:
             return obj.target_rfctobe.disposition_id != "withdrawn"
         if obj.target_document is not None:
@@ -1277,6 +1033,9 @@ class RpcRelatedDocumentSerializer(serializers.ModelSerializer):
     @extend_schema_field(serializers.BooleanField())
     def get_target_is_blocked(self, obj: RpcRelatedDocument) -> bool:
         """True if the target document has an active 'blocked' role assignment."""
+        annotated = getattr(obj, "target_is_blocked_annotated", None)
+        if annotated is not None:
+            return annotated
         return _rfctobe_is_blocked(obj.target_rfctobe if obj.target_rfctobe else None)
 
 
@@ -1651,7 +1410,10 @@ class ClusterMemberSerializer(serializers.Serializer):
         return None
 
     def get_is_blocked(self, clustermember: ClusterMember) -> bool:
-        return _rfctobe_is_blocked(self._get_rfctobe(clustermember))
+        rfctobe = self._get_rfctobe(clustermember)
+        if hasattr(rfctobe, "is_blocked_annotated"):
+            return rfctobe.is_blocked_annotated
+        return _rfctobe_is_blocked(rfctobe)
 
     def _get_rfctobe(self, clustermember: ClusterMember):
         if hasattr(clustermember.doc, "rfctobe_annotated"):
@@ -1666,12 +1428,16 @@ class ClusterMemberSerializer(serializers.Serializer):
         rfctobe = self._get_rfctobe(clustermember)
         if rfctobe is None:
             return None
-        total = FinalApproval.objects.filter(rfc_to_be=rfctobe).count()
+        if hasattr(rfctobe, "final_approval_total"):
+            total = rfctobe.final_approval_total
+            approved = rfctobe.final_approval_approved
+        else:
+            total = FinalApproval.objects.filter(rfc_to_be=rfctobe).count()
+            approved = FinalApproval.objects.filter(
+                rfc_to_be=rfctobe, approved__isnull=False
+            ).count()
         if total == 0:
             return None
-        approved = FinalApproval.objects.filter(
-            rfc_to_be=rfctobe, approved__isnull=False
-        ).count()
         return FinalApprovalCountsSerializer(
             {"approved": approved, "total": total}
         ).data
@@ -1685,39 +1451,8 @@ class ClusterMemberSerializer(serializers.Serializer):
         rfctobe = self._get_rfctobe(clustermember)
 
         if not rfctobe:
-            # if the doc is not received, get references on-the-fly from dt
-            with datatracker_api():
-                api_references = rpcapi.get_draft_references(
-                    clustermember.doc.datatracker_id
-                )
-            if not api_references:
-                return None
-
-            references_data = []
-            existing_rfc_to_be = dict(
-                RfcToBe.objects.filter(
-                    draft__datatracker_id__in=[s.id for s in api_references]
-                )
-                .exclude(disposition__slug="withdrawn")
-                .values_list("draft__datatracker_id", "disposition__slug")
-            )
-            for ref in api_references:
-                if not existing_rfc_to_be.get(ref.id):
-                    relationship = DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG
-                elif existing_rfc_to_be.get(ref.id) in ("created", "in_progress"):
-                    relationship = DocRelationshipName.REFQUEUE_RELATIONSHIP_SLUG
-                else:
-                    continue
-                references_data.append(
-                    {
-                        "id": None,
-                        "relationship": relationship,
-                        "draft_name": clustermember.doc.name,
-                        "target_draft_name": ref.name,
-                    }
-                )
-
-            return references_data
+            # if the doc is not received, get its references from the datatracker
+            return self._not_received_references(clustermember.doc, rpcapi=rpcapi)
 
         # Check if references are already prefetched
         if hasattr(rfctobe, "references_annotated"):
@@ -1736,6 +1471,73 @@ class ClusterMemberSerializer(serializers.Serializer):
 
         return RpcRelatedDocumentSerializer(related_docs, many=True).data
 
+    def _not_received_docs(self) -> dict[int, Document]:
+        """Documents of not-received members of all clusters being serialized"""
+        clusters = self.root.instance
+        if isinstance(clusters, Cluster):
+            clusters = [clusters]
+        elif not isinstance(clusters, Iterable):
+            clusters = []
+        return {
+            member.doc.datatracker_id: member.doc
+            for cluster in clusters
+            # only clusters whose members were prefetched by with_data_annotated()
+            if "clustermember_set" in getattr(cluster, "_prefetched_objects_cache", {})
+            for member in cluster.clustermember_set.all()
+            if self._get_rfctobe(member) is None
+        }
+
+    def _not_received_references(
+        self, doc: Document, *, rpcapi: rpcapi_client.PurpleApi
+    ) -> list[dict] | None:
+        """References of a not-received document, from the datatracker
+
+        The first call looks up the references of every not-received member of the
+        clusters being serialized at once, so the number of queries does not depend
+        on the number of clusters or members.
+        """
+        loaded = self.context.setdefault("not_received_references", {})
+        if doc.datatracker_id in loaded:
+            return loaded[doc.datatracker_id]
+        docs = {
+            datatracker_id: other_doc
+            for datatracker_id, other_doc in self._not_received_docs().items()
+            if datatracker_id not in loaded
+        }
+        docs[doc.datatracker_id] = doc
+        api_references = get_draft_references(docs, rpcapi=rpcapi)
+        existing_rfc_to_be = dict(
+            RfcToBe.objects.filter(
+                draft__datatracker_id__in={
+                    ref.id for refs in api_references.values() for ref in refs
+                }
+            )
+            .exclude(disposition__slug="withdrawn")
+            .values_list("draft__datatracker_id", "disposition__slug")
+        )
+        for datatracker_id, refs in api_references.items():
+            if not refs:
+                loaded[datatracker_id] = None
+                continue
+            references_data = []
+            for ref in refs:
+                if not existing_rfc_to_be.get(ref.id):
+                    relationship = DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG
+                elif existing_rfc_to_be.get(ref.id) in ("created", "in_progress"):
+                    relationship = DocRelationshipName.REFQUEUE_RELATIONSHIP_SLUG
+                else:
+                    continue
+                references_data.append(
+                    {
+                        "id": None,
+                        "relationship": relationship,
+                        "draft_name": docs[datatracker_id].name,
+                        "target_draft_name": ref.name,
+                    }
+                )
+            loaded[datatracker_id] = references_data
+        return loaded[doc.datatracker_id]
+
     def get_is_received(self, clustermember: ClusterMember) -> bool | None:
         """Determine if the document has been received based on related documents"""
         if hasattr(clustermember.doc, "rfctobe_annotated"):
@@ -2029,7 +1831,7 @@ class SubmissionListItemSerializer(serializers.Serializer):
     Only includes a subset of the SubmissionSerializer fields
     """
 
-    id = serializers.IntegerField()
+    id = serializers.IntegerField(source="datatracker_id")
     name = serializers.CharField()
     stream = serializers.CharField()
     submitted = serializers.DateTimeField()
@@ -2334,6 +2136,11 @@ class PublishRfcStatusSerializer(serializers.Serializer):
 class PublicQueueItemSerializer(QueueItemSerializer):
     """RfcToBe serializer for the public view of the RFC Editor queue"""
 
+    REFERENCE_RELATIONSHIP_SLUGS = [
+        DocRelationshipName.REFQUEUE_RELATIONSHIP_SLUG,
+        DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG,
+    ]
+
     actionholder_set = ActionHolderSerializer(
         source="all_actionholders", many=True, read_only=True
     )
@@ -2353,12 +2160,12 @@ class PublicQueueItemSerializer(QueueItemSerializer):
 
     @extend_schema_field(RpcRelatedDocumentSerializer(many=True))
     def get_references(self, obj):
-        related = obj.rpcrelateddocument_set.filter(
-            relationship__slug__in=[
-                DocRelationshipName.REFQUEUE_RELATIONSHIP_SLUG,
-                DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG,
-            ]
-        )
+        # Use prefetched value if present (see PublicQueueList.queryset)
+        related = getattr(obj, "queue_references", None)
+        if related is None:
+            related = obj.rpcrelateddocument_set.filter(
+                relationship__slug__in=self.REFERENCE_RELATIONSHIP_SLUGS
+            )
         return RpcRelatedDocumentSerializer(related, many=True).data
 
     def get_group_name(self, obj) -> str | None:
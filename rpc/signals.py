@@ -1,72 +1,296 @@
+from collections.abc import Iterable
 from contextlib import contextmanager
 
 from django.db import transaction
 from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from .lifecycle.blocked_assignments import apply_blocked_assignment_for_rfc
+from .labelstats import sync_label_intervals
+from .lifecycle.blocked_assignments import (
+    apply_blocked_assignment_for_rfc,
+    rfcs_with_stale_blocked_state,
+)
 from .models import (
     ActionHolder,
+    AdditionalEmail,
+    ApprovalLogMessage,
     Assignment,
     ClusterMember,
+    DocRelationshipName,
     FinalApproval,
+    RfcAuthor,
     RfcToBe,
+    RfcToBeBlockingReason,
+    RfcToBeChange,
     RfcToBeLabel,
     RpcRelatedDocument,
+    SubseriesMember,
 )
+from .queuesnapshot import bump_queue_generation
+
+
+class BlockedAssignmentRecompute:
+    """Deferred recomputation of blocked assignments
+
+    Collects the RfcToBes touched during a transaction so that each one is
+    re-evaluated only once when the transaction commits, no matter how many
+    related rows changed. Lookups needed to find the affected RfcToBes are
+    also deferred to commit time so they run once per transaction rather than
+    once per signal.
+    """
+
+    def __init__(self):
+        self.rfc_ids: set[int] = set()
+        # RfcToBes whose refqueue sources need re-evaluation
+        self.refqueue_target_ids: set[int] = set()
+        # Documents whose active RfcToBe needs re-evaluation
+        self.draft_ids: set[int] = set()
+
+    def __call__(self):
+        rfc_ids = set(self.rfc_ids)
+        if self.refqueue_target_ids:
+            rfc_ids.update(
+                RpcRelatedDocument.objects.filter(
+                    target_rfctobe_id__in=self.refqueue_target_ids,
+                    relationship_id=DocRelationshipName.REFQUEUE_RELATIONSHIP_SLUG,
+                ).values_list("source_id", flat=True)
+            )
+        if self.draft_ids:
+            rfc_ids.update(
+                RfcToBe.objects.filter(draft_id__in=self.draft_ids)
+                .exclude(disposition_id="withdrawn")
+                .values_list("pk", flat=True)
+            )
+        if not rfc_ids:
+            return
+        for rfc in RfcToBe.objects.filter(
+            pk__in=rfcs_with_stale_blocked_state(rfc_ids)
+        ):
+            apply_blocked_assignment_for_rfc(rfc)
+
+
+def _pending_callback(callback_class):
+    """Get the callback_class instance that will run when the transaction commits
+
+    Reuses the instance already registered for the current transaction, if any, or
+    registers a new one if there is none (e.g., because a savepoint rollback
+    discarded it). Returns None outside of a transaction.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        return None
+    for _sids, func, _robust in connection.run_on_commit:
+        if isinstance(func, callback_class):
+            return func
+    callback = callback_class()
+    transaction.on_commit(callback)
+    return callback
+
+
+def _defer_recompute(**ids):
+    """Add ids to the current transaction's BlockedAssignmentRecompute
+
+    Keyword arguments name a BlockedAssignmentRecompute set attribute. Outside
+    of a transaction, the recomputation happens immediately, as on_commit would.
+    """
+    recompute = _pending_callback(BlockedAssignmentRecompute)
+    run_now = recompute is None
+    if run_now:
+        recompute = BlockedAssignmentRecompute()
+    for attr, value in ids.items():
+        if value is not None:
+            getattr(recompute, attr).add(value)
+    if run_now:
+        recompute()
+
+
+class QueueGenerationBump:
+    """Deferred invalidation of queue snapshots, once per transaction"""
+
+    def __call__(self):
+        bump_queue_generation()
+
+
+def queue_data_changed(sender, **kwargs):
+    """Invalidate queue snapshots when data that appears in the queue changes"""
+    if kwargs.get("action", "post_").startswith("pre_"):
+        return  # ignore pre_* m2m_changed actions
+    if _pending_callback(QueueGenerationBump) is None:
+        bump_queue_generation()
+
+
+# Models whose changes affect what is shown in the queue
+QUEUE_DATA_SENDERS = [
+    RfcToBe,
+    ActionHolder,
+    AdditionalEmail,
+    ApprovalLogMessage,
+    Assignment,
+    ClusterMember,
+    FinalApproval,
+    RfcAuthor,
+    RfcToBeBlockingReason,
+    RpcRelatedDocument,
+    SubseriesMember,
+]
+
+for _sender in QUEUE_DATA_SENDERS:
+    post_save.connect(queue_data_changed, sender=_sender)
+    post_delete.connect(queue_data_changed, sender=_sender)
+m2m_changed.connect(queue_data_changed, sender=RfcToBe.labels.through)
+
+
+def record_rfctobe_change(sender, instance, **kwargs):
+    """Log a change to an RfcToBe's queue data in the RfcToBeChange table
+
+    Runs in the same transaction as the change, so the log entry is committed
+    (or rolled back) along with it.
+    """
+    if isinstance(instance, RfcToBe):
+        rfc_ids = [instance.pk]
+    elif isinstance(instance, ClusterMember):
+        rfc_ids = RfcToBe.objects.filter(draft_id=instance.doc_id).values_list(
+            "pk", flat=True
+        )
+    elif isinstance(instance, RpcRelatedDocument):
+        rfc_ids = [instance.source_id]
+    else:
+        rfc_ids = [instance.rfc_to_be_id]
+    RfcToBeChange.objects.bulk_create(
+        RfcToBeChange(rfc_to_be_id=rfc_id) for rfc_id in rfc_ids if rfc_id is not None
+    )
+
+
+# Models whose changes are logged in RfcToBeChange
+CHANGE_LOG_SENDERS = [
+    RfcToBe,
+    AdditionalEmail,
+    ApprovalLogMessage,
+    Assignment,
+    ClusterMember,
+    FinalApproval,
+    RfcAuthor,
+    RpcRelatedDocument,
+    SubseriesMember,
+]
+
+for _sender in CHANGE_LOG_SENDERS:
+    post_save.connect(record_rfctobe_change, sender=_sender)
+    post_delete.connect(record_rfctobe_change, sender=_sender)
+
+
+@receiver(m2m_changed, sender=RfcToBe.labels.through)
+def record_rfctobe_labels_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Log a change to the labels of RfcToBes in the RfcToBeChange table"""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        rfc_ids = [instance.pk]
+    elif action == "post_clear":
+        # noted by rfc_labels_m2m_changed at pre_clear
+        rfc_ids = instance.__dict__.get("_cleared_rfc_to_be_ids", [])
+    else:
+        rfc_ids = pk_set or []
+    RfcToBeChange.objects.bulk_create(
+        RfcToBeChange(rfc_to_be_id=rfc_id) for rfc_id in rfc_ids
+    )
 
 
 def defer_apply(rfc: RfcToBe | None):
     if not rfc:
         return
-    transaction.on_commit(lambda: apply_blocked_assignment_for_rfc(rfc))
+    _defer_recompute(rfc_ids=rfc.pk)
 
 
 @receiver([post_save, post_delete], sender=Assignment)
 def assignment_changed(sender, instance: Assignment, **kwargs):
     if instance.role_id == "blocked":
         return
-    rfc = getattr(instance, "rfc_to_be", None)
-    defer_apply(rfc)
-    # Re-evaluate any RFC that has this rfc as a refqueue target
-    if rfc:
-        for related in RpcRelatedDocument.objects.filter(
-            target_rfctobe=rfc, relationship="refqueue"
-        ):
-            defer_apply(related.source)
+    # Re-evaluate this rfc and any RFC that has this rfc as a refqueue target
+    _defer_recompute(
+        rfc_ids=instance.rfc_to_be_id, refqueue_target_ids=instance.rfc_to_be_id
+    )
 
 
 @receiver([post_save, post_delete], sender=ActionHolder)
 def actionholder_changed(sender, instance: ActionHolder, **kwargs):
-    rfc = instance.target_rfctobe
-    if rfc is None and instance.target_document is not None:
-        rfc = RfcToBe.objects.filter(draft=instance.target_document).first()
-    defer_apply(rfc)
+    _defer_recompute(
+        rfc_ids=instance.target_rfctobe_id, draft_ids=instance.target_document_id
+    )
 
 
 @receiver([post_save, post_delete], sender=RpcRelatedDocument)
 def related_doc_changed(sender, instance: RpcRelatedDocument, **kwargs):
-    defer_apply(getattr(instance, "source", None))
+    _defer_recompute(rfc_ids=instance.source_id)
+
+
+def related_docs_bulk_created(source: RfcToBe):
+    """Do what post_save would have for RpcRelatedDocuments from source
+
+    bulk_create() does not send post_save, so call this after bulk creating the
+    relations. The receivers only depend on the source, so once is enough.
+    """
+    instance = RpcRelatedDocument(source=source)
+    queue_data_changed(RpcRelatedDocument, instance=instance)
+    record_rfctobe_change(RpcRelatedDocument, instance=instance)
+    related_doc_changed(RpcRelatedDocument, instance=instance)
 
 
 @receiver([post_save, post_delete], sender=ClusterMember)
 def cluster_member_changed(sender, instance: ClusterMember, **kwargs):
-    rfc_to_be = RfcToBe.objects.filter(draft=instance.doc).first()
-    defer_apply(rfc_to_be)
+    _defer_recompute(draft_ids=instance.doc_id)
+
+
+def cluster_members_bulk_updated(members: Iterable[ClusterMember]):
+    """Do what post_save would have for bulk updated ClusterMembers
+
+    bulk_update() does not send post_save, so call this after bulk updating
+    members. Logs the changes and defers the recomputation for all of them at once.
+    """
+    doc_ids = {member.doc_id for member in members}
+    if not doc_ids:
+        return
+    queue_data_changed(ClusterMember)
+    RfcToBeChange.objects.bulk_create(
+        RfcToBeChange(rfc_to_be_id=rfc_id)
+        for rfc_id in RfcToBe.objects.filter(draft_id__in=doc_ids).values_list(
+            "pk", flat=True
+        )
+    )
+    for doc_id in doc_ids:
+        _defer_recompute(draft_ids=doc_id)
 
 
 @receiver([post_save, post_delete], sender=FinalApproval)
 def final_approval_changed(sender, instance: FinalApproval, **kwargs):
-    defer_apply(getattr(instance, "rfc_to_be", None))
+    _defer_recompute(rfc_ids=instance.rfc_to_be_id)
 
 
 @receiver(m2m_changed, sender=RfcToBe.labels.through)
-def rfc_labels_m2m_changed(sender, instance: RfcToBeLabel, action, **kwargs):
-    # ignore pre_* actions
+def rfc_labels_m2m_changed(
+    sender, instance: RfcToBeLabel, action, reverse, pk_set, **kwargs
+):
+    if reverse and action == "pre_clear":
+        # post_clear gets no pk_set, so note which RfcToBes are being cleared
+        instance._cleared_rfc_to_be_ids = list(
+            instance.rfctobe_set.values_list("pk", flat=True)
+        )
+        return
+    # ignore other pre_* actions
     if action.startswith("pre_"):
         return
 
-    defer_apply(instance)
+    if reverse:
+        # instance is a Label and pk_set holds RfcToBe pks
+        if action == "post_clear":
+            # left in place for record_rfctobe_labels_change, replaced at pre_clear
+            pk_set = instance.__dict__.get("_cleared_rfc_to_be_ids", [])
+        for rfc_to_be_id in pk_set or []:
+            _defer_recompute(rfc_ids=rfc_to_be_id)
+        sync_label_intervals(pk_set or [])
+    else:
+        defer_apply(instance)
+        sync_label_intervals([instance.pk])
 
 
 class SignalsManager:
@@ -82,6 +306,18 @@ class SignalsManager:
         (post_save, final_approval_changed, FinalApproval),
         (post_delete, final_approval_changed, FinalApproval),
         (m2m_changed, rfc_labels_m2m_changed, RfcToBe.labels.through),
+        *(
+            (signal, queue_data_changed, sender)
+            for sender in QUEUE_DATA_SENDERS
+            for signal in (post_save, post_delete)
+        ),
+        (m2m_changed, queue_data_changed, RfcToBe.labels.through),
+        *(
+            (signal, record_rfctobe_change, sender)
+            for sender in CHANGE_LOG_SENDERS
+            for signal in (post_save, post_delete)
+        ),
+        (m2m_changed, record_rfctobe_labels_change, RfcToBe.labels.through),
     ]
 
     @staticmethod
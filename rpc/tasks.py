@@ -1,17 +1,33 @@
 # Copyright The IETF Trust 2025-2026, All Rights Reserved
+from collections.abc import Iterable
+
+import requests
 import rpcapi_client
 from celery import shared_task
 from celery.utils.log import get_task_logger
-from django.db.models import F
+from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
+from simple_history.utils import bulk_create_with_history
 
+from datatracker.loader import prefetch_documents, prefetch_persons
 from datatracker.models import Document
+from datatracker.references import get_draft_references
 from datatracker.rpcapi import DataTrackerUnavailable, datatracker_api, with_rpcapi
 from purple.crossref import CrossrefError
 from purple.crossref import submit as submit_to_crossref
-from rpc.lifecycle.blocked_assignments import apply_blocked_assignment_for_rfc
+from rpc.lifecycle.blocked_assignments import (
+    apply_blocked_assignment_for_rfc,
+    rfcs_with_stale_blocked_state,
+)
 from utils.task_utils import RetryTask
 
+from .dt_v1_api_utils import (
+    DatatrackerFetchFailure,
+    NoSuchSlug,
+    datatracker_name,
+    fetch_group_object,
+)
 from .lifecycle.metadata import Metadata
 from .lifecycle.notifications import (
     notify_datatracker_queue,
@@ -24,17 +40,26 @@ from .lifecycle.publication import (
 )
 from .lifecycle.repo import GithubRepository
 from .models import (
+    ActionHolder,
+    Assignment,
     DocRelationshipName,
+    FinalApproval,
     MailMessage,
     MetadataValidationResults,
+    PendingSubmission,
+    RfcAuthor,
     RfcToBe,
     RpcRelatedDocument,
+    TaskRun,
 )
 from .rfcindex import mark_rfcindex_as_processed, refresh_rfc_index, rfcindex_is_dirty
-from .utils import get_or_create_draft_by_name
+from .signals import related_docs_bulk_created
+from .utils import get_or_create_drafts_by_names
 
 RPC_PERSON_NAME_MAP_CACHE_KEY = "rpc_person_name_map"
 RPC_PERSON_NAME_MAP_CACHE_TTL = 20 * 60  # seconds
+# Refresh cached datatracker data that would go stale within this long
+DATATRACKER_PREFETCH_AHEAD = 6 * 60  # seconds
 
 
 @shared_task
@@ -241,10 +266,182 @@ def refresh_rfc_index_task():
 @shared_task
 def update_blocked_assignments_for_in_progress_rfcs_task():
     """Process all in_progress RfcToBe instances to apply blocked assignments"""
-    for rfc in RfcToBe.objects.filter(disposition_id="in_progress"):
+    stale_ids = rfcs_with_stale_blocked_state(
+        RfcToBe.objects.filter(disposition_id="in_progress").values_list(
+            "pk", flat=True
+        )
+    )
+    for rfc in RfcToBe.objects.filter(pk__in=stale_ids):
         apply_blocked_assignment_for_rfc(rfc)
 
 
+def _queue_datatracker_person_ids(queue) -> set[int]:
+    """Datatracker ids of persons whose data is shown with queue items"""
+    person_ids = set()
+    for ids in queue.values_list(
+        "shepherd__datatracker_id",
+        "iesg_contact__datatracker_id",
+        "stream_manager__datatracker_id",
+    ):
+        person_ids.update(ids)
+    person_ids.update(
+        RfcAuthor.objects.filter(rfc_to_be__in=queue).values_list(
+            "datatracker_person__datatracker_id", flat=True
+        )
+    )
+    person_ids.update(
+        ActionHolder.objects.filter(
+            Q(target_rfctobe__in=queue) | Q(target_document__in=queue.values("draft")),
+            completed__isnull=True,
+        ).values_list("datatracker_person__datatracker_id", flat=True)
+    )
+    for ids in FinalApproval.objects.filter(rfc_to_be__in=queue).values_list(
+        "approver__datatracker_id", "overriding_approver__datatracker_id"
+    ):
+        person_ids.update(ids)
+    person_ids.update(
+        Assignment.objects.filter(rfc_to_be__in=queue).values_list(
+            "person__datatracker_person__datatracker_id", flat=True
+        )
+    )
+    person_ids.discard(None)
+    return person_ids
+
+
+@shared_task
+def prefetch_queue_datatracker_data_task():
+    """Refresh cached datatracker data for in-queue documents before it goes stale
+
+    Covers the persons and drafts related to in-queue RfcToBes as well as their
+    groups and names. Schedule this (in the django_celery_beat periodic tasks) to
+    run more often than DATATRACKER_PREFETCH_AHEAD so that requests for queue data
+    are served from the cache.
+    """
+    queue = RfcToBe.objects.in_queue()
+    try:
+        with datatracker_api():
+            person_count = prefetch_persons(
+                _queue_datatracker_person_ids(queue), DATATRACKER_PREFETCH_AHEAD
+            )
+            document_count = prefetch_documents(
+                dict(
+                    Document.objects.filter(pk__in=queue.values("draft")).values_list(
+                        "datatracker_id", "name"
+                    )
+                ),
+                DATATRACKER_PREFETCH_AHEAD,
+            )
+    except DataTrackerUnavailable:
+        logger.warning("Datatracker unavailable, could not prefetch queue data")
+        return
+    logger.info(
+        "Prefetched datatracker data for %d persons and %d documents",
+        person_count,
+        document_count,
+    )
+
+    for acronym in queue.exclude(group="").values_list("group", flat=True).distinct():
+        try:
+            fetch_group_object(acronym, refresh=True)
+        except (DatatrackerFetchFailure, requests.RequestException):
+            logger.warning("Could not prefetch datatracker group %s", acronym)
+    for namemodel, field in (("stdlevelname", "std_level"), ("streamname", "stream")):
+        for slug in queue.values_list(field, flat=True).distinct():
+            try:
+                datatracker_name(namemodel, slug, refresh=True)
+            except (DatatrackerFetchFailure, NoSuchSlug, requests.RequestException):
+                logger.warning("Could not prefetch datatracker %s %s", namemodel, slug)
+
+
+@shared_task
+@with_rpcapi
+def refresh_pending_submissions_task(*, rpcapi: rpcapi_client.PurpleApi):
+    """Refresh PendingSubmissions from the datatracker's submitted_to_rpc() list
+
+    The datatracker offers no way to ask only for changes, so the whole list is
+    fetched and diffed against the PendingSubmissions, writing only what changed.
+    Submissions that already have an active RfcToBe are left out. Schedule this
+    to run every minute or so. If the datatracker is unavailable, the existing
+    PendingSubmissions are kept and continue to be served. Overlapping runs wait
+    for each other on the task's TaskRun row before diffing, so they do not both
+    insert the same new submissions.
+    """
+    try:
+        with datatracker_api():
+            submitted = rpcapi.submitted_to_rpc()
+    except DataTrackerUnavailable:
+        logger.warning("Datatracker unavailable, could not refresh submissions")
+        return
+    already_in_queue = set(
+        RfcToBe.objects.filter(draft__datatracker_id__in=[s.id for s in submitted])
+        .exclude(disposition__slug="withdrawn")
+        .values_list("draft__datatracker_id", flat=True)
+    )
+    pending = {s.id: s for s in submitted if s.id not in already_in_queue}
+    with transaction.atomic():
+        task_run, _ = TaskRun.objects.select_for_update().get_or_create(
+            task_name="refresh_pending_submissions_task",
+            defaults={"last_run_at": timezone.now()},
+        )
+        existing = {
+            ps.datatracker_id: ps
+            for ps in PendingSubmission.objects.select_for_update()
+        }
+        created = [
+            PendingSubmission(
+                datatracker_id=s.id, name=s.name, stream=s.stream, submitted=s.submitted
+            )
+            for s in pending.values()
+            if s.id not in existing
+        ]
+        updated = []
+        for ps in existing.values():
+            s = pending.get(ps.datatracker_id)
+            if s is not None and (ps.name, ps.stream, ps.submitted) != (
+                s.name,
+                s.stream,
+                s.submitted,
+            ):
+                ps.name, ps.stream, ps.submitted = s.name, s.stream, s.submitted
+                updated.append(ps)
+        removed = [
+            ps.pk for ps in existing.values() if ps.datatracker_id not in pending
+        ]
+        PendingSubmission.objects.bulk_create(created)
+        PendingSubmission.objects.bulk_update(updated, ["name", "stream", "submitted"])
+        PendingSubmission.objects.filter(pk__in=removed).delete()
+        task_run.last_run_at = timezone.now()
+        task_run.save(update_fields=["last_run_at"])
+    logger.info(
+        "Refreshed pending submissions: %d added, %d updated, %d removed",
+        len(created),
+        len(updated),
+        len(removed),
+    )
+
+
+def _documents_for_references(
+    references: Iterable, *, rpcapi: rpcapi_client.PurpleApi
+) -> dict[int, Document]:
+    """Documents for references, keyed by the references' datatracker ids
+
+    Documents are created for references that do not have one yet, if the
+    datatracker knows their names. References it does not know are left out.
+    """
+    names = {ref.id: ref.name for ref in references}
+    documents = Document.objects.in_bulk(names, field_name="datatracker_id")
+    missing = {
+        datatracker_id: name
+        for datatracker_id, name in names.items()
+        if datatracker_id not in documents
+    }
+    by_name = get_or_create_drafts_by_names(missing.values(), rpcapi=rpcapi)
+    for datatracker_id, name in missing.items():
+        if name in by_name:
+            documents[datatracker_id] = by_name[name]
+    return documents
+
+
 @with_rpcapi
 def _compute_deep_references(
     related_doc_id: int,
@@ -254,23 +451,21 @@ def _compute_deep_references(
     """Recompute all 2G and 3G not-received references for an RfcToBe source.
 
     Called when a 1G (not-received or refqueue) relationship is created or
-    updated.  Deletes all existing auto-computed 2G/3G relationships for the
-    source and rebuilds them from scratch.
+    updated.  Computes the 2G/3G relationships for the source from scratch, then
+    adds and removes only those that differ from the existing ones.
+
+    The 2G references of each 1G target are assigned first, then the 3G references
+    of the 2G references just added, one 1G target at a time. Whichever generation a
+    draft is reached in first is the one it is assigned to. Each level of the
+    reference graph is loaded up front, from the shared references cache or with
+    concurrent requests, with one Document lookup, and the assignment then walks
+    the loaded graph in memory.
     """
     related_doc = RpcRelatedDocument.objects.select_related("source").get(
         pk=related_doc_id
     )
     source = related_doc.source
 
-    # Delete all previously auto-computed 2G/3G relations — rebuild from scratch.
-    RpcRelatedDocument.objects.filter(
-        source=source,
-        relationship__slug__in=[
-            DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG,
-            DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG,
-        ],
-    ).delete()
-
     # Fetch all current 1G relations for this source.
     refs_1g = list(
         RpcRelatedDocument.objects.filter(
@@ -304,6 +499,7 @@ def _compute_deep_references(
         ):
             received_dt_ids.add(ref.target_rfctobe.draft.datatracker_id)
 
+    target_dt_ids: list[int] = []
     for ref in refs_1g:
         if ref.target_document is not None:
             target_dt_id = ref.target_document.datatracker_id
@@ -318,59 +514,107 @@ def _compute_deep_references(
                 "1G RpcRelatedDocument %d target has no datatracker_id", ref.pk
             )
             continue
+        target_dt_ids.append(target_dt_id)
+
+    # Every reference of a 1G target that is not yet received may become a 2G
+    # reference, so fetch the references of all of them. Some will turn out to be
+    # 3G references of an earlier 1G target, whose references are then unused.
+    refs_by_dt_id = get_draft_references(target_dt_ids, rpcapi=rpcapi)
+    candidates_2g = [
+        ref
+        for target_dt_id in target_dt_ids
+        for ref in refs_by_dt_id[target_dt_id]
+        if ref.id not in received_dt_ids
+    ]
+    documents = _documents_for_references(candidates_2g, rpcapi=rpcapi)
+    refs_by_dt_id |= get_draft_references(
+        (ref.id for ref in candidates_2g if ref.id in documents), rpcapi=rpcapi
+    )
+    documents |= _documents_for_references(
+        (
+            ref_3g
+            for ref_2g in candidates_2g
+            if ref_2g.id in documents
+            for ref_3g in refs_by_dt_id[ref_2g.id]
+            if ref_3g.id not in received_dt_ids and ref_3g.id not in documents
+        ),
+        rpcapi=rpcapi,
+    )
 
-        with datatracker_api():
-            refs_2g = rpcapi.get_draft_references(target_dt_id) or []
-        created_2g_ids: list[int] = []
-
-        for ref_2g in refs_2g:
-            # prevent duplicate processing of same 2G
-            if ref_2g.id in received_dt_ids:
-                continue
-
-            draft_2g = Document.objects.filter(
-                datatracker_id=ref_2g.id
-            ).first() or get_or_create_draft_by_name(ref_2g.name, rpcapi=rpcapi)
-            if draft_2g is None:
-                logger.warning(
-                    "Could not get or create document for 2G reference %s (id=%d)",
-                    ref_2g.name,
-                    ref_2g.id,
-                )
-                continue
+    relations: list[RpcRelatedDocument] = []
 
-            RpcRelatedDocument.objects.get_or_create(
+    def _add_relation(ref, relationship_slug, generation) -> bool:
+        if ref.id in received_dt_ids:
+            return False  # prevent duplicate processing of the same draft
+        draft = documents.get(ref.id)
+        if draft is None:
+            logger.warning(
+                "Could not get or create document for %s reference %s (id=%d)",
+                generation,
+                ref.name,
+                ref.id,
+            )
+            return False
+        relations.append(
+            RpcRelatedDocument(
                 source=source,
-                relationship=DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG,
-                target_document=draft_2g,
+                relationship_id=relationship_slug,
+                target_document=draft,
             )
-            received_dt_ids.add(ref_2g.id)
-            created_2g_ids.append(ref_2g.id)
-
+        )
+        received_dt_ids.add(ref.id)
+        return True
+
+    for target_dt_id in target_dt_ids:
+        created_2g_ids = [
+            ref_2g.id
+            for ref_2g in refs_by_dt_id[target_dt_id]
+            if _add_relation(
+                ref_2g, DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG, "2G"
+            )
+        ]
         for ref_2g_id in created_2g_ids:
-            with datatracker_api():
-                refs_3g = rpcapi.get_draft_references(ref_2g_id) or []
-            for ref_3g in refs_3g:
-                if ref_3g.id in received_dt_ids:
-                    continue
-
-                draft_3g = Document.objects.filter(
-                    datatracker_id=ref_3g.id
-                ).first() or get_or_create_draft_by_name(ref_3g.name, rpcapi=rpcapi)
-                if draft_3g is None:
-                    logger.warning(
-                        "Could not get or create document for 3G reference %s (id=%d)",
-                        ref_3g.name,
-                        ref_3g.id,
-                    )
-                    continue
+            for ref_3g in refs_by_dt_id[ref_2g_id]:
+                _add_relation(
+                    ref_3g, DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG, "3G"
+                )
 
-                RpcRelatedDocument.objects.get_or_create(
+    with transaction.atomic():
+        # Runs for the same source are serialized on the source row, so that a
+        # run waiting here sees the relations another run has just added.
+        RfcToBe.objects.select_for_update().get(pk=source.pk)
+        # Only insert and delete the relations that changed. Deleting sends
+        # signals per row, but their blocked assignment recomputes are deferred
+        # to a single one when the transaction commits.
+        existing = {
+            (relationship_id, target_document_id): pk
+            for pk, relationship_id, target_document_id in (
+                RpcRelatedDocument.objects.select_for_update()
+                .filter(
                     source=source,
-                    relationship=DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG,
-                    target_document=draft_3g,
+                    relationship__slug__in=[
+                        DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG,
+                        DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG,
+                    ],
                 )
-                received_dt_ids.add(ref_3g.id)
+                .values_list("pk", "relationship_id", "target_document_id")
+            )
+        }
+        wanted = {
+            (relation.relationship_id, relation.target_document_id)
+            for relation in relations
+        }
+        RpcRelatedDocument.objects.filter(
+            pk__in=[pk for key, pk in existing.items() if key not in wanted]
+        ).delete()
+        added = [
+            relation
+            for relation in relations
+            if (relation.relationship_id, relation.target_document_id) not in existing
+        ]
+        if added:
+            bulk_create_with_history(added, RpcRelatedDocument)
+            related_docs_bulk_created(source)
 
 
 @shared_task(base=RetryTask, autoretry_for=(DataTrackerUnavailable,))
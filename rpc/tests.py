@@ -2,23 +2,46 @@
 
 import json
 from datetime import date, timedelta
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+import requests
 import rpcapi_client
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.exceptions import NotFound
+from rest_framework.test import APIRequestFactory, force_authenticate
 
-from datatracker.factories import DocumentFactory
+from datatracker.factories import DatatrackerPersonFactory, DocumentFactory
 from datatracker.models import Document
-from rpc.models import DocRelationshipName, RpcRelatedDocument
+from rpc.models import (
+    Assignment,
+    ClusterMember,
+    DocRelationshipName,
+    LabelInterval,
+    PendingSubmission,
+    RfcAuthor,
+    RfcToBe,
+    RpcRelatedDocument,
+    TaskRun,
+)
 
-from .api import apply_submission_cluster_membership, resolve_rfctobe
+from . import history, typeahead
+from .api import QueueCounts, apply_submission_cluster_membership, resolve_rfctobe
 from .factories import (
+    AssignmentFactory,
     ClusterFactory,
     DispositionNameFactory,
+    FinalApprovalFactory,
+    LabelFactory,
+    PendingSubmissionFactory,
+    RfcAuthorFactory,
+    RfcToBeActionHolderFactory,
     RfcToBeFactory,
     SourceFormatNameFactory,
     StdLevelNameFactory,
@@ -26,6 +49,17 @@ from .factories import (
     TlpBoilerplateChoiceNameFactory,
     UnusableRfcNumberFactory,
 )
+from .history import collect_rfctobe_history, rfctobe_history_page
+from .labelstats import label_stats
+from .queuesnapshot import QUEUE_SNAPSHOT_CACHE_KEY, current_queue_generation
+from .signals import BlockedAssignmentRecompute
+from .tasks import (
+    DATATRACKER_PREFETCH_AHEAD,
+    _compute_deep_references,
+    prefetch_queue_datatracker_data_task,
+    refresh_pending_submissions_task,
+)
+from .typeahead import _TypeaheadIndex
 from .utils import next_rfc_number
 
 # Minimal data that rpcapi_client.FullDraft.from_json() accepts
@@ -85,6 +119,25 @@ class UtilsTests(TestCase):
         # self.assertEqual(next_rfc_number(5), [7, 8, 9, 10, 11])
 
 
+class BlockedAssignmentSignalTests(TestCase):
+    def test_changes_in_transaction_coalesce_into_one_recompute(self):
+        rfctobe = RfcToBeFactory()
+        stream_hold = LabelFactory(slug="Stream Hold")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            RfcToBeActionHolderFactory.create_batch(3, target_rfctobe=rfctobe)
+            rfctobe.labels.add(stream_hold)
+        self.assertEqual(
+            len([cb for cb in callbacks if isinstance(cb, BlockedAssignmentRecompute)]),
+            1,
+        )
+        self.assertEqual(
+            Assignment.objects.filter(rfc_to_be=rfctobe, role__slug="blocked")
+            .active()
+            .count(),
+            1,
+        )
+
+
 @patch("rpc.serializers.compute_deep_references_task")
 class RelatedDocumentClusterSyncTests(TestCase):
     def setUp(self):
@@ -440,3 +493,983 @@ class DocumentSearchTests(TestCase):
         self.assertEqual(len(payload["results"]), 1)
         self.assertEqual(payload["results"][0]["id"], in_progress.id)
         self.assertEqual(payload["results"][0]["disposition"], "in_progress")
+
+    def test_search_ranks_matches(self):
+        by_number = RfcToBeFactory(rfc_number=9876, title="Unrelated document")
+        by_name = RfcToBeFactory(draft__name="draft-ietf-widget-transport")
+        by_title = RfcToBeFactory(title="Transport of widgets over carrier pigeons")
+        by_author = RfcToBeFactory(title="Something else entirely")
+        RfcAuthorFactory(rfc_to_be=by_author, titlepage_name="Wanda Widget")
+        RfcToBeFactory(title="No match here")
+
+        response = self.client.get(reverse("rfctobe-search"), {"q": "widget"})
+        self.assertEqual(response.status_code, 200, response.content)
+        ids = [item["id"] for item in response.json()["results"]]
+        # name and title matches rank above a match on the author name only
+        self.assertCountEqual(ids[:2], [by_name.id, by_title.id])
+        self.assertEqual(ids[2:], [by_author.id])
+
+        # a number match ranks above a better text match
+        by_name_with_number = RfcToBeFactory(draft__name="draft-ietf-9876-update")
+        response = self.client.get(reverse("rfctobe-search"), {"q": "9876"})
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]],
+            [by_number.id, by_name_with_number.id],
+        )
+
+
+class QueueListQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="queue-user",
+            password="test-password",
+            name="Queue User",
+        )
+        self.client.force_login(self.user)
+        self.label = LabelFactory(slug="bis")
+        self.cluster = ClusterFactory()
+        self.items = []
+
+    def _add_queue_items(self, count):
+        for _ in range(count):
+            rfctobe = RfcToBeFactory()
+            rfctobe.labels.add(self.label)
+            AssignmentFactory(
+                rfc_to_be=rfctobe,
+                role__slug="enqueuer",
+                state=Assignment.State.DONE,
+            )
+            RfcAuthorFactory(rfc_to_be=rfctobe)
+            self.cluster.docs.add(
+                rfctobe.draft, through_defaults={"order": len(self.items) + 1}
+            )
+            if self.items:
+                RpcRelatedDocument.objects.create(
+                    source=rfctobe,
+                    relationship_id=DocRelationshipName.REFQUEUE_RELATIONSHIP_SLUG,
+                    target_rfctobe=self.items[-1],
+                )
+            self.items.append(rfctobe)
+
+    def _assert_constant_queries(self, url, **kwargs):
+        self._add_queue_items(1)
+        self.client.get(url, **kwargs)  # warm up anything cached per process
+        with CaptureQueriesContext(connection) as baseline:
+            response = self.client.get(url, **kwargs)
+        self.assertEqual(response.status_code, 200, response.content)
+        for count in (3, 10):
+            self._add_queue_items(count)
+            with self.assertNumQueries(len(baseline.captured_queries)):
+                response = self.client.get(url, **kwargs)
+            self.assertEqual(len(response.json()), len(self.items))
+        # spot check the prefetched values
+        item = response.json()[0]
+        self.assertEqual(item["cluster"], {"number": self.cluster.number})
+        self.assertEqual(
+            [role["slug"] for role in item["pending_activities"]], ["formatting"]
+        )
+
+    def test_queue_list(self):
+        self._assert_constant_queries("/api/rpc/queue/")
+
+    def test_public_queue_list(self):
+        self._assert_constant_queries(
+            "/api/pubq/queue/", headers={"X-Api-Key": "pubq-token"}
+        )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class QueueSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.headers = {"X-Api-Key": "pubq-token"}
+
+    def test_public_queue_served_from_snapshot(self):
+        rfctobe = RfcToBeFactory()
+        response = self.client.get("/api/pubq/queue/", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["id"] for item in response.json()], [rfctobe.pk])
+        etag = response["ETag"]
+        self.assertIsNotNone(
+            cache.get(
+                QUEUE_SNAPSHOT_CACHE_KEY.format(
+                    name="public", generation=current_queue_generation()
+                )
+            )
+        )
+
+        # unchanged queue is served without touching the database
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/pubq/queue/", headers=self.headers)
+        self.assertEqual(response["ETag"], etag)
+        response = self.client.get(
+            "/api/pubq/queue/", headers=self.headers | {"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        # a change to queue data invalidates the snapshot
+        with self.captureOnCommitCallbacks(execute=True):
+            rfctobe.labels.add(LabelFactory(slug="bis"))
+        response = self.client.get("/api/pubq/queue/", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(
+            [label["slug"] for label in response.json()[0]["labels"]], ["bis"]
+        )
+
+
+class RfcToBeHistoryTests(TestCase):
+    def _add_history(self, rfctobe, count):
+        for _ in range(count):
+            label = LabelFactory()
+            rfctobe.labels.add(label)
+            rfctobe.external_deadline = timezone.now() + timedelta(days=7)
+            rfctobe.save()
+            AssignmentFactory(rfc_to_be=rfctobe, role__slug=f"role-{label.pk}")
+            RfcAuthorFactory(rfc_to_be=rfctobe)
+
+    def test_history_query_count_is_constant(self):
+        rfctobe = RfcToBeFactory()
+        self._add_history(rfctobe, 1)
+        with CaptureQueriesContext(connection) as baseline:
+            collect_rfctobe_history(rfctobe)
+        self._add_history(rfctobe, 5)
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            records = collect_rfctobe_history(rfctobe)
+        descriptions = [record.desc for record in records]
+        for label in rfctobe.labels.all():
+            self.assertIn(f"Label ({label.slug}): Added", descriptions)
+        for assignment in rfctobe.assignment_set.all():
+            self.assertTrue(
+                any(
+                    desc.startswith(f"Assignment ({assignment.role.slug}")
+                    for desc in descriptions
+                )
+            )
+
+    def test_history_page_query_count_is_constant(self):
+        short = RfcToBeFactory()
+        self._add_history(short, 2)
+        long = RfcToBeFactory()
+        self._add_history(long, 10)
+        # a second apart, so that each record is on a millisecond of its own
+        rows = sorted(
+            (
+                h
+                for model in (RfcToBe, Assignment, RfcAuthor)
+                for h in model.history.all()
+            ),
+            key=lambda h: (h.history_date, h.history_id),
+        )
+        for offset, h in enumerate(rows):
+            type(h).objects.filter(history_id=h.history_id).update(
+                history_date=rows[0].history_date + timedelta(seconds=offset)
+            )
+
+        with CaptureQueriesContext(connection) as baseline:
+            page = rfctobe_history_page(short, limit=2)
+        self.assertEqual(len(page.records), 2)
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            page = rfctobe_history_page(long, limit=2)
+        self.assertEqual(
+            [record.desc for record in page.records],
+            [record.desc for record in collect_rfctobe_history(long)[:2]],
+        )
+
+    def test_history_pages(self):
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                username="history-user", password="test-password", name="History"
+            )
+        )
+        rfctobe = RfcToBeFactory()
+        self._add_history(rfctobe, 4)
+        expected = [record.desc for record in collect_rfctobe_history(rfctobe)]
+
+        url = f"/api/rpc/documents/{rfctobe.draft.name}/history/?limit=3"
+        descriptions = []
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            page = response.json()
+            descriptions.extend(record["desc"] for record in page["results"])
+            url = page["next"]
+        self.assertEqual(descriptions, expected)
+
+        response = self.client.get(
+            f"/api/rpc/documents/{rfctobe.draft.name}/history/",
+            {"model": ["rfc_author", "assignment"]},
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        page = response.json()
+        self.assertIsNone(page["next"])
+        self.assertEqual(
+            {record["model"] for record in page["results"]},
+            {"rfc_author", "assignment"},
+        )
+
+
+class TypeaheadTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                username="typeahead-user", password="test-password", name="Typeahead"
+            )
+        )
+        patcher = patch.object(typeahead, "_typeahead_index", _TypeaheadIndex())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _suggest(self, q, **params):
+        response = self.client.get("/api/rpc/documents/typeahead/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [suggestion["id"] for suggestion in response.json()]
+
+    def test_typeahead(self):
+        quic = RfcToBeFactory(draft__name="draft-ietf-quic-transport", rfc_number=9000)
+        quic_bis = RfcToBeFactory(draft__name="draft-ietf-quic-bis")
+        cluster = ClusterFactory()
+        cluster.docs.add(quic_bis.draft, through_defaults={"order": 1})
+
+        self.assertEqual(self._suggest("RFC 9000"), [quic.pk])
+        self.assertEqual(self._suggest("9000"), [quic.pk])
+        self.assertEqual(self._suggest(f"c{cluster.number}"), [quic_bis.pk])
+        self.assertCountEqual(self._suggest("ietf-quic"), [quic.pk, quic_bis.pk])
+        self.assertEqual(len(self._suggest("draft-ietf-quic", limit=1)), 1)
+
+        # changes are picked up from the RfcToBeChange log
+        quic_bis.rfc_number = 9999
+        quic_bis.save()
+        with patch.object(typeahead, "TYPEAHEAD_SYNC_INTERVAL", 0):
+            self.assertEqual(self._suggest("rfc9999"), [quic_bis.pk])
+
+    def test_typeahead_update_does_not_change_entries_in_use(self):
+        quic = RfcToBeFactory(draft__name="draft-ietf-quic-transport")
+        index = typeahead.PrefixIndex()
+        index.update()
+        keys, suggestions = index._entries
+        in_use = (list(keys), dict(suggestions))
+
+        quic.rfc_number = 9000
+        quic.save()
+        index.update([quic.pk])
+        # a lookup running in another thread keeps a consistent view
+        self.assertEqual((keys, suggestions), in_use)
+        self.assertEqual(
+            [suggestion["id"] for suggestion in index.lookup("rfc9000", 10)],
+            [quic.pk],
+        )
+        self.assertEqual(index.lookup("ietf-quic", 10)[0]["rfc_number"], 9000)
+
+    def test_typeahead_rebuild_outside_lock(self):
+        RfcToBeFactory(draft__name="draft-ietf-quic-transport")
+        self.assertEqual(self._suggest("rfc8888"), [])
+        added = RfcToBeFactory(rfc_number=8888)
+
+        index = typeahead._typeahead_index
+        update = typeahead.PrefixIndex.update
+        lock_held = []
+
+        def update_and_check_lock(prefix_index, *args, **kwargs):
+            lock_held.append(index._lock.locked())
+            return update(prefix_index, *args, **kwargs)
+
+        with (
+            patch.object(typeahead, "TYPEAHEAD_REBUILD_INTERVAL", -1),
+            patch.object(typeahead, "TYPEAHEAD_SYNC_INTERVAL", 3600),
+            patch.object(typeahead.PrefixIndex, "update", update_and_check_lock),
+        ):
+            self.assertEqual(self._suggest("rfc888"), [added.pk])
+        self.assertEqual(lock_held, [False])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                username="keyset-user", password="test-password", name="Keyset"
+            )
+        )
+        published_at = timezone.now()
+        for index in range(7):
+            # ties and NULLs in the ordering field
+            RfcToBeFactory(
+                published_at=(
+                    published_at + timedelta(days=index % 2) if index % 3 else None
+                )
+            )
+
+    def _walk_pages(self, url):
+        ids = []
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            page = response.json()
+            ids.extend(item["id"] for item in page["results"])
+            url = page["next"]
+        return ids
+
+    def test_keyset_pages_match_limit_offset(self):
+        for ordering in ("-id", "published_at", "-published_at", "draft__name"):
+            # keyset pagination breaks ties by id
+            tie_broken_ordering = (
+                ordering if ordering.lstrip("-") == "id" else f"{ordering},id"
+            )
+            expected = [
+                item["id"]
+                for item in self.client.get(
+                    "/api/rpc/documents/",
+                    {"ordering": tie_broken_ordering, "limit": 100},
+                ).json()["results"]
+            ]
+            self.assertEqual(len(expected), 7)
+            keyset_ids = self._walk_pages(
+                f"/api/rpc/documents/?ordering={ordering}&limit=2&cursor="
+            )
+            self.assertEqual(keyset_ids, expected, ordering)
+
+    def test_approximate_count(self):
+        response = self.client.get("/api/rpc/documents/", {"cursor": ""})
+        self.assertIsNone(response.json()["count"])
+        response = self.client.get("/api/rpc/documents/", {"cursor": "", "count": 1})
+        self.assertIsInstance(response.json()["count"], int)
+        response = self.client.get("/api/rpc/documents/", {"cursor": "bogus"})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class RfcToBeHistoryFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_history_is_extended(self):
+        rfctobe = RfcToBeFactory()
+        RfcAuthorFactory(rfc_to_be=rfctobe)
+        records = collect_rfctobe_history(rfctobe)
+        # only the high-water marks are checked when nothing has changed
+        with self.assertNumQueries(1):
+            self.assertEqual(collect_rfctobe_history(rfctobe), records)
+
+        rfctobe.labels.add(LabelFactory())
+        AssignmentFactory(rfc_to_be=rfctobe)
+        updated = collect_rfctobe_history(rfctobe)
+        self.assertEqual(updated[len(updated) - len(records) :], records)
+        cache.clear()
+        self.assertEqual(
+            [record.desc for record in collect_rfctobe_history(rfctobe)],
+            [record.desc for record in updated],
+        )
+
+    def test_history_committed_out_of_order(self):
+        rfctobe = RfcToBeFactory()
+        first_author = RfcAuthorFactory(rfc_to_be=rfctobe)
+        RfcAuthorFactory(rfc_to_be=rfctobe)
+        # the transaction that wrote the first author's history is still open
+        late = RfcAuthor.history.get(id=first_author.pk)
+        late_history_id = late.history_id
+        late.delete()
+        records = collect_rfctobe_history(rfctobe)
+        self.assertNotIn(
+            ("rfc_author", late_history_id), {(r.model, r.id) for r in records}
+        )
+
+        # it commits after the history with a higher history_id was cached
+        late.history_id = late_history_id
+        late.save()
+        updated = collect_rfctobe_history(rfctobe)
+        self.assertEqual(len(updated), len(records) + 1)
+        self.assertIn(
+            ("rfc_author", late_history_id), {(r.model, r.id) for r in updated}
+        )
+
+    def test_only_newest_history_is_cached(self):
+        rfctobe = RfcToBeFactory()
+        for _ in range(4):
+            RfcAuthorFactory(rfc_to_be=rfctobe)
+            AssignmentFactory(rfc_to_be=rfctobe)
+        expected = [(r.model, r.id) for r in collect_rfctobe_history(rfctobe)]
+        cache.clear()
+
+        with patch.object(history, "HISTORY_FEED_CACHE_RECORDS", 3):
+            records = collect_rfctobe_history(rfctobe)
+            feed = cache.get(history._history_feed_cache_key(rfctobe))
+            self.assertLessEqual(len(feed.records), 3)
+            self.assertIsNotNone(feed.covers_since)
+            # older history is read from the history tables
+            self.assertEqual([(r.model, r.id) for r in records], expected)
+            self.assertEqual(
+                [(r.model, r.id) for r in collect_rfctobe_history(rfctobe)], expected
+            )
+            paged = []
+            before = None
+            while True:
+                page = rfctobe_history_page(rfctobe, limit=2, before=before)
+                paged.extend((r.model, r.id) for r in page.records)
+                if page.next_before is None:
+                    break
+                before = page.next_before
+            self.assertEqual(paged, expected)
+
+    def test_history_too_large_to_cache(self):
+        rfctobe = RfcToBeFactory()
+        with (
+            patch.object(history, "HISTORY_FEED_CACHE_MAX_SIZE", 1),
+            self.assertLogs("rpc.history", level="WARNING"),
+        ):
+            records = collect_rfctobe_history(rfctobe)
+        self.assertIsNone(cache.get(history._history_feed_cache_key(rfctobe)))
+        self.assertEqual(collect_rfctobe_history(rfctobe), records)
+
+    def test_first_history_page_is_cached(self):
+        rfctobe = RfcToBeFactory()
+        for _ in range(3):
+            RfcAuthorFactory(rfc_to_be=rfctobe)
+        expected = collect_rfctobe_history(rfctobe)
+        cache.clear()
+        page = rfctobe_history_page(rfctobe, limit=2)
+        feed = cache.get(history._history_feed_cache_key(rfctobe))
+        self.assertEqual(feed.records, page.records)
+        self.assertEqual(
+            rfctobe_history_page(rfctobe, limit=len(expected)).records, expected
+        )
+
+
+class LabelStatsTests(TestCase):
+    def test_label_intervals_follow_label_changes(self):
+        labels = [LabelFactory(), LabelFactory(), LabelFactory()]
+        rfcs = [RfcToBeFactory(), RfcToBeFactory()]
+        rfcs[0].labels.add(labels[0])
+        rfcs[0].labels.add(labels[1])
+        rfcs[0].labels.remove(labels[0])
+        rfcs[1].labels.add(labels[2])
+        rfcs[1].labels.remove(labels[2])
+        rfcs[1].labels.set([labels[2], labels[0]])
+        labels[1].rfctobe_set.remove(rfcs[0])
+
+        def _intervals(rfc, label):
+            return [
+                interval.end is not None
+                for interval in LabelInterval.objects.filter(
+                    rfc_to_be=rfc, label=label
+                ).order_by("start")
+            ]
+
+        self.assertEqual(_intervals(rfcs[0], labels[0]), [True])
+        self.assertEqual(_intervals(rfcs[0], labels[1]), [True])
+        self.assertEqual(_intervals(rfcs[0], labels[2]), [])
+        self.assertEqual(_intervals(rfcs[1], labels[0]), [False])
+        self.assertEqual(_intervals(rfcs[1], labels[2]), [True, False])
+        self.assertEqual(len(rfcs[1].time_intervals_with_label(labels[2])), 2)
+
+        stats = label_stats()
+        self.assertEqual(
+            [(s["document_id"], s["label_id"]) for s in stats],
+            sorted(
+                [
+                    (rfcs[0].pk, labels[0].pk),
+                    (rfcs[0].pk, labels[1].pk),
+                    (rfcs[1].pk, labels[0].pk),
+                    (rfcs[1].pk, labels[2].pk),
+                ]
+            ),
+        )
+        self.assertEqual(
+            [s["label_id"] for s in label_stats(document_ids=[rfcs[1].pk])],
+            sorted([labels[0].pk, labels[2].pk]),
+        )
+        self.assertEqual(label_stats(until=timezone.now() - timedelta(days=1)), [])
+
+    def test_clearing_label_closes_intervals(self):
+        label = LabelFactory()
+        rfcs = [RfcToBeFactory(), RfcToBeFactory()]
+        for rfc in rfcs:
+            rfc.labels.add(label)
+        with patch("rpc.signals._defer_recompute") as mock_defer_recompute:
+            label.rfctobe_set.clear()
+        self.assertFalse(
+            LabelInterval.objects.filter(label=label, end__isnull=True).exists()
+        )
+        self.assertCountEqual(
+            [c.kwargs["rfc_ids"] for c in mock_defer_recompute.call_args_list],
+            [rfc.pk for rfc in rfcs],
+        )
+
+    def test_delete_label_no_longer_in_use(self):
+        user = get_user_model().objects.create_user(
+            username="label-user", password="test-password", name="Label User"
+        )
+        self.client.force_login(user)
+        label = LabelFactory()
+        rfc = RfcToBeFactory()
+        rfc.labels.add(label)
+        rfc.labels.remove(label)
+        response = self.client.delete(f"/api/rpc/labels/{label.pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(LabelInterval.objects.filter(rfc_to_be=rfc).exists())
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class QueueCountsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="counts-user", password="test-password", name="Counts User"
+        )
+
+    def _get_counts(self):
+        request = APIRequestFactory().get("/api/rpc/queue/counts/")
+        force_authenticate(request, user=self.user)
+        response = QueueCounts.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def _pending_announcement(self, **assignment_kwargs):
+        rfctobe = RfcToBeFactory()
+        FinalApprovalFactory(rfc_to_be=rfctobe, approved=timezone.now())
+        AssignmentFactory(
+            rfc_to_be=rfctobe, role__slug="publisher", **assignment_kwargs
+        )
+        return rfctobe
+
+    def test_counts(self):
+        RfcToBeFactory(disposition__slug="created")
+        RfcToBeFactory(disposition__slug="published", published_at=timezone.now())
+        self._pending_announcement()
+        self._pending_announcement()
+        # not pending: approval outstanding, publisher done, no publisher
+        FinalApprovalFactory(rfc_to_be=self._pending_announcement())
+        self._pending_announcement(state=Assignment.State.DONE)
+        FinalApprovalFactory(approved=timezone.now())
+        PendingSubmissionFactory()
+        # one query for the RfcToBe counts, one for submissions
+        with self.assertNumQueries(2):
+            counts = self._get_counts()
+        self.assertEqual(
+            counts,
+            {
+                "submissions": 1,
+                "enqueuing": 1,
+                "queue": 5,
+                "pending_announcement": 2,
+                "published": 1,
+            },
+        )
+
+
+class PendingSubmissionTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                username="submissions-user",
+                password="test-password",
+                name="Submissions User",
+            )
+        )
+
+    def _submitted(self, datatracker_id, name, submitted):
+        return SimpleNamespace(
+            id=datatracker_id, name=name, stream="ietf", submitted=submitted
+        )
+
+    def test_refresh_diffs_submissions(self):
+        withdrawn = RfcToBeFactory(disposition__slug="withdrawn")
+        in_queue = RfcToBeFactory()
+        changed = PendingSubmissionFactory(name="draft-old-name")
+        gone = PendingSubmissionFactory()
+        submitted = timezone.now() - timedelta(days=1)
+        rpcapi = MagicMock()
+        rpcapi.submitted_to_rpc.return_value = [
+            self._submitted(withdrawn.draft.datatracker_id, "draft-a", submitted),
+            self._submitted(in_queue.draft.datatracker_id, "draft-b", submitted),
+            self._submitted(changed.datatracker_id, "draft-new-name", submitted),
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            refresh_pending_submissions_task(rpcapi=rpcapi)
+        # overlapping runs are serialized on the TaskRun row
+        self.assertTrue(
+            any(
+                "rpc_taskrun" in query["sql"] and "FOR UPDATE" in query["sql"]
+                for query in queries
+            )
+        )
+        self.assertTrue(
+            TaskRun.objects.filter(
+                task_name="refresh_pending_submissions_task"
+            ).exists()
+        )
+        self.assertCountEqual(
+            PendingSubmission.objects.values_list("datatracker_id", "name"),
+            [
+                (withdrawn.draft.datatracker_id, "draft-a"),
+                (changed.datatracker_id, "draft-new-name"),
+            ],
+        )
+        self.assertFalse(PendingSubmission.objects.filter(pk=gone.pk).exists())
+
+        # the inbox is served from the mirror, without asking the datatracker
+        with patch("datatracker.rpcapi.get_rpcapi_client") as get_rpcapi_client:
+            response = self.client.get("/api/rpc/submissions/?ordering=name")
+            get_rpcapi_client.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item["name"] for item in response.json()],
+            ["draft-a", "draft-new-name"],
+        )
+
+        # a submission stops being listed as soon as it is imported
+        RfcToBeFactory(draft__datatracker_id=changed.datatracker_id)
+        response = self.client.get("/api/rpc/submissions/")
+        self.assertEqual([item["name"] for item in response.json()], ["draft-a"])
+
+
+class DeepReferencesTests(TestCase):
+    def test_compute_deep_references(self):
+        source = RfcToBeFactory()
+        related_docs = [
+            RpcRelatedDocument.objects.create(
+                source=source,
+                relationship_id=DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG,
+                target_document=DocumentFactory(datatracker_id=dt_id, name=name),
+            )
+            for dt_id, name in ((101, "draft-a"), (102, "draft-b"))
+        ]
+        DocumentFactory(datatracker_id=201, name="draft-c")
+        stale = RpcRelatedDocument.objects.create(
+            source=source,
+            relationship_id=DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG,
+            target_document=DocumentFactory(),
+        )
+        names = {
+            101: "draft-a",
+            201: "draft-c",
+            202: "draft-d",
+            301: "draft-e",
+            302: "draft-f",
+        }
+        references = {101: [201, 202], 102: [201], 201: [301, 101, 302], 202: [301]}
+        rpcapi = MagicMock()
+        rpcapi.get_draft_references.side_effect = lambda dt_id: [
+            SimpleNamespace(id=ref_id, name=names[ref_id])
+            for ref_id in references.get(dt_id, [])
+        ]
+        # the datatracker does not know draft-f
+        rpcapi.get_drafts_by_names.side_effect = lambda draft_names: [
+            SimpleNamespace(
+                id=dt_id, name=name, rev="00", title=name, stream="ietf", pages=1
+            )
+            for dt_id, name in names.items()
+            if name in draft_names and name != "draft-f"
+        ]
+
+        _compute_deep_references(related_docs[0].pk, rpcapi=rpcapi)
+
+        self.assertCountEqual(
+            RpcRelatedDocument.objects.filter(source=source)
+            .exclude(pk__in=[rd.pk for rd in related_docs])
+            .values_list("relationship_id", "target_document__datatracker_id"),
+            [
+                (DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG, 201),
+                (DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG, 202),
+                (DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG, 301),
+            ],
+        )
+        self.assertFalse(RpcRelatedDocument.objects.filter(pk=stale.pk).exists())
+        self.assertFalse(Document.objects.filter(name="draft-f").exists())
+        # one batch lookup per level
+        self.assertEqual(rpcapi.get_drafts_by_names.call_count, 2)
+        self.assertEqual(
+            RpcRelatedDocument.history.filter(source=source, history_type="+").count(),
+            6,
+        )
+
+        # recomputing only writes what changed
+        kept = set(
+            RpcRelatedDocument.objects.filter(source=source).values_list(
+                "pk", flat=True
+            )
+        )
+        history_count = RpcRelatedDocument.history.filter(source=source).count()
+        _compute_deep_references(related_docs[1].pk, rpcapi=rpcapi)
+        self.assertEqual(
+            set(
+                RpcRelatedDocument.objects.filter(source=source).values_list(
+                    "pk", flat=True
+                )
+            ),
+            kept,
+        )
+        self.assertEqual(
+            RpcRelatedDocument.history.filter(source=source).count(), history_count
+        )
+
+        references[202] = []
+        references[201] = [302]
+        _compute_deep_references(related_docs[0].pk, rpcapi=rpcapi)
+        self.assertEqual(
+            RpcRelatedDocument.history.filter(source=source).count(),
+            history_count + 1,
+        )
+        self.assertFalse(
+            RpcRelatedDocument.objects.filter(
+                source=source,
+                relationship_id=DocRelationshipName.NOT_RECEIVED_3G_RELATIONSHIP_SLUG,
+            ).exists()
+        )
+
+    def test_deep_references_inserted_in_bulk(self):
+        names = {dt_id: f"draft-ref-{dt_id}" for dt_id in range(201, 206)}
+        for dt_id, name in names.items():
+            DocumentFactory(datatracker_id=dt_id, name=name)
+        references = {101: [201, 202], 102: [201, 202, 203, 204, 205]}
+        rpcapi = MagicMock()
+        rpcapi.get_draft_references.side_effect = lambda dt_id: [
+            SimpleNamespace(id=ref_id, name=names[ref_id])
+            for ref_id in references.get(dt_id, [])
+        ]
+
+        def _related_doc(dt_id):
+            return RpcRelatedDocument.objects.create(
+                source=RfcToBeFactory(),
+                relationship_id=DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG,
+                target_document=DocumentFactory(datatracker_id=dt_id),
+            )
+
+        few, many = _related_doc(101), _related_doc(102)
+        with CaptureQueriesContext(connection) as queries:
+            _compute_deep_references(few.pk, rpcapi=rpcapi)
+        # the relations and their history are inserted with one query each,
+        # however many there are
+        with self.assertNumQueries(len(queries)):
+            _compute_deep_references(many.pk, rpcapi=rpcapi)
+        self.assertEqual(
+            RpcRelatedDocument.history.filter(
+                source=many.source, history_type="+"
+            ).count(),
+            6,
+        )
+
+    def test_overlapping_deep_references_runs(self):
+        source = RfcToBeFactory()
+        related_docs = [
+            RpcRelatedDocument.objects.create(
+                source=source,
+                relationship_id=DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG,
+                target_document=DocumentFactory(datatracker_id=dt_id),
+            )
+            for dt_id in (101, 102)
+        ]
+        names = {201: "draft-ref-201", 202: "draft-ref-202"}
+        for dt_id, name in names.items():
+            DocumentFactory(datatracker_id=dt_id, name=name)
+        references = {101: [201], 102: [202]}
+        overlapped = []
+
+        def _get_draft_references(dt_id):
+            if not overlapped:
+                # another run for the same source completes while this one is
+                # still fetching references
+                overlapped.append(True)
+                _compute_deep_references(related_docs[1].pk, rpcapi=rpcapi)
+            return [
+                SimpleNamespace(id=ref_id, name=names[ref_id])
+                for ref_id in references.get(dt_id, [])
+            ]
+
+        rpcapi = MagicMock()
+        rpcapi.get_draft_references.side_effect = _get_draft_references
+        with CaptureQueriesContext(connection) as queries:
+            _compute_deep_references(related_docs[0].pk, rpcapi=rpcapi)
+        self.assertTrue(
+            any(
+                'FROM "rpc_rfctobe"' in query["sql"] and "FOR UPDATE" in query["sql"]
+                for query in queries
+            )
+        )
+        self.assertCountEqual(
+            RpcRelatedDocument.objects.filter(
+                source=source,
+                relationship_id=DocRelationshipName.NOT_RECEIVED_2G_RELATIONSHIP_SLUG,
+            ).values_list("target_document__datatracker_id", flat=True),
+            [201, 202],
+        )
+
+
+class ClusterQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="cluster-user",
+            password="test-password",
+            name="Cluster User",
+        )
+        self.client.force_login(self.user)
+        self.rpcapi = MagicMock()
+        self.rpcapi.get_draft_references.side_effect = lambda dt_id: [
+            SimpleNamespace(id=dt_id + 1, name=f"draft-ref-{dt_id + 1}")
+        ]
+        patcher = patch(
+            "datatracker.rpcapi.get_rpcapi_client", return_value=self.rpcapi
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _add_cluster(self):
+        cluster = ClusterFactory()
+        received = RfcToBeFactory()
+        referenced = RfcToBeFactory()
+        not_received = DocumentFactory()
+        for order, doc in enumerate(
+            (received.draft, referenced.draft, not_received), start=1
+        ):
+            cluster.docs.add(doc, through_defaults={"order": order})
+        RpcRelatedDocument.objects.create(
+            source=received,
+            relationship_id=DocRelationshipName.REFQUEUE_RELATIONSHIP_SLUG,
+            target_rfctobe=referenced,
+        )
+        RpcRelatedDocument.objects.create(
+            source=received,
+            relationship_id=DocRelationshipName.NOT_RECEIVED_RELATIONSHIP_SLUG,
+            target_document=not_received,
+        )
+        FinalApprovalFactory(rfc_to_be=received, approved=timezone.now())
+        FinalApprovalFactory(rfc_to_be=received)
+        AssignmentFactory(rfc_to_be=referenced, role__slug="blocked")
+
+    def _assert_constant_queries(self, url, **kwargs):
+        self._add_cluster()
+        with CaptureQueriesContext(connection) as baseline:
+            response = self.client.get(url, **kwargs)
+        self.assertEqual(response.status_code, 200, response.content)
+        for count in (2, 5):
+            for _ in range(count):
+                self._add_cluster()
+            with self.assertNumQueries(len(baseline.captured_queries)):
+                response = self.client.get(url, **kwargs)
+        clusters = response.json()
+        self.assertEqual(len(clusters), 8)
+        documents = sorted(clusters[0]["documents"], key=lambda doc: doc["order"])
+        self.assertEqual(
+            documents[0]["final_approval_counts"], {"approved": 1, "total": 2}
+        )
+        self.assertEqual([doc["is_blocked"] for doc in documents[:2]], [False, True])
+        self.assertCountEqual(
+            [
+                (ref["target_is_received"], ref["target_is_blocked"])
+                for ref in documents[0]["references"]
+            ],
+            [(True, True), (False, False)],
+        )
+        self.assertTrue(documents[2]["references"])
+
+    def test_cluster_list(self):
+        self._assert_constant_queries("/api/rpc/clusters/?ordering=number")
+
+    def test_public_cluster_list(self):
+        self._assert_constant_queries(
+            "/api/pubq/clusters/", headers={"X-Api-Key": "pubq-token"}
+        )
+
+
+class ClusterReorderTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="reorder-user",
+            password="test-password",
+            name="Reorder User",
+        )
+        self.client.force_login(self.user)
+
+    def _reorder(self, size):
+        cluster = ClusterFactory()
+        names = []
+        for order in range(1, size + 1):
+            rfctobe = RfcToBeFactory()
+            cluster.docs.add(rfctobe.draft, through_defaults={"order": order})
+            names.append(rfctobe.draft.name)
+        names.reverse()
+        history_count = ClusterMember.history.count()
+        with (
+            self.captureOnCommitCallbacks() as callbacks,
+            CaptureQueriesContext(connection) as queries,
+        ):
+            response = self.client.post(
+                f"/api/rpc/clusters/{cluster.number}/order/",
+                {"draft_names": names},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            list(
+                ClusterMember.objects.filter(cluster=cluster).values_list(
+                    "doc__name", flat=True
+                )
+            ),
+            names,
+        )
+        self.assertEqual(ClusterMember.history.count() - history_count, size)
+        self.assertEqual(
+            len([cb for cb in callbacks if isinstance(cb, BlockedAssignmentRecompute)]),
+            1,
+        )
+        return len(queries.captured_queries)
+
+    def test_reorder_queries_do_not_depend_on_cluster_size(self):
+        self.assertEqual(self._reorder(4), self._reorder(30))
+
+
+@patch("rpc.tasks.datatracker_name")
+@patch("rpc.tasks.fetch_group_object")
+@patch("rpc.tasks.prefetch_documents", return_value=0)
+@patch("rpc.tasks.prefetch_persons", return_value=0)
+class PrefetchQueueDatatrackerDataTests(TestCase):
+    def test_prefetches_queue_persons_and_documents(
+        self, mock_persons, mock_documents, mock_group, mock_name
+    ):
+        shepherd = DatatrackerPersonFactory()
+        rfctobe = RfcToBeFactory(shepherd=shepherd, group="tls")
+        author = RfcAuthorFactory(rfc_to_be=rfctobe)
+        assignment = AssignmentFactory(rfc_to_be=rfctobe)
+        approval = FinalApprovalFactory(rfc_to_be=rfctobe)
+        action_holder = RfcToBeActionHolderFactory(target_rfctobe=rfctobe)
+        RfcToBeActionHolderFactory(target_rfctobe=rfctobe, completed=timezone.now())
+        # not in the queue
+        published = RfcToBeFactory(disposition__slug="published", group="quic")
+        RfcAuthorFactory(rfc_to_be=published)
+
+        prefetch_queue_datatracker_data_task()
+
+        person_ids, refresh_ahead = mock_persons.call_args.args
+        expected_persons = [
+            shepherd,
+            author.datatracker_person,
+            assignment.person.datatracker_person,
+            approval.approver,
+            action_holder.datatracker_person,
+        ]
+        self.assertEqual(
+            person_ids, {int(person.datatracker_id) for person in expected_persons}
+        )
+        self.assertEqual(refresh_ahead, DATATRACKER_PREFETCH_AHEAD)
+        self.assertEqual(
+            mock_documents.call_args.args[0],
+            {rfctobe.draft.datatracker_id: rfctobe.draft.name},
+        )
+        mock_group.assert_called_once_with("tls", refresh=True)
+
+    def test_slow_lookup_does_not_abort_task(
+        self, mock_persons, mock_documents, mock_group, mock_name
+    ):
+        RfcToBeFactory(group="tls")
+        RfcToBeFactory(group="quic")
+        mock_group.side_effect = requests.ReadTimeout
+        mock_name.side_effect = requests.ReadTimeout
+        prefetch_queue_datatracker_data_task()
+        self.assertEqual(mock_group.call_count, 2)
+        # std level and stream names
+        self.assertEqual(mock_name.call_count, 2)
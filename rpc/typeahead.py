@@ -0,0 +1,211 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+"""Typeahead suggestions for documents
+
+Suggestions come from an in-memory prefix index, kept by each process, of the
+draft names, RFC numbers, cluster numbers and subseries numbers of all RfcToBes.
+The index is built once and then kept up to date from the RfcToBeChange log,
+updating only the RfcToBes that changed. It is rebuilt from scratch periodically
+as well, to pick up anything the log missed; other requests keep using the old
+index while the new one is built. Results for popular prefixes are also cached
+briefly in the shared cache.
+"""
+
+import bisect
+import datetime
+import logging
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import ClusterMember, RfcToBe, RfcToBeChange, SubseriesMember
+
+logger = logging.getLogger(__name__)
+
+# How often to apply changes from the RfcToBeChange log
+TYPEAHEAD_SYNC_INTERVAL = 5  # seconds
+# Changes logged this long before the last sync are applied again, to catch
+# changes from transactions that were still open at the time
+TYPEAHEAD_SYNC_OVERLAP = datetime.timedelta(minutes=1)
+TYPEAHEAD_REBUILD_INTERVAL = 15 * 60  # seconds
+TYPEAHEAD_CACHE_KEY = "typeahead:{limit}:{prefix}"
+TYPEAHEAD_CACHE_TTL = 30  # seconds
+
+
+def normalize(text: str) -> str:
+    """Normalize text for prefix matching ("RFC 9000" -> "rfc9000")"""
+    return "".join(text.lower().split())
+
+
+class PrefixIndex:
+    """Sorted index of (key, RfcToBe id) pairs for prefix lookups
+
+    update() builds the new entries as new objects and swaps them in with one
+    assignment, so lookup() can run in other threads while it updates.
+    """
+
+    def __init__(self):
+        # sorted (key, pk) pairs and suggestions by pk, always replaced together
+        self._entries: tuple[list[tuple[str, int]], dict[int, dict]] = ([], {})
+        self._keys_by_id: dict[int, list[str]] = {}
+
+    def update(self, rfc_to_be_ids: Iterable[int] | None = None):
+        """Update the index entries of RfcToBes, all of them if ids is None"""
+        rfctobes = RfcToBe.objects.all()
+        cluster_members = ClusterMember.objects.all()
+        subseries_members = SubseriesMember.objects.all()
+        if rfc_to_be_ids is None:
+            keys, suggestions, keys_by_id = [], {}, {}
+        else:
+            rfc_to_be_ids = set(rfc_to_be_ids)
+            old_keys, old_suggestions = self._entries
+            removed = {
+                (key, pk)
+                for pk in rfc_to_be_ids
+                for key in self._keys_by_id.get(pk, [])
+            }
+            keys = [entry for entry in old_keys if entry not in removed]
+            suggestions = {
+                pk: suggestion
+                for pk, suggestion in old_suggestions.items()
+                if pk not in rfc_to_be_ids
+            }
+            keys_by_id = {
+                pk: pk_keys
+                for pk, pk_keys in self._keys_by_id.items()
+                if pk not in rfc_to_be_ids
+            }
+            rfctobes = rfctobes.filter(pk__in=rfc_to_be_ids)
+            cluster_members = cluster_members.filter(doc__rfctobe__in=rfc_to_be_ids)
+            subseries_members = subseries_members.filter(rfc_to_be_id__in=rfc_to_be_ids)
+        extra_keys = defaultdict(list)
+        for rfc_to_be_id, number in cluster_members.values_list(
+            "doc__rfctobe", "cluster__number"
+        ):
+            extra_keys[rfc_to_be_id].append(f"c{number}")
+        for rfc_to_be_id, type_slug, number in subseries_members.values_list(
+            "rfc_to_be_id", "type_id", "number"
+        ):
+            extra_keys[rfc_to_be_id].append(f"{type_slug}{number}")
+        for pk, draft_name, rfc_number, title, disposition in rfctobes.values_list(
+            "pk", "draft__name", "rfc_number", "title", "disposition_id"
+        ):
+            pk_keys = list(extra_keys[pk])
+            if draft_name:
+                pk_keys.append(normalize(draft_name))
+                pk_keys.append(normalize(draft_name.removeprefix("draft-")))
+            if rfc_number is not None:
+                pk_keys.append(f"rfc{rfc_number}")
+                pk_keys.append(str(rfc_number))
+            suggestions[pk] = {
+                "id": pk,
+                "name": draft_name or f"RFC {rfc_number}",
+                "rfc_number": rfc_number,
+                "title": title,
+                "disposition": disposition,
+            }
+            keys_by_id[pk] = pk_keys = sorted(set(pk_keys))
+            keys.extend((key, pk) for key in pk_keys)
+        # the kept keys are still sorted, so this is a merge
+        keys.sort()
+        self._keys_by_id = keys_by_id
+        self._entries = (keys, suggestions)
+
+    def lookup(self, prefix: str, limit: int) -> list[dict]:
+        """Suggestions for RfcToBes with a key that starts with prefix
+
+        Suggestions are in order of their keys, so an exact match comes first.
+        """
+        keys, suggestions_by_id = self._entries
+        suggestions = []
+        seen = set()
+        for index in range(bisect.bisect_left(keys, (prefix,)), len(keys)):
+            key, pk = keys[index]
+            if not key.startswith(prefix) or len(suggestions) >= limit:
+                break
+            if pk not in seen:
+                seen.add(pk)
+                suggestions.append(suggestions_by_id[pk])
+        return suggestions
+
+
+class _TypeaheadIndex:
+    """Process-wide PrefixIndex, kept up to date"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index: PrefixIndex | None = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._changes_seen_at: datetime.datetime | None = None
+        self._rebuilding = False
+
+    def get(self) -> PrefixIndex:
+        with self._lock:
+            now = time.monotonic()
+            if self._index is None:
+                self._index, self._changes_seen_at = self._build()
+                self._built_at = self._synced_at = now
+                return self._index
+            rebuild = (
+                not self._rebuilding
+                and now - self._built_at > TYPEAHEAD_REBUILD_INTERVAL
+            )
+            if rebuild:
+                self._rebuilding = True
+            elif now - self._synced_at > TYPEAHEAD_SYNC_INTERVAL:
+                self._sync(now)
+            index = self._index
+        if rebuild:
+            # Build the new index without holding the lock, so that other requests
+            # keep using (and syncing) the old one in the meantime
+            try:
+                index, changes_seen_at = self._build()
+            finally:
+                with self._lock:
+                    self._rebuilding = False
+            with self._lock:
+                self._index = index
+                self._built_at = now
+                # changes made during the build are applied by the next sync
+                self._synced_at = 0.0
+                self._changes_seen_at = changes_seen_at
+        return index
+
+    def _build(self) -> tuple[PrefixIndex, datetime.datetime]:
+        logger.debug("Building typeahead index")
+        changes_seen_at = timezone.now()
+        index = PrefixIndex()
+        index.update()
+        return index, changes_seen_at
+
+    def _sync(self, now: float):
+        changes_seen_at = timezone.now()
+        changed_ids = set(
+            RfcToBeChange.objects.filter(
+                changed_at__gte=self._changes_seen_at - TYPEAHEAD_SYNC_OVERLAP
+            ).values_list("rfc_to_be_id", flat=True)
+        )
+        if changed_ids:
+            self._index.update(changed_ids)
+        self._synced_at = now
+        self._changes_seen_at = changes_seen_at
+
+
+_typeahead_index = _TypeaheadIndex()
+
+
+def typeahead_suggestions(query: str, limit: int) -> list[dict]:
+    """Suggestions for documents whose name or number starts with query"""
+    prefix = normalize(query)
+    if not prefix:
+        return []
+    cache_key = TYPEAHEAD_CACHE_KEY.format(limit=limit, prefix=prefix)
+    suggestions = cache.get(cache_key)
+    if suggestions is None:
+        suggestions = _typeahead_index.get().lookup(prefix, limit)
+        cache.set(cache_key, suggestions, TYPEAHEAD_CACHE_TTL)
+    return suggestions
@@ -86,23 +86,34 @@ def get_or_create_draft_by_name(draft_name, *, rpcapi):
 
     n.b., creates a Document object if needed
     """
-    drafts = rpcapi.get_drafts_by_names([draft_name])
+    return get_or_create_drafts_by_names([draft_name], rpcapi=rpcapi).get(draft_name)
 
-    draft_info = next(
-        (d for d in drafts if getattr(d, "name", None) == draft_name), None
-    )
-    if draft_info is None:
-        return None
-    # todo manage updates if the details below change before draft reaches pubreq!
-    document, _ = Document.objects.get_or_create(
-        datatracker_id=draft_info.id,
-        defaults={
-            "name": draft_info.name,
-            "rev": draft_info.rev,
-            "title": draft_info.title,
-            "stream": "" if draft_info.stream is None else draft_info.stream,
-            "pages": draft_info.pages,
-            "intended_std_level": getattr(draft_info, "intended_std_level", "") or "",
-        },
-    )
-    return document
+
+def get_or_create_drafts_by_names(draft_names, *, rpcapi) -> dict[str, Document]:
+    """Get datatracker Documents for drafts given their names, keyed by name
+
+    Looks up all the drafts with a single datatracker API call. Names the
+    datatracker does not know are left out. n.b., creates Document objects if needed
+    """
+    draft_names = set(draft_names)
+    if not draft_names:
+        return {}
+    documents = {}
+    for draft_info in rpcapi.get_drafts_by_names(list(draft_names)):
+        draft_name = getattr(draft_info, "name", None)
+        if draft_name not in draft_names or draft_name in documents:
+            continue
+        # todo manage updates if the details below change before draft reaches pubreq!
+        documents[draft_name], _ = Document.objects.get_or_create(
+            datatracker_id=draft_info.id,
+            defaults={
+                "name": draft_info.name,
+                "rev": draft_info.rev,
+                "title": draft_info.title,
+                "stream": "" if draft_info.stream is None else draft_info.stream,
+                "pages": draft_info.pages,
+                "intended_std_level": getattr(draft_info, "intended_std_level", "")
+                or "",
+            },
+        )
+    return documents